@@ -0,0 +1,259 @@
+# -*- coding: utf-8 -*-
+"""
+Micro-benchmarks das classes de resposta de stellrent_response.json_response.
+
+Executa offline, grava os resultados em JSON e, opcionalmente, compara com um
+baseline salvo, falhando (código de saída 1) quando algum caso regride além do
+limite configurado.
+
+Uso:
+    python -m benchmarks.bench_responses --output bench.json
+    python -m benchmarks.bench_responses --sizes tiny,small --baseline bench.json --threshold 0.25
+"""
+import argparse
+import datetime
+import json
+import platform
+import sys
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from flask import Flask
+
+from stellrent_response import json_response
+
+try:
+    from pydantic import BaseModel, ValidationError
+except ImportError: # pydantic é opcional: os casos de validação são omitidos
+    BaseModel = ValidationError = None
+
+# Quantidade de registros por tamanho de payload (de poucos bytes a dezenas de MB)
+PAYLOAD_SIZES = {
+    "tiny": 1,
+    "small": 100,
+    "medium": 10_000,
+    "large": 100_000,
+    "xlarge": 300_000,
+}
+
+PAYLOAD_SHAPES = ("plain", "uuid_datetime")
+
+DEFAULT_THRESHOLD = 0.25
+
+
+if BaseModel is not None:
+    class _BenchItem(BaseModel):
+        price: float
+        quantity: int
+
+
+    class _BenchSchema(BaseModel):
+        items: List[_BenchItem]
+
+
+def _plain_record(index: int) -> Dict[str, Any]:
+    return {
+        "id": index,
+        "name": f"record-{index}",
+        "price": index * 1.25,
+        "active": index % 2 == 0,
+        "tags": ["a", "b", "c"],
+    }
+
+
+def _uuid_datetime_record(index: int) -> Dict[str, Any]:
+    base = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+    return {
+        "id": uuid.UUID(int=index),
+        "owner": uuid.UUID(int=index * 7919),
+        "created": base + datetime.timedelta(seconds=index),
+        "updated": base + datetime.timedelta(minutes=index),
+        "day": datetime.date(2024, 1, 1) + datetime.timedelta(days=index % 365),
+    }
+
+
+def build_payload(shape: str, size: str) -> List[Dict[str, Any]]:
+    make_record = _plain_record if shape == "plain" else _uuid_datetime_record
+    return [make_record(index) for index in range(PAYLOAD_SIZES[size])]
+
+
+def build_validation_error(count: int) -> "ValidationError":
+    try:
+        _BenchSchema(items=[{"price": "free", "quantity": "many"} for _ in range(count)])
+    except ValidationError as validation_error:
+        return validation_error
+    raise AssertionError("Payload de benchmark deveria ser inválido")
+
+
+def _consume(response) -> int:
+    """Percorre o corpo da resposta (inclusive streaming) e retorna o tamanho em bytes."""
+    return sum(len(chunk) for chunk in response.iter_encoded())
+
+
+def build_cases(sizes: List[str]) -> Dict[str, Tuple[Callable[[], Any], Optional[int]]]:
+    """
+    Monta os casos de benchmark: nome -> (função medida, tamanho do payload em bytes).
+    """
+    cases: Dict[str, Tuple[Callable[[], Any], Optional[int]]] = {}
+
+    simple_classes = [
+        json_response.ConfirmationResponse,
+        json_response.CreateConfirmationResponse,
+        json_response.NoDataResponse,
+        json_response.BadRequest,
+        json_response.Unauthorized,
+        json_response.Forbidden,
+        json_response.NotFound,
+        json_response.MethodNotAllowed,
+        json_response.ServerError,
+    ]
+    for response_class in simple_classes:
+        name = response_class.__name__
+        cases[f"construct/{name}"] = (response_class, None)
+        cases[f"make_response/{name}"] = (lambda cls=response_class: _consume(cls().make_response()), None)
+        if response_class is not json_response.NoDataResponse:
+            cases[f"make_response/{name}/details"] = (
+                lambda cls=response_class: _consume(cls(details={"field": "value"}).make_response()),
+                None,
+            )
+
+    record = _plain_record(0)
+    cases["construct/DataResponse"] = (lambda: json_response.DataResponse(data=record), None)
+    cases["construct/StreamingDataResponse"] = (lambda: json_response.StreamingDataResponse(data=()), None)
+
+    for count in ((1, 1_000) if ValidationError is not None else ()):
+        validation_error = build_validation_error(count)
+        cases[f"construct/BadRequest/validation/{count}"] = (
+            lambda error=validation_error: json_response.BadRequest(validate_exception=error),
+            None,
+        )
+        cases[f"make_response/BadRequest/validation/{count}"] = (
+            lambda error=validation_error: _consume(json_response.BadRequest(validate_exception=error).make_response()),
+            None,
+        )
+
+    for size in sizes:
+        for shape in PAYLOAD_SHAPES:
+            payload = build_payload(shape, size)
+            payload_bytes = _consume(json_response.DataResponse(data=payload).make_response())
+            cases[f"make_response/DataResponse/{shape}/{size}"] = (
+                lambda data=payload: _consume(json_response.DataResponse(data=data).make_response()),
+                payload_bytes,
+            )
+            cases[f"make_response/StreamingDataResponse/{shape}/{size}"] = (
+                lambda data=payload: _consume(json_response.StreamingDataResponse(data=iter(data)).make_response()),
+                payload_bytes,
+            )
+    return cases
+
+
+def measure(function: Callable[[], Any], repeat: int, min_time: float) -> Tuple[float, int]:
+    """
+    Mede o menor tempo por operação entre 'repeat' rodadas. Cada rodada executa
+    a função tantas vezes quanto necessário para durar ao menos 'min_time' segundos.
+    """
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        number *= 10 if elapsed < min_time / 10 else 2
+    best = elapsed / number
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best, number
+
+
+def run(sizes: List[str], repeat: int = 5, min_time: float = 0.05, pattern: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Executa os benchmarks e retorna os resultados em um dicionário serializável.
+    """
+    app = Flask(__name__)
+    results: Dict[str, Dict[str, Any]] = {}
+    with app.test_request_context("/bench"):
+        for name, (function, payload_bytes) in build_cases(sizes).items():
+            if pattern is not None and pattern not in name:
+                continue
+            seconds, number = measure(function, repeat, min_time)
+            results[name] = {"seconds_per_op": seconds, "ops_per_round": number, "payload_bytes": payload_bytes}
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "json_backend": json_response.get_json_backend().name,
+            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        },
+        "results": results,
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[Dict[str, Any]]:
+    """
+    Compara dois resultados e retorna a lista de casos cujo tempo por operação
+    ultrapassou o baseline em mais de 'threshold' (0.25 = 25% mais lento).
+    """
+    regressions = []
+    for name, result in current["results"].items():
+        reference = baseline["results"].get(name)
+        if reference is None or reference["seconds_per_op"] <= 0:
+            continue
+        ratio = result["seconds_per_op"] / reference["seconds_per_op"]
+        if ratio > 1 + threshold:
+            regressions.append({
+                "name": name,
+                "baseline": reference["seconds_per_op"],
+                "current": result["seconds_per_op"],
+                "ratio": ratio,
+            })
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks de stellrent_response")
+    parser.add_argument("--sizes", default=",".join(PAYLOAD_SIZES), help="Tamanhos de payload separados por vírgula")
+    parser.add_argument("--repeat", type=int, default=5, help="Rodadas por caso (usa o menor tempo)")
+    parser.add_argument("--min-time", type=float, default=0.05, help="Duração mínima de cada rodada, em segundos")
+    parser.add_argument("--filter", default=None, help="Executa apenas os casos cujo nome contém o texto")
+    parser.add_argument("--output", default=None, help="Arquivo JSON de saída (padrão: stdout)")
+    parser.add_argument("--baseline", default=None, help="Arquivo JSON de baseline para comparação")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Regressão tolerada (0.25 = 25%%)")
+    args = parser.parse_args(argv)
+
+    sizes = [size for size in args.sizes.split(",") if size]
+    unknown = [size for size in sizes if size not in PAYLOAD_SIZES]
+    if unknown:
+        parser.error(f"Tamanhos desconhecidos: {unknown}. Opções: {list(PAYLOAD_SIZES)}")
+
+    current = run(sizes, repeat=args.repeat, min_time=args.min_time, pattern=args.filter)
+    output = json.dumps(current, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            output_file.write(output + "\n")
+    else:
+        print(output)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as baseline_file:
+            baseline = json.load(baseline_file)
+        regressions = compare(current, baseline, args.threshold)
+        for regression in regressions:
+            print(
+                f"REGRESSION {regression['name']}: {regression['baseline'] * 1e6:.2f}us -> "
+                f"{regression['current'] * 1e6:.2f}us ({regression['ratio']:.2f}x)",
+                file=sys.stderr,
+            )
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,262 @@
+# -*- coding: utf-8 -*-
+"""
+Contrapartes assíncronas das respostas de json_response, para views async do
+Flask e implantações ASGI.
+
+As classes têm os mesmos nomes, construtores e contrato (status, message,
+details, errors) de json_response; a única diferença é que make_response() é
+awaitable. Payloads grandes são serializados em um pool de threads limitado,
+para não bloquear o event loop:
+
+    from stellrent_response import async_response
+
+    @app.get("/orders")
+    async def orders():
+        return await async_response.DataResponse(data=await load_orders()).make_response()
+"""
+import asyncio
+import concurrent.futures
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from flask import Response
+from typing import Any, AsyncIterable, AsyncIterator, Awaitable, Callable, Iterator, Optional
+
+from stellrent_response import json_response
+
+# Tamanho estimado (em bytes) a partir do qual a serialização sai do event loop
+DEFAULT_OFFLOAD_THRESHOLD = 256 * 1024
+DEFAULT_OFFLOAD_WORKERS = 4
+
+_offload_threshold = DEFAULT_OFFLOAD_THRESHOLD
+_offload_workers = DEFAULT_OFFLOAD_WORKERS
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def configure_offload(
+    threshold: int = DEFAULT_OFFLOAD_THRESHOLD,
+    max_workers: int = DEFAULT_OFFLOAD_WORKERS,
+) -> None:
+    """
+    Configura a serialização fora do event loop.
+
+    Args:
+        threshold (int): Tamanho estimado do corpo, em bytes, a partir do qual
+                         make_response() é executado no pool de threads.
+        max_workers (int): Quantidade máxima de threads do pool.
+    """
+    global _offload_threshold, _offload_workers, _executor
+    _offload_threshold = threshold
+    if max_workers != _offload_workers and _executor is not None:
+        _executor.shutdown(wait=False)
+        _executor = None
+    _offload_workers = max_workers
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=_offload_workers, thread_name_prefix="stellrent-response")
+    return _executor
+
+
+class AsyncResponseMixin:
+    """
+    Torna make_response() awaitable. Respostas cujo corpo estimado ultrapassa o
+    limite configurado são montadas no pool de threads, com uma cópia do contexto
+    (a requisição do Flask continua disponível para compressão e ETag).
+    """
+    __slots__ = ()
+
+    async def make_response(self) -> Response:
+        make_response = super().make_response
+        if self._estimated_size() < _offload_threshold:
+            return make_response()
+        context = contextvars.copy_context()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_executor(), context.run, _encoded_now, make_response)
+
+    def _estimated_size(self) -> int:
+        if self._data is not None:
+            return json_response._estimate_json_size(self._data)
+        size = 0
+        if self._details is not None:
+            size += json_response._estimate_json_size(self._details)
+        if self._errors is not None:
+            size += json_response._estimate_json_size(self._errors)
+        return size
+
+
+def _encoded_now(make_response: Callable[[], Response]) -> Response:
+    response = make_response()
+    if isinstance(response, json_response.DeferredResponse):
+        # Com a serialização adiada habilitada, o corpo ainda precisa ser montado no pool
+        response.encode()
+    return response
+
+
+class ApiResponse(AsyncResponseMixin, json_response.ApiResponse):
+    __slots__ = ()
+
+class DataResponse(AsyncResponseMixin, json_response.DataResponse):
+    __slots__ = ()
+
+class ConfirmationResponse(AsyncResponseMixin, json_response.ConfirmationResponse):
+    __slots__ = ()
+
+class CreateConfirmationResponse(AsyncResponseMixin, json_response.CreateConfirmationResponse):
+    __slots__ = ()
+
+class NoDataResponse(AsyncResponseMixin, json_response.NoDataResponse):
+    __slots__ = ()
+
+class ErrorResponse(AsyncResponseMixin, json_response.ErrorResponse):
+    __slots__ = ()
+
+class BadRequest(AsyncResponseMixin, json_response.BadRequest):
+    __slots__ = ()
+
+class Unauthorized(AsyncResponseMixin, json_response.Unauthorized):
+    __slots__ = ()
+
+class Forbidden(AsyncResponseMixin, json_response.Forbidden):
+    __slots__ = ()
+
+class NotFound(AsyncResponseMixin, json_response.NotFound):
+    __slots__ = ()
+
+class MethodNotAllowed(AsyncResponseMixin, json_response.MethodNotAllowed):
+    __slots__ = ()
+
+class ServerError(AsyncResponseMixin, json_response.ServerError):
+    __slots__ = ()
+
+class RawJsonResponse(AsyncResponseMixin, json_response.RawJsonResponse):
+    __slots__ = ()
+
+class MultiStatusResponse(AsyncResponseMixin, json_response.MultiStatusResponse):
+    __slots__ = ()
+
+    async def make_response(self) -> Response:
+        if self._stream:
+            # O corpo em streaming é gerado durante o envio; não há o que tirar do event loop
+            return json_response.MultiStatusResponse.make_response(self)
+        return await AsyncResponseMixin.make_response(self)
+
+    def _estimated_size(self) -> int:
+        if not isinstance(self._responses, (list, tuple)):
+            return 0
+        return sum(AsyncResponseMixin._estimated_size(response) + 24 for response in self._responses)
+
+
+class StreamingDataResponse(json_response.StreamingDataResponse):
+    """
+    Resposta em streaming que aceita, além de iteráveis comuns, iteráveis
+    assíncronos. O iterável assíncrono é avançado no loop de streaming do módulo
+    (ver stream_loop), à medida que o servidor WSGI envia o corpo.
+
+    O loop da view termina antes do envio do corpo; por isso a view precisa rodar
+    no loop de streaming (decorator on_stream_loop), para que filas, tarefas,
+    cursores e streams usados pelo iterável continuem vivos durante o envio.
+    """
+    __slots__ = ()
+
+    async def make_response(self) -> Response:
+        if hasattr(self._data, "__aiter__"):
+            if asyncio.get_running_loop() is not _stream_loop:
+                raise RuntimeError(
+                    "Async iterables can only be streamed from views running on the stream loop; "
+                    "decorate the view with @async_response.on_stream_loop."
+                )
+            self._data = _iterate_async(self._data)
+        return super().make_response()
+
+
+# Loop de longa duração, em uma thread própria, no qual as views decoradas com
+# on_stream_loop rodam e os iteráveis assíncronos são avançados durante o envio
+_stream_loop: Optional[asyncio.AbstractEventLoop] = None
+_stream_thread: Optional[threading.Thread] = None
+_stream_lock = threading.Lock()
+
+
+def stream_loop() -> asyncio.AbstractEventLoop:
+    """
+    Retorna o loop de streaming do módulo, iniciando-o (em uma thread daemon) no primeiro uso.
+    """
+    global _stream_loop, _stream_thread
+    with _stream_lock:
+        if _stream_loop is None:
+            loop = asyncio.new_event_loop()
+            _stream_thread = threading.Thread(target=loop.run_forever, name="stellrent-response-stream", daemon=True)
+            _stream_thread.start()
+            _stream_loop = loop
+        return _stream_loop
+
+
+def on_stream_loop(view: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+    """
+    Decorator que executa uma view assíncrona no loop de streaming, com o contexto
+    (requisição do Flask) de quem a chamou:
+
+        @app.get("/events")
+        @async_response.on_stream_loop
+        async def events():
+            return await async_response.StreamingDataResponse(data=read_events()).make_response()
+    """
+    @functools.wraps(view)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        return await asyncio.wrap_future(_submit(view(*args, **kwargs)))
+
+    return wrapper
+
+
+def _submit(coroutine: Awaitable[Any]) -> "concurrent.futures.Future[Any]":
+    """
+    Agenda a corrotina no loop de streaming, com uma cópia do contexto atual.
+    """
+    loop = stream_loop()
+    context = contextvars.copy_context()
+    result: "concurrent.futures.Future[Any]" = concurrent.futures.Future()
+
+    def start() -> None:
+        task = context.run(loop.create_task, coroutine)
+        task.add_done_callback(lambda done: _copy_outcome(done, result))
+
+    loop.call_soon_threadsafe(start)
+    return result
+
+
+def _copy_outcome(task: "asyncio.Future[Any]", result: "concurrent.futures.Future[Any]") -> None:
+    if task.cancelled():
+        result.cancel()
+    elif task.exception() is not None:
+        result.set_exception(task.exception())
+    else:
+        result.set_result(task.result())
+
+
+async def _anext(iterator: AsyncIterator[Any]) -> Any:
+    return await iterator.__anext__()
+
+
+def _iterate_async(items: AsyncIterable[Any]) -> Iterator[Any]:
+    """
+    Converte um iterável assíncrono em um iterador síncrono, avançando-o no loop
+    de streaming a cada item solicitado.
+    """
+    if threading.current_thread() is _stream_thread:
+        # Aguardar o próprio loop a partir dele travaria o envio
+        raise RuntimeError("Async streaming bodies cannot be consumed from the stream loop itself.")
+    iterator = items.__aiter__()
+    try:
+        while True:
+            try:
+                item = _submit(_anext(iterator)).result()
+            except StopAsyncIteration:
+                break
+            yield item
+    finally:
+        aclose = getattr(iterator, "aclose", None)
+        if aclose is not None:
+            _submit(aclose()).result()
@@ -0,0 +1,332 @@
+# -*- coding: utf-8 -*-
+"""
+Memoização de respostas de views Flask.
+
+O decorator cached_response guarda o corpo já serializado, o status e os
+cabeçalhos da resposta, em um LRU local limitado por bytes ou em um store
+compartilhado (Redis, memcached...) que implemente ResponseStore:
+
+    from stellrent_response.cache import cached_response
+
+    @app.get("/catalog")
+    @cached_response(ttl=300)
+    def catalog():
+        return json_response.DataResponse(data=load_catalog())
+"""
+import functools
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from flask import Response, current_app, request
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from stellrent_response.json_response import ApiResponse, DeferredResponse
+
+KEY_PREFIX = "stellrent-response:"
+
+# Relógio usado para expiração; compartilhado entre processos, por isso time.time
+_now = time.time
+
+
+class CachedResponse:
+    """
+    Resposta armazenada: corpo serializado, status, cabeçalhos e instante de expiração.
+    """
+    __slots__ = ("body", "status", "headers", "expires_at")
+
+    def __init__(self, body: bytes, status: int, headers: List[Tuple[str, str]], expires_at: float):
+        self.body = body
+        self.status = status
+        self.headers = headers
+        self.expires_at = expires_at
+
+    @property
+    def size(self) -> int:
+        return len(self.body) + sum(len(name) + len(value) for name, value in self.headers)
+
+    def is_fresh(self) -> bool:
+        return self.expires_at > _now()
+
+    def to_response(self) -> Response:
+        return Response(self.body, status=self.status, headers=self.headers)
+
+    def to_bytes(self) -> bytes:
+        """
+        Serializa a entrada para stores compartilhados (cabeçalho JSON + corpo).
+        """
+        header = json.dumps({"status": self.status, "headers": self.headers, "expires_at": self.expires_at})
+        return header.encode("utf-8") + b"\n" + self.body
+
+    @classmethod
+    def from_bytes(cls, raw: bytes) -> "CachedResponse":
+        header, _, body = raw.partition(b"\n")
+        metadata = json.loads(header)
+        headers = [(name, value) for name, value in metadata["headers"]]
+        return cls(body, metadata["status"], headers, metadata["expires_at"])
+
+
+class ResponseStore:
+    """
+    Interface dos stores de respostas. Stores compartilhados podem usar
+    CachedResponse.to_bytes()/from_bytes() para persistir as entradas.
+    'add' precisa ser atômico (set-if-absent): é ele que garante que apenas um
+    worker recalcule uma entrada expirada. 'delete_if_equal' libera a trava
+    apenas se ela ainda pertence a quem a obteve.
+    """
+    def get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        raise NotImplementedError
+
+    def add(self, key: str, value: Any, ttl: float) -> bool:
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def delete_if_equal(self, key: str, value: Any) -> bool:
+        """
+        Remove a chave apenas se o valor armazenado ainda for 'value'. Esta versão
+        padrão não é atômica; stores compartilhados devem sobrescrevê-la
+        (ex.: script Lua no Redis, gets/cas no memcached).
+        """
+        if self.get(key) != value:
+            return False
+        self.delete(key)
+        return True
+
+
+class MemoryResponseStore(ResponseStore):
+    """
+    Store local ao processo: LRU limitado pelo total de bytes armazenados.
+    """
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[Any, float, int]]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            value, expires_at, _ = item
+            if expires_at <= _now():
+                self._discard(key)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        with self._lock:
+            self._set_locked(key, value, ttl)
+
+    def add(self, key: str, value: Any, ttl: float) -> bool:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is not None and item[1] > _now():
+                return False
+            self._set_locked(key, value, ttl)
+            return True
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._discard(key)
+
+    def delete_if_equal(self, key: str, value: Any) -> bool:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None or item[0] != value:
+                return False
+            self._discard(key)
+            return True
+
+    def _set_locked(self, key: str, value: Any, ttl: float) -> None:
+        # Chamado com self._lock adquirido
+        size = value.size if isinstance(value, CachedResponse) else len(key)
+        self._discard(key)
+        if size > self.max_bytes:
+            return
+        self._entries[key] = (value, _now() + ttl, size)
+        self._size += size
+        while self._size > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._discard(oldest)
+
+    def _discard(self, key: str) -> None:
+        item = self._entries.pop(key, None)
+        if item is not None:
+            self._size -= item[2]
+
+
+class DictResponseStore(ResponseStore):
+    """
+    Store baseado em um dicionário comum, que guarda as entradas serializadas como
+    um backend compartilhado faria. Útil em testes e como referência de implementação.
+    """
+    def __init__(self, mapping: Optional[Dict[str, Tuple[Any, float]]] = None):
+        self.mapping = mapping if mapping is not None else {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        item = self.mapping.get(key)
+        if item is None or item[1] <= _now():
+            return None
+        value = item[0]
+        return CachedResponse.from_bytes(value) if isinstance(value, bytes) else value
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        if isinstance(value, CachedResponse):
+            value = value.to_bytes()
+        self.mapping[key] = (value, _now() + ttl)
+
+    def add(self, key: str, value: Any, ttl: float) -> bool:
+        with self._lock:
+            item = self.mapping.get(key)
+            if item is not None and item[1] > _now():
+                return False
+            self.mapping[key] = (value, _now() + ttl)
+            return True
+
+    def delete(self, key: str) -> None:
+        self.mapping.pop(key, None)
+
+    def delete_if_equal(self, key: str, value: Any) -> bool:
+        with self._lock:
+            item = self.mapping.get(key)
+            if item is None or item[0] != value:
+                return False
+            del self.mapping[key]
+            return True
+
+
+default_store = MemoryResponseStore()
+
+
+def default_key(*args: Any, **kwargs: Any) -> str:
+    """
+    Chave padrão: método e caminho completo (com query string) da requisição.
+    """
+    return f"{request.method}:{request.full_path}"
+
+
+def cached_response(
+    ttl: float,
+    key: Optional[Callable[..., str]] = None,
+    store: Optional[ResponseStore] = None,
+    cache_errors: bool = False,
+    stale_ttl: float = 60.0,
+    lock_timeout: float = 30.0,
+    poll_interval: float = 0.05,
+) -> Callable:
+    """
+    Decorator que memoiza a resposta final (corpo serializado, status e cabeçalhos) de uma view.
+
+    Apenas requisições GET/HEAD são atendidas pelo cache. Respostas em streaming,
+    com Set-Cookie ou fora da faixa 2xx não são armazenadas; erros (4xx/5xx) só
+    com cache_errors=True. Quando uma entrada expira, somente quem obtém a trava
+    no store a recalcula; os demais recebem a versão anterior (por até stale_ttl
+    segundos) ou aguardam o novo valor.
+
+    Args:
+        ttl (float): Tempo, em segundos, em que a entrada é considerada válida.
+        key (Optional[Callable[..., str]]): Função que recebe os argumentos da view e
+            retorna a chave. Padrão: método + caminho completo da requisição.
+        store (Optional[ResponseStore]): Onde guardar as entradas. Padrão: default_store.
+        cache_errors (bool): Se True, também armazena respostas 4xx/5xx.
+        stale_ttl (float): Por quanto tempo, após expirar, a entrada ainda pode ser
+            servida enquanto outro worker a recalcula.
+        lock_timeout (float): Validade da trava de recálculo, em segundos.
+        poll_interval (float): Intervalo entre verificações ao aguardar outro worker.
+    """
+    key_function = key if key is not None else default_key
+
+    def decorator(view: Callable) -> Callable:
+        @functools.wraps(view)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if request.method not in ("GET", "HEAD"):
+                return view(*args, **kwargs)
+
+            response_store = store if store is not None else default_store
+            # O corpo varia com a negociação de formato e de compressão
+            cache_key = (
+                f"{KEY_PREFIX}{key_function(*args, **kwargs)}"
+                f"|{request.headers.get('Accept', '')}|{request.headers.get('Accept-Encoding', '')}"
+            )
+
+            entry = response_store.get(cache_key)
+            if entry is not None and entry.is_fresh():
+                return entry.to_response()
+
+            lock_key = cache_key + ":lock"
+            token = uuid.uuid4().hex
+            if not response_store.add(lock_key, token, lock_timeout):
+                if entry is not None:
+                    return entry.to_response()
+                entry = _wait_for_entry(response_store, cache_key, lock_key, lock_timeout, poll_interval)
+                if entry is not None:
+                    return entry.to_response()
+                if not response_store.add(lock_key, token, lock_timeout):
+                    return _to_response(view(*args, **kwargs))
+
+            try:
+                response = _to_response(view(*args, **kwargs))
+                if isinstance(response, DeferredResponse):
+                    response.encode() # O corpo é necessário para armazenar a entrada
+                if _is_cacheable(response, cache_errors):
+                    body = response.get_data()
+                    headers = [(name, value) for name, value in response.headers.items()]
+                    entry = CachedResponse(body, response.status_code, headers, _now() + ttl)
+                    response_store.set(cache_key, entry, ttl + stale_ttl)
+                return response
+            finally:
+                # Se a trava expirou e foi obtida por outro worker, ela não é mais nossa
+                response_store.delete_if_equal(lock_key, token)
+
+        return wrapper
+
+    return decorator
+
+
+def _to_response(rv: Any) -> Response:
+    if isinstance(rv, ApiResponse):
+        return rv.make_response()
+    if isinstance(rv, Response):
+        return rv
+    return current_app.make_response(rv)
+
+
+def _is_cacheable(response: Response, cache_errors: bool) -> bool:
+    if response.is_streamed or response.direct_passthrough or "Set-Cookie" in response.headers:
+        return False
+    status = response.status_code
+    return 200 <= status < 300 or (cache_errors and status >= 400)
+
+
+def _wait_for_entry(
+    response_store: ResponseStore,
+    cache_key: str,
+    lock_key: str,
+    lock_timeout: float,
+    poll_interval: float,
+) -> Optional[CachedResponse]:
+    """
+    Aguarda outro worker publicar a entrada (ou liberar a trava) por até lock_timeout segundos.
+    """
+    deadline = _now() + lock_timeout
+    while _now() < deadline:
+        time.sleep(poll_interval)
+        entry = response_store.get(cache_key)
+        if entry is not None and entry.is_fresh():
+            return entry
+        if response_store.get(lock_key) is None:
+            return None
+    return None
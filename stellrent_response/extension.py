@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+"""
+Extensão Flask que padroniza as respostas de erro com os envelopes de json_response.
+
+    from stellrent_response.extension import StellrentResponse
+
+    app = Flask(__name__)
+    StellrentResponse(app)
+
+Registra handlers para HTTPException (werkzeug), ValidationError (pydantic) e
+exceções não tratadas, e permite que as views retornem objetos ApiResponse
+diretamente, sem chamar make_response().
+"""
+from flask import Flask, Response, current_app
+from typing import TYPE_CHECKING, Any, Dict, Optional
+from werkzeug.exceptions import HTTPException, default_exceptions
+from werkzeug.http import HTTP_STATUS_CODES
+
+from stellrent_response import json_response
+
+if TYPE_CHECKING:
+    from pydantic import ValidationError
+
+
+class StellrentResponse:
+    """
+    Instala os handlers de erro e o suporte a views que retornam ApiResponse.
+
+    Os corpos constantes ({"message": ..., "status": ...}) de todos os códigos de
+    erro HTTP são serializados uma única vez; um erro como 404 ou 405 custa uma
+    consulta a dicionário mais a cópia dos cabeçalhos da exceção (Allow,
+    WWW-Authenticate, Retry-After...).
+
+    Args:
+        app (Optional[Flask]): A aplicação. Pode ser informada depois, via init_app.
+        handle_exceptions (bool): Se True, exceções não tratadas viram um 500 padronizado
+                                  (e são registradas no logger da aplicação).
+    """
+    def __init__(self, app: Optional[Flask] = None, handle_exceptions: bool = True):
+        self.handle_exceptions = handle_exceptions
+        self._bodies: Dict[int, bytes] = {}
+        self._generation = -1
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: Flask) -> None:
+        self._build_bodies()
+        app.register_error_handler(HTTPException, self.handle_http_exception)
+        try:
+            from pydantic import ValidationError
+        except ImportError: # pydantic é opcional para a extensão
+            pass
+        else:
+            app.register_error_handler(ValidationError, self.handle_validation_error)
+        if self.handle_exceptions:
+            app.register_error_handler(Exception, self.handle_exception)
+        _install_api_response_support(app)
+        app.extensions["stellrent_response"] = self
+
+    def _build_bodies(self) -> None:
+        codes = {code for code in json_response.default_messages if code >= 400}
+        codes.update(code for code in default_exceptions if code >= 400)
+        self._bodies = {code: json_response._encoded_envelope(code, self._message_for(code)) for code in codes}
+        self._generation = json_response._envelope_generation
+
+    @staticmethod
+    def _message_for(code: int) -> str:
+        message = json_response.default_messages.get(code)
+        return message if message is not None else HTTP_STATUS_CODES.get(code, "Error")
+
+    def _body_for(self, code: int, error: HTTPException) -> bytes:
+        if self._generation != json_response._envelope_generation:
+            # default_messages foi alterado em tempo de execução
+            self._build_bodies()
+        description = error.description
+        if description is not None and description != type(error).description:
+            # abort(404, description="...") leva a mensagem customizada ao corpo
+            return json_response._encoded_envelope(code, description)
+        body = self._bodies.get(code)
+        if body is None:
+            body = self._bodies[code] = json_response._encoded_envelope(code, self._message_for(code))
+        return body
+
+    def handle_http_exception(self, error: HTTPException) -> Any:
+        code = error.code
+        if code is None or code < 400:
+            # Redirecionamentos internos do roteamento (ex.: RequestRedirect)
+            return error
+        if json_response._negotiable_formats:
+            description = error.description if error.description != type(error).description else None
+            response = json_response.ErrorResponse(code, message=description or self._message_for(code)).make_response()
+        else:
+            response = _constant_response(self._body_for(code, error), code)
+        for name, value in error.get_headers():
+            if name.lower() != "content-type":
+                response.headers.add(name, value)
+        return response
+
+    def handle_validation_error(self, error: "ValidationError") -> Response:
+        return json_response.BadRequest(validate_exception=error).make_response()
+
+    def handle_exception(self, error: Exception) -> Response:
+        current_app.logger.exception("Unhandled exception: %s", error)
+        if json_response._negotiable_formats:
+            return json_response.ServerError().make_response()
+        if self._generation != json_response._envelope_generation:
+            self._build_bodies()
+        return _constant_response(self._bodies[500], 500)
+
+
+def _constant_response(body: bytes, status_code: int) -> Response:
+    metrics = json_response.get_metrics()
+    if metrics is not None:
+        metrics.record("ErrorResponse", status_code, size=len(body))
+    return Response(body, status=status_code, content_type="application/json")
+
+
+def _install_api_response_support(app: Flask) -> None:
+    """
+    Permite que as views retornem ApiResponse (ou uma tupla iniciada por ele,
+    como (response, headers)) diretamente.
+    """
+    original_make_response = app.make_response
+    if getattr(original_make_response, "_stellrent_response", False):
+        return
+
+    def make_response(rv: Any) -> Response:
+        if isinstance(rv, json_response.ApiResponse):
+            return rv.make_response()
+        if isinstance(rv, tuple) and rv and isinstance(rv[0], json_response.ApiResponse):
+            rv = (rv[0].make_response(),) + rv[1:]
+        return original_make_response(rv)
+
+    make_response._stellrent_response = True
+    app.make_response = make_response
@@ -3,39 +3,749 @@ import logging
 import json
 import uuid # Importa o módulo uuid
 import datetime # Importa o módulo datetime para o encoder
-from flask import Response
-from typing import Any, Dict, List, Optional, Union
+import collections
+import collections.abc
+import dataclasses
+import decimal
+import enum
+import functools
+import gzip
+import hashlib
+import ipaddress
+import math
+import operator
+import os
+import pathlib
+import sys
+import tempfile
+import threading
+import time
+import types
+import typing
+import zlib
+from bisect import bisect_left
+from flask import Response, has_request_context, request, stream_with_context
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from werkzeug.wsgi import FileWrapper, wrap_file
+
+if TYPE_CHECKING: # pydantic é carregado sob demanda (ver _is_pydantic_model_type e _type_adapter)
+    from pydantic import BaseModel, TypeAdapter, ValidationError
+
+class _DefaultMessages(dict):
+    """
+    Dicionário de mensagens padrão que descarta os envelopes pré-serializados
+    sempre que é alterado em tempo de execução.
+    """
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        _clear_envelope_cache()
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        _clear_envelope_cache()
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        _clear_envelope_cache()
+
+    def setdefault(self, key, default=None):
+        value = super().setdefault(key, default)
+        _clear_envelope_cache()
+        return value
+
+    def pop(self, *args):
+        value = super().pop(*args)
+        _clear_envelope_cache()
+        return value
+
+    def popitem(self):
+        item = super().popitem()
+        _clear_envelope_cache()
+        return item
+
+    def clear(self):
+        super().clear()
+        _clear_envelope_cache()
 
 # Dicionário de mensagens padrão para códigos de status HTTP
-default_messages = {
+default_messages = _DefaultMessages({
     200: "Request executed successfully",
     201: "Created",
     204: None,  # No Content has no message body
+    207: "Multi-Status",
     400: "Bad Request",
     401: "Unauthorized",
     403: "Forbidden",
     404: "Resource Not Found",
     405: "Method not allowed",
     500: "Internal Server Error"
-}
+})
+
+# Limites do cache de envelopes pré-serializados ({"message": ..., "status": ...})
+ENVELOPE_CACHE_SIZE = 256
+ENVELOPE_CACHE_MAX_MESSAGE_LENGTH = 256
 
 class CustomJsonEncoder(json.JSONEncoder):
     """
-    Um encoder JSON personalizado que sabe como serializar objetos UUID e datetime.
+    Um encoder JSON personalizado que serializa os tipos do registro de encoders
+    (UUID, datetime, Decimal, Enum, set, dataclasses... ver register_encoder).
+    """
+    def default(self, obj):
+        return _json_default(obj)
+
+# --- Registro de encoders por tipo ---
+
+# Um encoder recebe o objeto e devolve um valor serializável (que pode, por sua
+# vez, conter outros tipos do registro).
+Encoder = Callable[[Any], Any]
+
+_encoders: Dict[type, Encoder] = {}
+# Encoder resolvido (pela MRO) para cada tipo exato já visto; None = não suportado
+_resolved_encoders: Dict[type, Optional[Encoder]] = {}
+# Incrementado a cada alteração do registro (ver CborFormat)
+_encoders_generation = 0
+# Tipos que o orjson serializa sem consultar o registro (com o mesmo resultado dos encoders embutidos)
+_ORJSON_NATIVE_TYPES = (enum.Enum, uuid.UUID)
+
+def register_encoder(obj_type: type, encoder: Optional[Encoder] = None) -> Any:
+    """
+    Registra um encoder para um tipo (e suas subclasses), usado por todas as
+    respostas e formatos. Pode ser usado como decorator:
+
+        @register_encoder(Money)
+        def encode_money(value):
+            return {"amount": str(value.amount), "currency": value.currency}
+
+    O encoder registrado tem precedência sobre a serialização de dataclasses e de
+    modelos pydantic. Tipos que o serializador já conhece nativamente (str, int,
+    float, list, dict e suas subclasses) não passam pelo registro; Enum e UUID são
+    serializados nativamente pelo orjson e por isso não aceitam encoders próprios.
+
+    Args:
+        obj_type (type): O tipo a ser serializado.
+        encoder (Optional[Encoder]): Função que converte o objeto em um valor serializável.
+
+    Returns:
+        O próprio encoder (ou um decorator, se encoder não for informado).
+
+    Raises:
+        TypeError: Se o tipo for Enum, UUID ou uma subclasse deles.
+    """
+    global _encoders_generation
+    if encoder is None:
+        return functools.partial(register_encoder, obj_type)
+    if issubclass(obj_type, _ORJSON_NATIVE_TYPES):
+        # O orjson ignoraria o encoder e a saída passaria a depender do backend
+        raise TypeError(f"Cannot register an encoder for {obj_type.__name__}: it is serialized natively by the orjson backend.")
+    _encoders[obj_type] = encoder
+    _resolved_encoders.clear()
+    _encoders_generation += 1
+    return encoder
+
+def unregister_encoder(obj_type: type) -> None:
+    """
+    Remove o encoder registrado para o tipo, se houver.
+    """
+    global _encoders_generation
+    _encoders.pop(obj_type, None)
+    _resolved_encoders.clear()
+    _encoders_generation += 1
+
+def _registered_encoder(obj_type: type) -> Optional[Encoder]:
+    """
+    O encoder registrado para o tipo (pela MRO), sem os encoders implícitos de
+    dataclasses e modelos pydantic; None se não houver.
+    """
+    for klass in obj_type.__mro__:
+        encoder = _encoders.get(klass)
+        if encoder is not None:
+            return encoder
+    return None
+
+def _resolve_encoder(obj_type: type) -> Optional[Encoder]:
+    encoder = _registered_encoder(obj_type)
+    if encoder is not None:
+        return encoder
+    if dataclasses.is_dataclass(obj_type):
+        return _encode_dataclass
+    if _is_pydantic_model_type(obj_type):
+        return _encode_pydantic_model
+    if obj_type.__module__.partition(".")[0] == "numpy" and "stellrent_response.numpy_encoding" not in sys.modules:
+        # Os encoders do NumPy são registrados quando o primeiro objeto do NumPy aparece
+        from stellrent_response import numpy_encoding # noqa: F401
+        return _resolve_encoder(obj_type)
+    return None
+
+def _json_default(obj: Any) -> Any:
+    """
+    Converte os tipos não nativos usando o registro de encoders. O encoder de
+    cada tipo exato é resolvido pela MRO uma única vez e depois vem do cache.
+    Compartilhado por todos os backends e formatos, para que a saída seja idêntica entre eles.
+    """
+    obj_type = type(obj)
+    try:
+        encoder = _resolved_encoders[obj_type]
+    except KeyError:
+        encoder = _resolved_encoders[obj_type] = _resolve_encoder(obj_type)
+    if encoder is None:
+        raise TypeError(f"Object of type {obj_type.__name__} is not JSON serializable")
+    return encoder(obj)
+
+def _encode_dataclass(obj: Any) -> Dict[str, Any]:
+    # Cópia rasa: os valores dos campos são serializados pelo próprio backend
+    return {field.name: getattr(obj, field.name) for field in dataclasses.fields(obj)}
+
+def _is_pydantic_model_type(obj_type: Any) -> bool:
+    # Não importa o pydantic: se ele não foi carregado, nenhum objeto pode ser um modelo
+    pydantic = sys.modules.get("pydantic")
+    return pydantic is not None and isinstance(obj_type, type) and issubclass(obj_type, pydantic.BaseModel)
+
+def _encode_pydantic_model(obj: "BaseModel") -> Any:
+    # Modelos aninhados em dicts/listas: dump compilado mantendo UUID e datetime
+    return _type_adapter(type(obj))[0].dump_python(obj, mode="python")
+
+def _isoformat(obj: Any) -> str:
+    return obj.isoformat()
+
+# Encoders embutidos (Enum e UUID entram direto: register_encoder os rejeita)
+_encoders[uuid.UUID] = str
+register_encoder(datetime.datetime, _isoformat)
+register_encoder(datetime.date, _isoformat)
+register_encoder(datetime.time, _isoformat)
+register_encoder(datetime.timedelta, datetime.timedelta.total_seconds) # Em segundos
+register_encoder(decimal.Decimal, str) # Texto, para não perder precisão
+_encoders[enum.Enum] = operator.attrgetter("value")
+register_encoder(set, list)
+register_encoder(frozenset, list)
+register_encoder(collections.deque, list)
+register_encoder(pathlib.PurePath, str)
+for _ip_type in (
+    ipaddress.IPv4Address, ipaddress.IPv6Address,
+    ipaddress.IPv4Network, ipaddress.IPv6Network,
+    ipaddress.IPv4Interface, ipaddress.IPv6Interface,
+):
+    register_encoder(_ip_type, str)
+del _ip_type
+
+# --- Backends de serialização JSON ---
+
+class JsonBackend:
+    """
+    Interface dos backends de serialização usados por make_response.
+    Um backend recebe um objeto Python e devolve o JSON já codificado em UTF-8,
+    sempre com separadores compactos.
+    """
+    name: str = "base"
+
+    def dumps(self, obj: Any) -> bytes:
+        raise NotImplementedError
+
+class StdlibJsonBackend(JsonBackend):
+    """
+    Backend baseado no módulo json da biblioteca padrão, com separadores compactos
+    e um único encoder reutilizado entre as chamadas. Como no orjson, NaN e
+    infinitos viram null (o json padrão escreveria NaN/Infinity, que não são JSON válido).
     """
+    name = "stdlib"
+
+    def __init__(self):
+        self._encoder = CustomJsonEncoder(separators=(",", ":"), ensure_ascii=False, allow_nan=False)
+        self._finite_encoder = _FiniteJsonEncoder(separators=(",", ":"), ensure_ascii=False, allow_nan=False)
+
+    def dumps(self, obj: Any) -> bytes:
+        try:
+            return self._encoder.encode(obj).encode("utf-8")
+        except ValueError as error:
+            if not str(error).startswith("Out of range float values"):
+                raise
+            # Caminho raro: só payloads com valores não finitos pagam a cópia sem eles
+            return self._finite_encoder.encode(_without_non_finite(obj)).encode("utf-8")
+
+class _FiniteJsonEncoder(CustomJsonEncoder):
     def default(self, obj):
-        if isinstance(obj, uuid.UUID):
-            return str(obj) # Converte objetos UUID para sua representação em string
-        if isinstance(obj, (datetime.datetime, datetime.date)):
-            return obj.isoformat() # Converte objetos datetime para o formato ISO 8601
-        return json.JSONEncoder.default(self, obj) # Delega para o encoder padrão para outros tipos
+        return _without_non_finite(_json_default(obj))
+
+def _without_non_finite(obj: Any) -> Any:
+    """
+    Cópia de listas/dicionários com NaN e infinitos trocados por None; o restante
+    (inclusive o resultado dos encoders do registro) é tratado pelo _FiniteJsonEncoder.
+    """
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {key: _without_non_finite(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_without_non_finite(value) for value in obj]
+    return obj
+
+class OrjsonBackend(JsonBackend):
+    """
+    Backend nativo baseado no orjson. Datetimes e dataclasses são repassados para
+    _json_default para manter exatamente a saída do registro de encoders.
+    """
+    name = "orjson"
+
+    def __init__(self):
+        import orjson # Dependência opcional; ImportError indica que o backend não está disponível
+        self._dumps = orjson.dumps
+        # Sem OPT_SERIALIZE_NUMPY: arrays aninhados passam pelo registro (numpy_encoding),
+        # como no backend stdlib; o orjson trataria NaT em datetime64 como 1970-01-01.
+        # Dataclasses também passam pelo registro, que pode ter um encoder para elas.
+        self._option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS | orjson.OPT_NON_STR_KEYS
+        self._fallback = StdlibJsonBackend()
+
+    def dumps(self, obj: Any) -> bytes:
+        try:
+            return self._dumps(obj, default=_json_default, option=self._option)
+        except TypeError:
+            # orjson não cobre alguns casos aceitos pela biblioteca padrão
+            # (inteiros maiores que 64 bits, por exemplo).
+            return self._fallback.dumps(obj)
+
+# Backends conhecidos, em ordem de preferência para a seleção automática
+json_backends = {
+    "orjson": OrjsonBackend,
+    "stdlib": StdlibJsonBackend,
+}
+
+_json_backend: Optional[JsonBackend] = None
+
+def set_json_backend(backend: Union[str, JsonBackend, None] = None) -> JsonBackend:
+    """
+    Define o backend de serialização usado por todas as respostas do processo.
+
+    Args:
+        backend (Union[str, JsonBackend, None]): O nome de um backend registrado em
+            json_backends, uma instância de JsonBackend ou None para selecionar
+            automaticamente o primeiro backend disponível.
+
+    Returns:
+        JsonBackend: O backend ativo.
+    """
+    global _json_backend
+    if isinstance(backend, JsonBackend):
+        _json_backend = backend
+    elif backend is not None:
+        if backend not in json_backends:
+            raise ValueError(f"Unknown JSON backend: {backend!r}. Expected one of {list(json_backends)}.")
+        _json_backend = json_backends[backend]()
+    else:
+        for factory in json_backends.values():
+            try:
+                _json_backend = factory()
+                break
+            except ImportError:
+                continue
+    return _json_backend
+
+def get_json_backend() -> JsonBackend:
+    """
+    Retorna o backend de serialização ativo, selecionando-o na primeira chamada.
+    """
+    if _json_backend is None:
+        return set_json_backend()
+    return _json_backend
+
+# --- Formatos de corpo negociáveis via Accept (JSON, MessagePack, CBOR) ---
+
+class ResponseFormat:
+    """
+    Interface dos formatos de corpo das respostas. O envelope (data como corpo,
+    message/details/errors/status e 204 sem corpo) é o mesmo em todos os formatos.
+    """
+    name: str = "base"
+    mimetypes: Tuple[str, ...] = ()
+
+    def dumps(self, obj: Any) -> bytes:
+        raise NotImplementedError
+
+class JsonFormat(ResponseFormat):
+    """
+    Formato padrão. Delega para o backend JSON ativo (ver set_json_backend).
+    """
+    name = "json"
+    mimetypes = ("application/json",)
+
+    def dumps(self, obj: Any) -> bytes:
+        return get_json_backend().dumps(obj)
+
+class MessagePackFormat(ResponseFormat):
+    """
+    MessagePack (requer o pacote opcional 'msgpack').
+    UUID e datetime/date são enviados como texto, no mesmo formato do JSON
+    (str(uuid) e isoformat()).
+    """
+    name = "msgpack"
+    mimetypes = ("application/msgpack", "application/x-msgpack")
+
+    def __init__(self):
+        import msgpack # Dependência opcional
+        self._packb = msgpack.packb
+
+    def dumps(self, obj: Any) -> bytes:
+        return self._packb(obj, default=_json_default, use_bin_type=True)
+
+class CborFormat(ResponseFormat):
+    """
+    CBOR (requer o pacote opcional 'cbor2').
+    UUID usa a tag 37 (16 bytes). datetime com fuso usa a tag 0 com o texto de
+    isoformat(); datetime sem fuso vira texto simples (a tag 0 exige o offset).
+    date usa a tag 1004 (RFC 8943). Os demais tipos do registro de encoders que o
+    cbor2 conhece nativamente (Decimal, set, endereços IP...) passam pelo registro,
+    com a mesma saída do JSON e do MessagePack.
+    """
+    name = "cbor"
+    mimetypes = ("application/cbor",)
+
+    def __init__(self):
+        import cbor2 # Dependência opcional
+        cbor_tag = cbor2.CBORTag
+
+        def encode_datetime(encoder: Any, value: datetime.datetime) -> None:
+            if value.tzinfo is None:
+                encoder.encode(value.isoformat())
+            else:
+                encoder.encode(cbor_tag(0, value.isoformat()))
+
+        self._dumps = cbor2.dumps
+        self._native_encoders = {datetime.datetime: encode_datetime, uuid.UUID: None, datetime.date: None}
+        self._encoders: Dict[type, Any] = {}
+        self._generation = -1
+
+    def dumps(self, obj: Any) -> bytes:
+        if self._generation != _encoders_generation:
+            self._refresh_encoders()
+        return self._dumps(obj, default=_cbor_default, encoders=self._encoders)
+
+    def _refresh_encoders(self) -> None:
+        # O cbor2 procura o tipo exato em 'encoders' antes dos próprios encoders;
+        # subclasses dos tipos nativos já caem no 'default'
+        generation = _encoders_generation
+        encoders = {obj_type: _cbor_default for obj_type in list(_encoders)}
+        for obj_type, encoder in self._native_encoders.items():
+            if encoder is None:
+                encoders.pop(obj_type, None)
+            else:
+                encoders[obj_type] = encoder
+        self._encoders = encoders
+        self._generation = generation
+
+def _cbor_default(encoder: Any, value: Any) -> None:
+    encoder.encode(_json_default(value))
+
+# Formatos conhecidos; JSON é sempre oferecido e é o padrão
+response_formats = {
+    "json": JsonFormat,
+    "msgpack": MessagePackFormat,
+    "cbor": CborFormat,
+}
+
+_JSON_FORMAT = JsonFormat()
+# Formatos negociáveis além do JSON, por mimetype (vazio = apenas JSON, sem negociação)
+_negotiable_formats: Dict[str, ResponseFormat] = {}
+
+def enable_format_negotiation(*names: str) -> Tuple[ResponseFormat, ...]:
+    """
+    Habilita a negociação do formato do corpo pelo cabeçalho Accept.
+
+    Args:
+        *names (str): Os formatos oferecidos além do JSON (ex.: "msgpack", "cbor").
+                      A biblioteca correspondente precisa estar instalada.
+
+    Returns:
+        Tuple[ResponseFormat, ...]: Os formatos oferecidos, com o JSON em primeiro lugar.
+    """
+    global _negotiable_formats
+    formats: Dict[str, ResponseFormat] = {mimetype: _JSON_FORMAT for mimetype in _JSON_FORMAT.mimetypes}
+    for name in names:
+        if name not in response_formats:
+            raise ValueError(f"Unknown response format: {name!r}. Expected one of {list(response_formats)}.")
+        if name == _JSON_FORMAT.name:
+            continue
+        response_format = response_formats[name]()
+        for mimetype in response_format.mimetypes:
+            formats[mimetype] = response_format
+    _negotiable_formats = formats if len(formats) > len(_JSON_FORMAT.mimetypes) else {}
+    return tuple(dict.fromkeys(formats.values()))
+
+def disable_format_negotiation() -> None:
+    """
+    Volta a responder sempre em JSON (comportamento padrão).
+    """
+    global _negotiable_formats
+    _negotiable_formats = {}
+
+def _negotiate_format() -> Tuple[ResponseFormat, str]:
+    """
+    Escolhe o formato do corpo conforme o Accept da requisição atual.
+
+    Returns:
+        Tuple[ResponseFormat, str]: O formato e o mimetype a ser usado no Content-Type.
+    """
+    if not _negotiable_formats or not has_request_context():
+        return _JSON_FORMAT, "application/json"
+    mimetype = request.accept_mimetypes.best_match(_negotiable_formats, default="application/json")
+    return _negotiable_formats[mimetype], mimetype
+
+def _estimate_json_size(obj: Any, depth: int = 0) -> int:
+    """
+    Estimativa barata do tamanho, em bytes, do JSON de um objeto. Listas são
+    estimadas pelo primeiro item e dicionários grandes por amostragem, de modo que
+    o custo não depende do tamanho do payload.
+    """
+    obj_type = type(obj)
+    if obj_type is str:
+        return len(obj) + 2
+    if obj_type is list or obj_type is tuple:
+        if not obj:
+            return 2
+        if depth >= 8:
+            return len(obj) * 16
+        return len(obj) * (_estimate_json_size(obj[0], depth + 1) + 1)
+    if obj_type is dict:
+        if not obj or depth >= 8:
+            return len(obj) * 32 + 2
+        sampled = 0
+        size = 2
+        for key, value in obj.items():
+            size += len(str(key)) + 4 + _estimate_json_size(value, depth + 1)
+            sampled += 1
+            if sampled == 64:
+                return size * len(obj) // sampled
+        return size
+    if obj_type is bytes or obj_type is bytearray or obj_type is memoryview:
+        return len(obj)
+    if _is_numpy_array(obj):
+        return obj.nbytes * 2
+    return 16
+
+def _is_numpy_array(obj: Any) -> bool:
+    # Não importa o NumPy: se ele não foi carregado, o objeto não pode ser um array
+    numpy = sys.modules.get("numpy")
+    return numpy is not None and isinstance(obj, numpy.ndarray)
+
+# --- Serialização nativa de modelos pydantic ---
+
+# Um TypeAdapter por tipo, junto com a indicação de que dump_json é seguro.
+# None registra tipos para os quais o pydantic não consegue gerar um schema.
+_type_adapters: Dict[Any, Optional[Tuple["TypeAdapter", bool]]] = {}
+
+# Tipos de schema cuja saída JSON do pydantic difere de _json_default
+# (datetimes em UTC viram "Z" em vez de "+00:00", timedelta vira duração ISO 8601
+# em vez de segundos; "any" é inferido em tempo de execução).
+_NON_NATIVE_SCHEMA_TYPES = frozenset(("datetime", "timedelta", "any", "function-plain", "function-wrap"))
+
+def _schema_is_native_json(schema: Any) -> bool:
+    """
+    Indica se o dump_json do pydantic produz, para o schema informado, exatamente
+    o mesmo JSON que os backends (UUID e date já são idênticos; datetime não).
+    """
+    if isinstance(schema, dict):
+        if schema.get("type") in _NON_NATIVE_SCHEMA_TYPES:
+            return False
+        return all(_schema_is_native_json(value) for value in schema.values())
+    if isinstance(schema, (list, tuple)):
+        return all(_schema_is_native_json(value) for value in schema)
+    return True
+
+def _type_adapter(annotation: Any) -> Optional[Tuple["TypeAdapter", bool]]:
+    try:
+        return _type_adapters[annotation]
+    except KeyError:
+        pass
+    try:
+        # Primeiro uso do pydantic: só acontece quando já há um modelo pydantic em mãos
+        from pydantic import PydanticSchemaGenerationError, TypeAdapter
+    except ImportError:
+        _type_adapters[annotation] = None
+        return None
+    try:
+        adapter = TypeAdapter(annotation)
+        cached = (adapter, _schema_is_native_json(adapter.core_schema))
+    except PydanticSchemaGenerationError:
+        cached = None
+    _type_adapters[annotation] = cached
+    return cached
+
+def _pydantic_annotation(obj: Any) -> Optional[Any]:
+    """
+    Retorna o tipo a ser usado pelo TypeAdapter quando o objeto é um modelo pydantic
+    ou uma lista/tupla homogênea deles; caso contrário, None. Dataclasses comuns
+    ficam no registro de encoders (sem importar o pydantic), assim como modelos
+    com um encoder registrado.
+    """
+    obj_type = type(obj)
+    if _is_pydantic_model_type(obj_type):
+        return obj_type if _registered_encoder(obj_type) is None else None
+    if (obj_type is list or obj_type is tuple) and obj:
+        item_type = type(obj[0])
+        if _is_pydantic_model_type(item_type) and _registered_encoder(item_type) is None:
+            if all(type(item) is item_type for item in obj):
+                return List[item_type] if obj_type is list else Tuple[item_type, ...]
+    return None
+
+def _dumps_data(
+    data: Any,
+    response_format: ResponseFormat = _JSON_FORMAT,
+    fields: Optional["FieldSelection"] = None
+) -> bytes:
+    """
+    Serializa o corpo de uma resposta com dados. Modelos pydantic passam pelo
+    serializador compilado do pydantic, sem model_dump() intermediário.
+    Com 'fields', apenas os campos selecionados são serializados.
+    """
+    annotation = _pydantic_annotation(data)
+    cached = _type_adapter(annotation) if annotation is not None else None
+    if cached is None:
+        return response_format.dumps(data if fields is None else _project(data, fields))
+    adapter, native_json = cached
+    include = None if fields is None else _pydantic_include(annotation, fields)
+    if native_json and response_format is _JSON_FORMAT:
+        return adapter.dump_json(data, include=include)
+    return response_format.dumps(adapter.dump_python(data, mode="python", include=include))
+
+# --- Seleção de campos (sparse fieldsets) ---
+
+# Árvore imutável de campos: ((nome, True | subárvore), ...), na ordem pedida.
+# Por ser hashable, serve de chave para o cache de 'include' do pydantic.
+FieldSelection = Tuple[Tuple[str, Any], ...]
+
+FIELDS_MAX_PATHS = 256 # Limite de caminhos aceitos em uma seleção (vinda de query string)
+
+def parse_fields(spec: Union[str, Iterable[str]]) -> FieldSelection:
+    """
+    Converte uma seleção como "id,name,address.city" em uma FieldSelection.
+    Selecionar um campo inteiro ("address") prevalece sobre seus subcampos.
+
+    Args:
+        spec (Union[str, Iterable[str]]): Caminhos separados por vírgula, ou uma lista de caminhos.
+
+    Raises:
+        ValueError: Se algum caminho tiver segmentos vazios ("a..b") ou houver
+                    mais de FIELDS_MAX_PATHS caminhos.
+    """
+    paths = spec.split(",") if isinstance(spec, str) else list(spec)
+    if len(paths) > FIELDS_MAX_PATHS:
+        raise ValueError(f"Too many fields selected (maximum is {FIELDS_MAX_PATHS}).")
+    tree: Dict[str, Any] = {}
+    for path in paths:
+        path = path.strip()
+        if not path:
+            continue
+        segments = path.split(".")
+        if not all(segments):
+            raise ValueError(f"Invalid field path: {path!r}")
+        node = tree
+        for segment in segments[:-1]:
+            child = node.get(segment)
+            if child is True:
+                break
+            if child is None:
+                child = node[segment] = {}
+            node = child
+        else:
+            node[segments[-1]] = True
+    return _freeze_fields(tree)
+
+def _freeze_fields(tree: Dict[str, Any]) -> FieldSelection:
+    return tuple((name, True if sub is True else _freeze_fields(sub)) for name, sub in tree.items())
+
+def requested_fields(parameter: str = "fields") -> Optional[FieldSelection]:
+    """
+    Lê a seleção de campos da query string da requisição atual (ex.: ?fields=id,name).
+
+    Returns:
+        Optional[FieldSelection]: A seleção, ou None se o parâmetro estiver ausente ou vazio.
+    """
+    value = request.args.get(parameter)
+    if not value:
+        return None
+    return parse_fields(value) or None
+
+def _project(value: Any, fields: FieldSelection) -> Any:
+    """
+    Projeta os campos selecionados de dicionários (e listas deles) sem copiar o
+    restante do registro: o custo é proporcional aos campos pedidos. Modelos
+    pydantic aninhados usam o 'include' do próprio pydantic; dataclasses e modelos
+    com um encoder registrado são projetados sobre a saída do encoder.
+    """
+    if isinstance(value, dict):
+        return {
+            name: value[name] if sub is True else _project(value[name], sub)
+            for name, sub in fields
+            if name in value
+        }
+    if isinstance(value, (list, tuple)):
+        return [_project(item, fields) for item in value]
+    value_type = type(value)
+    if dataclasses.is_dataclass(value_type) or _is_pydantic_model_type(value_type):
+        encoder = _registered_encoder(value_type)
+        if encoder is not None:
+            return _project(encoder(value), fields)
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        names = {field.name for field in dataclasses.fields(value)}
+        return {
+            name: getattr(value, name) if sub is True else _project(getattr(value, name), sub)
+            for name, sub in fields
+            if name in names
+        }
+    annotation = _pydantic_annotation(value)
+    if annotation is not None:
+        cached = _type_adapter(annotation)
+        if cached is not None:
+            return cached[0].dump_python(value, mode="python", include=_pydantic_include(annotation, fields))
+    return value
+
+_SEQUENCE_ORIGINS = (list, tuple, set, frozenset, collections.abc.Sequence, collections.abc.Set)
+_MAPPING_ORIGINS = (dict, collections.abc.Mapping)
+# types.UnionType (X | Y) só existe a partir do Python 3.10
+_UNION_ORIGINS = (Union, types.UnionType) if hasattr(types, "UnionType") else (Union,)
+
+@functools.lru_cache(maxsize=256)
+def _pydantic_include(annotation: Any, fields: FieldSelection) -> Dict[Any, Any]:
+    """
+    Traduz a seleção para o 'include' do pydantic, que exige "__all__" nas
+    posições de listas e dicionários (descobertas pelas anotações dos campos).
+    """
+    origin = typing.get_origin(annotation)
+    if origin in _UNION_ORIGINS:
+        members = [arg for arg in typing.get_args(annotation) if arg is not type(None)]
+        if len(members) == 1:
+            return _pydantic_include(members[0], fields)
+        annotation, origin = Any, None
+    if origin in _SEQUENCE_ORIGINS:
+        args = typing.get_args(annotation)
+        return {"__all__": _pydantic_include(args[0] if args else Any, fields)}
+    if origin in _MAPPING_ORIGINS:
+        args = typing.get_args(annotation)
+        return {"__all__": _pydantic_include(args[1] if len(args) == 2 else Any, fields)}
+
+    if _is_pydantic_model_type(annotation):
+        hints = {name: info.annotation for name, info in annotation.model_fields.items()}
+    elif isinstance(annotation, type) and dataclasses.is_dataclass(annotation):
+        hints = typing.get_type_hints(annotation)
+    else:
+        hints = {}
+    return {
+        name: True if sub is True else _pydantic_include(hints.get(name, Any), sub)
+        for name, sub in fields
+    }
 
 class ApiResponse: # Renomeado de DefaultResponse para clareza
     """
     Classe base para padronizar as respostas da API Flask.
     Define a estrutura comum para respostas de sucesso e erro.
+
+    As subclasses chamam ApiResponse.__init__ diretamente, com argumentos
+    posicionais (status_code, message, data, details, errors, logger), para
+    que a construção de uma resposta custe um único frame adicional.
     """
-    _logger: logging.Logger
+    # Os campos ficam em __slots__; subclasses declaram apenas os campos extras. O
+    # "__dict__" mantém a atribuição de atributos arbitrários das classes originais,
+    # e o dicionário só é criado quando um desses atributos é atribuído.
+    __slots__ = ("_logger", "_status_code", "_message", "_data", "_details", "_errors", "_etag_version", "__dict__")
+
+    _logger: Optional[logging.Logger] # Resolvido sob demanda pela propriedade 'logger'
     _status_code: int
     _message: Optional[str]
     _data: Optional[Any] # Representa o 'response_data' original
@@ -64,21 +774,24 @@ class ApiResponse: # Renomeado de DefaultResponse para clareza
             errors (Optional[List[Dict]]): Lista de erros específicos (útil para erros de validação).
             logger (Optional[logging.Logger]): Uma instância de logger para uso interno.
         """
-        if logger and isinstance(logger, logging.Logger):
-            self._logger = logger
-        else:
-            self._logger = logging.getLogger(self.__class__.__name__)
-            if logger is not None: # A logger was provided but was invalid
-                self._logger.warning(
+        # O logger padrão só é obtido (logging.getLogger usa um lock global) quando usado.
+        self._logger = None
+        if logger is not None:
+            if isinstance(logger, logging.Logger):
+                self._logger = logger
+            else: # A logger was provided but was invalid
+                default_logger = self.logger
+                default_logger.warning(
                     f"Invalid logger type: {type(logger)}. Expected {logging.Logger}. "
-                    f"Using default logger '{self._logger.name}'."
+                    f"Using default logger '{default_logger.name}'."
                 )
-        
+
         self._status_code = status_code
         self._message = message if message is not None else default_messages.get(status_code)
         self._data = data
         self._details = details
         self._errors = errors # Armazena os erros para serem incluídos, se aplicável
+        self._etag_version = _NO_ETAG # Habilitado por with_etag()
 
     def make_response(self) -> Response:
         """
@@ -88,22 +801,214 @@ class ApiResponse: # Renomeado de DefaultResponse para clareza
         Returns:
             Response: O objeto de resposta do Flask.
         """
+        metrics = _metrics
         if self._status_code == 204:
+            if metrics is not None:
+                metrics.record(self.__class__.__name__, 204)
             # HTTP 204 No Content responses must not include a message-body
             # or a Content-Type header.
             return Response(status=204, mimetype="")
 
+        response_format, mimetype = self._negotiate()
+
+        etag = None
+        etag_version = self._etag_version
+        if etag_version is not _NO_ETAG and 200 <= self._status_code < 300:
+            if etag_version is not _ETAG_FROM_BODY:
+                # Com uma chave de versão, o 304 sai antes de qualquer serialização.
+                etag = _version_etag(self._status_code, etag_version, response_format)
+                known_etag = _matching_etag(etag)
+                if known_etag is not None:
+                    if metrics is not None:
+                        metrics.record(self.__class__.__name__, 304)
+                    return _not_modified_response(known_etag)
+
+        if _deferred and etag_version is not _ETAG_FROM_BODY:
+            # O ETag do corpo precisa dos bytes antes dos cabeçalhos; nesse caso a serialização é imediata
+            return DeferredResponse(self, response_format, mimetype, etag)
+        return self._encoded_response(response_format, mimetype, etag)
+
+    def _encoded_response(self, response_format: ResponseFormat, mimetype: str, etag: Optional[str]) -> Response:
+        """
+        Serializa o corpo e monta o Response (caminho imediato de make_response;
+        DeferredResponse o executa quando o corpo é de fato necessário).
+        """
+        metrics = _metrics
+        etag_version = self._etag_version
+        spill = _spill
+        if (
+            spill is not None
+            and self._data is not None
+            and response_format is _JSON_FORMAT
+            and spill.should_spill(self._data)
+        ):
+            return self._spilled_response(spill, etag)
+
+        if metrics is None:
+            json_response_payload, cached = self._encode_body(response_format)
+        else:
+            started = time.perf_counter()
+            json_response_payload, cached = self._encode_body(response_format)
+            seconds = time.perf_counter() - started
+
+        if etag_version is _ETAG_FROM_BODY and 200 <= self._status_code < 300:
+            etag = _body_etag(json_response_payload)
+            known_etag = _matching_etag(etag)
+            if known_etag is not None:
+                if metrics is not None:
+                    # O corpo foi serializado, mas a resposta enviada é o 304, sem corpo
+                    metrics.record(self.__class__.__name__, 304, seconds)
+                return _not_modified_response(known_etag)
+
+        if metrics is not None:
+            metrics.record(self.__class__.__name__, self._status_code, seconds, len(json_response_payload))
+        return self._build_response(json_response_payload, cached, etag, mimetype)
+
+    def _spilled_response(self, spill: "SpillSettings", etag: Optional[str]) -> Response:
+        """
+        Codifica o corpo em um arquivo temporário e o envia a partir do disco,
+        com Content-Length. O arquivo é removido quando a resposta é fechada.
+        """
+        started = time.perf_counter()
+        file = tempfile.SpooledTemporaryFile(max_size=spill.memory_limit, dir=spill.directory)
+        try:
+            writer = _SpillWriter(file, spill.chunk_size)
+            _spill_json(writer, self._data, get_json_backend().dumps, self._selected_fields())
+            writer.flush()
+            seconds = time.perf_counter() - started
+            if self._etag_version is _ETAG_FROM_BODY and 200 <= self._status_code < 300:
+                etag = writer.digest.hexdigest()
+                known_etag = _matching_etag(etag)
+                if known_etag is not None:
+                    file.close()
+                    if _metrics is not None:
+                        _metrics.record(self.__class__.__name__, 304, seconds)
+                    return _not_modified_response(known_etag)
+            if _metrics is not None:
+                _metrics.record(self.__class__.__name__, self._status_code, seconds, writer.size)
+            file.seek(0)
+            body = wrap_file(request.environ, file, spill.chunk_size) if has_request_context() else FileWrapper(file, spill.chunk_size)
+        except BaseException:
+            file.close()
+            raise
+
+        headers = {"Vary": "Accept"} if _negotiable_formats else None
+        response = Response(body, status=self._status_code, content_type="application/json", headers=headers, direct_passthrough=True)
+        response.content_length = writer.size
+        if etag is not None:
+            response.headers["ETag"] = f'"{etag}"'
+        return response
+
+    def _measured_body_size(self, response_format: ResponseFormat) -> Optional[int]:
+        """
+        Tamanho do corpo serializado, calculado item a item sem montar o corpo inteiro
+        (usado em requisições HEAD). None quando só a serialização completa dá o tamanho.
+        """
+        data = self._data
+        if (
+            data is None
+            or response_format is not _JSON_FORMAT
+            or _is_numpy_array(data)
+            or _pydantic_annotation(data) is not None
+        ):
+            return None
+        counter = _LengthCounter()
+        _spill_json(counter, data, get_json_backend().dumps, self._selected_fields())
+        return counter.size
+
+    def _selected_fields(self) -> Optional["FieldSelection"]:
+        """
+        A seleção de campos aplicada a 'data' (ver DataResponse); None = todos.
+        """
+        return None
+
+    def with_etag(self, version: Optional[Union[str, int]] = None) -> "ApiResponse":
+        """
+        Habilita ETag forte e o tratamento de If-None-Match (304) para respostas 2xx.
+
+        Args:
+            version (Optional[Union[str, int]]): Uma chave de versão do recurso. Se
+                informada, o ETag é derivado dela e o corpo nem chega a ser serializado
+                quando o cliente já possui a versão. Se None, o ETag é um hash do corpo.
+
+        Returns:
+            ApiResponse: A própria instância, para encadeamento
+                         (return DataResponse(data).with_etag(version).make_response()).
+        """
+        self._etag_version = _ETAG_FROM_BODY if version is None else version
+        return self
+
+    def _negotiate(self) -> Tuple[ResponseFormat, str]:
+        """
+        Escolhe o formato do corpo; subclasses com corpo fixo em JSON sobrescrevem.
+        """
+        return _negotiate_format()
+
+    def _encode_body(self, response_format: ResponseFormat = _JSON_FORMAT) -> Tuple[bytes, bool]:
+        """
+        Serializa o corpo da resposta no formato informado (JSON por padrão).
+
+        Returns:
+            Tuple[bytes, bool]: O corpo em bytes e se ele veio do cache de envelopes
+                                (bytes reaproveitados entre respostas).
+        """
         # --- Lógica para Respeitar o Contrato Original ---
         # Se 'data' foi fornecido, ele se torna o corpo JSON completo.
         if self._data is not None:
-            json_response_payload = json.dumps(self._data, cls=CustomJsonEncoder)
-            response = Response(
-                content_type="application/json",
-                status=self._status_code,
-                response=json_response_payload
-            )
-            return response
-        
+            return _dumps_data(self._data, response_format), False
+
+        # Envelopes sem 'details' (e sem 'errors') são constantes e vêm do cache de bytes.
+        if self._details is None and (self._errors is None or self._status_code < 400):
+            return _encoded_envelope(self._status_code, self._message, response_format), True
+
+        return response_format.dumps(self._envelope_body()), False
+
+    def _body_value(self) -> Any:
+        """
+        O corpo da resposta como objeto Python (antes da serialização), usado
+        quando a resposta é embutida em outra (ex.: MultiStatusResponse).
+        """
+        if self._data is not None:
+            return self._data
+        return self._envelope_body()
+
+    def _build_response(
+        self,
+        body: bytes,
+        cached: bool,
+        etag: Optional[str] = None,
+        mimetype: str = "application/json"
+    ) -> Response:
+        """
+        Cria o Flask Response para um corpo já serializado, aplicando a
+        compressão negociada quando habilitada.
+        """
+        headers = None
+        if _compression is not None:
+            body, headers = _compression.apply(body, cached)
+        if _negotiable_formats:
+            if headers is None:
+                headers = {}
+            vary = headers.get("Vary")
+            headers["Vary"] = f"Accept, {vary}" if vary else "Accept"
+        if etag is not None:
+            if headers is None:
+                headers = {}
+            encoding = headers.get("Content-Encoding")
+            # Cada representação (comprimida ou não) recebe um ETag forte distinto
+            headers["ETag"] = f'"{etag}-{encoding}"' if encoding else f'"{etag}"'
+        return Response(
+            content_type=mimetype,
+            status=self._status_code,
+            response=body,
+            headers=headers
+        )
+
+    def _envelope_body(self) -> Dict[str, Any]:
+        """
+        Monta o corpo estruturado (message, details, errors e status) usado
+        quando a resposta não possui 'data'.
+        """
         # Caso 'data' seja None, constrói o corpo da resposta com 'message', 'details' e 'status'.
         response_body: Dict[str, Any] = {}
         
@@ -124,17 +1029,16 @@ class ApiResponse: # Renomeado de DefaultResponse para clareza
         elif self._status_code >= 400:
             fallback_message = default_messages.get(self._status_code, "Error")
             response_body = {"message": fallback_message, "status": self._status_code}
-            
-        json_response_payload = json.dumps(response_body, cls=CustomJsonEncoder)
-
-        response = Response(
-            content_type="application/json",
-            status=self._status_code,
-            response=json_response_payload
-        )
-        return response
+        return response_body
     
     # Propriedades de leitura para os atributos internos (boa prática)
+    @property
+    def logger(self) -> logging.Logger:
+        logger = self._logger
+        if logger is None:
+            logger = self._logger = logging.getLogger(self.__class__.__name__)
+        return logger
+
     @property
     def status_code(self) -> int:
         return self._status_code
@@ -155,31 +1059,675 @@ class ApiResponse: # Renomeado de DefaultResponse para clareza
     def errors(self) -> Optional[List[Dict]]:
         return self._errors
 
+def _encoded_envelope(
+    status_code: int,
+    message: Optional[str],
+    response_format: ResponseFormat = _JSON_FORMAT
+) -> bytes:
+    """
+    Retorna os bytes do envelope {"message": ..., "status": ...}, reaproveitando
+    o cache para mensagens padrão e mensagens customizadas curtas.
+    """
+    if message is None and status_code >= 400:
+        message = default_messages.get(status_code, "Error")
+    # Para JSON a chave é o backend ativo, para que trocar de backend não sirva bytes antigos
+    encoder = get_json_backend() if response_format is _JSON_FORMAT else response_format
+    if message is None or (type(message) is str and len(message) <= ENVELOPE_CACHE_MAX_MESSAGE_LENGTH):
+        return _cached_envelope(status_code, message, encoder)
+    return encoder.dumps({"message": message, "status": status_code})
+
+@functools.lru_cache(maxsize=ENVELOPE_CACHE_SIZE)
+def _cached_envelope(status_code: int, message: Optional[str], encoder: Union[JsonBackend, ResponseFormat]) -> bytes:
+    if message is None:
+        return encoder.dumps({})
+    return encoder.dumps({"message": message, "status": status_code})
+
+# Incrementado a cada invalidação, para que caches externos (ex.: StellrentResponse) se reconstruam
+_envelope_generation = 0
+
+def _clear_envelope_cache() -> None:
+    global _envelope_generation
+    _envelope_generation += 1
+    _cached_envelope.cache_clear()
+    _cached_compress.cache_clear()
+
+# --- ETag e requisições condicionais ---
+
+# Sentinelas do slot _etag_version
+_NO_ETAG = object()
+_ETAG_FROM_BODY = object()
+
+def _version_etag(status_code: int, version: Any, response_format: ResponseFormat) -> str:
+    key = f"{status_code}:{response_format.name}:{version}".encode("utf-8")
+    return "v" + hashlib.blake2b(key, digest_size=16).hexdigest()
+
+def _body_etag(body: bytes) -> str:
+    return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+def _matching_etag(etag: str) -> Optional[str]:
+    """
+    Procura o ETag no If-None-Match da requisição atual (apenas GET/HEAD), em
+    qualquer uma de suas representações (ex.: "<etag>-gzip").
+
+    Returns:
+        Optional[str]: O ETag conhecido pelo cliente, ou None se ele precisa do corpo.
+    """
+    if not has_request_context() or request.method not in ("GET", "HEAD"):
+        return None
+    if_none_match = request.if_none_match
+    if not if_none_match:
+        return None
+    if if_none_match.star_tag:
+        return etag
+    prefix = etag + "-"
+    for tag in if_none_match.as_set(include_weak=True):
+        if tag == etag or tag.startswith(prefix):
+            return tag
+    return None
+
+def _not_modified_response(etag: str) -> Response:
+    response = Response(status=304, mimetype="")
+    response.headers["ETag"] = f'"{etag}"'
+    return response
+
+# --- Compressão negociada via Accept-Encoding ---
+
+class CompressionSettings:
+    """
+    Configuração da compressão opcional das respostas (gzip/deflate da biblioteca padrão).
+    Corpos menores que min_size nunca são comprimidos nem consultam a requisição.
+    """
+    __slots__ = ("min_size", "level", "encodings")
+
+    def __init__(self, min_size: int = 1024, level: int = 6, encodings: Tuple[str, ...] = ("gzip", "deflate")):
+        unknown = [encoding for encoding in encodings if encoding not in _COMPRESSORS]
+        if unknown:
+            raise ValueError(f"Unsupported encodings: {unknown}. Expected any of {list(_COMPRESSORS)}.")
+        self.min_size = min_size
+        self.level = level
+        self.encodings = tuple(encodings)
+
+    def apply(self, body: bytes, cached: bool = False) -> Tuple[bytes, Optional[Dict[str, str]]]:
+        """
+        Comprime o corpo conforme o Accept-Encoding da requisição atual.
+
+        Args:
+            body (bytes): O corpo serializado.
+            cached (bool): Se o corpo vem do cache de envelopes; nesse caso a versão
+                           comprimida também é guardada e reaproveitada.
+
+        Returns:
+            Tuple[bytes, Optional[Dict[str, str]]]: O corpo (comprimido ou não) e os
+                cabeçalhos Content-Encoding/Vary a serem adicionados.
+        """
+        if len(body) < self.min_size or not has_request_context():
+            return body, None
+        headers = {"Vary": "Accept-Encoding"}
+        encoding = request.accept_encodings.best_match(self.encodings)
+        if encoding is None:
+            return body, headers
+        if cached:
+            body = _cached_compress(body, encoding, self.level)
+        else:
+            body = _COMPRESSORS[encoding](body, self.level)
+        headers["Content-Encoding"] = encoding
+        return body, headers
+
+_COMPRESSORS = {
+    "gzip": lambda body, level: gzip.compress(body, compresslevel=level, mtime=0),
+    "deflate": lambda body, level: zlib.compress(body, level),
+}
+
+_compression: Optional[CompressionSettings] = None
+
+def enable_compression(
+    min_size: int = 1024,
+    level: int = 6,
+    encodings: Tuple[str, ...] = ("gzip", "deflate"),
+) -> CompressionSettings:
+    """
+    Habilita a compressão negociada para todas as respostas do processo.
+
+    Args:
+        min_size (int): Tamanho mínimo do corpo, em bytes, para aplicar compressão.
+        level (int): Nível de compressão (1 a 9).
+        encodings (Tuple[str, ...]): Codificações oferecidas, em ordem de preferência.
+
+    Returns:
+        CompressionSettings: A configuração ativa.
+    """
+    global _compression
+    _compression = CompressionSettings(min_size=min_size, level=level, encodings=encodings)
+    return _compression
+
+def disable_compression() -> None:
+    """
+    Desabilita a compressão das respostas (comportamento padrão).
+    """
+    global _compression
+    _compression = None
+
+@functools.lru_cache(maxsize=ENVELOPE_CACHE_SIZE)
+def _cached_compress(body: bytes, encoding: str, level: int) -> bytes:
+    return _COMPRESSORS[encoding](body, level)
+
+# --- Serialização em disco para payloads muito grandes ---
+
+class SpillSettings:
+    """
+    Configuração do envio de corpos grandes a partir do disco.
+
+    Respostas com 'data' cujo tamanho estimado atinge memory_limit são
+    codificadas incrementalmente (item a item, até SPILL_MAX_DEPTH níveis de
+    listas/dicionários) em um SpooledTemporaryFile e enviadas em streaming com
+    Content-Length. Esse caminho vale apenas para JSON e não aplica compressão;
+    respostas menores seguem o caminho em memória.
+    """
+    __slots__ = ("memory_limit", "chunk_size", "directory")
+
+    def __init__(self, memory_limit: int = 64 * 1024 * 1024, chunk_size: int = 1024 * 1024, directory: Optional[str] = None):
+        self.memory_limit = memory_limit
+        self.chunk_size = chunk_size
+        self.directory = directory
+
+    def should_spill(self, data: Any) -> bool:
+        if _is_numpy_array(data): # Arrays já são codificados em bloco (ver numpy_encoding)
+            return False
+        return _estimate_json_size(data) >= self.memory_limit
+
+# Profundidade de listas/dicionários percorrida pela codificação incremental
+SPILL_MAX_DEPTH = 2
+
+_spill: Optional[SpillSettings] = None
+
+def enable_spill_to_disk(
+    memory_limit: int = 64 * 1024 * 1024,
+    chunk_size: int = 1024 * 1024,
+    directory: Optional[str] = None,
+) -> SpillSettings:
+    """
+    Habilita a serialização em disco para corpos grandes.
+
+    Args:
+        memory_limit (int): Tamanho estimado do corpo, em bytes, a partir do qual ele é
+                            codificado em um arquivo temporário (e não em memória).
+        chunk_size (int): Tamanho aproximado, em bytes, de cada escrita no arquivo.
+        directory (Optional[str]): Diretório dos arquivos temporários (padrão do sistema).
+
+    Returns:
+        SpillSettings: A configuração ativa.
+    """
+    global _spill
+    _spill = SpillSettings(memory_limit=memory_limit, chunk_size=chunk_size, directory=directory)
+    return _spill
+
+def disable_spill_to_disk() -> None:
+    """
+    Volta a serializar todos os corpos em memória (comportamento padrão).
+    """
+    global _spill
+    _spill = None
+
+class _SpillWriter:
+    """
+    Acumula os trechos codificados e os grava no arquivo em blocos de chunk_size,
+    calculando o hash do corpo (para o ETag) durante a escrita.
+    """
+    __slots__ = ("file", "chunk_size", "buffer", "size", "digest")
+
+    def __init__(self, file: Any, chunk_size: int):
+        self.file = file
+        self.chunk_size = chunk_size
+        # Um bytearray, e não uma lista de trechos: cada bytes do orjson reserva ao
+        # menos ~1 KiB, e milhares de trechos pequenos multiplicariam o uso de memória.
+        self.buffer = bytearray()
+        self.size = 0
+        self.digest = hashlib.blake2b(digest_size=16)
+
+    def write(self, data: bytes) -> None:
+        self.buffer += data
+        if len(self.buffer) >= self.chunk_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if self.buffer:
+            self.file.write(self.buffer)
+            self.digest.update(self.buffer)
+            self.size += len(self.buffer)
+            self.buffer = bytearray()
+
+class _LengthCounter:
+    """
+    Writer de _spill_json que apenas soma o tamanho dos trechos.
+    """
+    __slots__ = ("size",)
+
+    def __init__(self):
+        self.size = 0
+
+    def write(self, data: bytes) -> None:
+        self.size += len(data)
+
+def _spill_json(
+    writer: Union[_SpillWriter, _LengthCounter],
+    value: Any,
+    dumps: Callable[[Any], bytes],
+    fields: Optional["FieldSelection"] = None,
+    depth: int = 0
+) -> None:
+    """
+    Codifica 'value' no writer, item a item nos primeiros níveis, de modo que a
+    memória usada seja proporcional ao maior item e não ao corpo inteiro.
+    """
+    if depth < SPILL_MAX_DEPTH:
+        if type(value) is dict and all(type(key) is str for key in value):
+            writer.write(b"{")
+            if fields is None:
+                items = ((key, item, None) for key, item in value.items())
+            else:
+                items = ((name, value[name], None if sub is True else sub) for name, sub in fields if name in value)
+            first = True
+            for key, item, item_fields in items:
+                if not first:
+                    writer.write(b",")
+                first = False
+                writer.write(dumps(key))
+                writer.write(b":")
+                _spill_json(writer, item, dumps, item_fields, depth + 1)
+            writer.write(b"}")
+            return
+        if type(value) is list or type(value) is tuple:
+            writer.write(b"[")
+            first = True
+            for item in value:
+                if not first:
+                    writer.write(b",")
+                first = False
+                _spill_json(writer, item, dumps, fields, depth + 1)
+            writer.write(b"]")
+            return
+    writer.write(dumps(value if fields is None else _project(value, fields)))
+
+# --- Serialização adiada ---
+
+_deferred = False
+
+def enable_deferred_serialization() -> None:
+    """
+    Faz make_response() retornar um DeferredResponse: o corpo só é serializado
+    quando o servidor WSGI (ou quem chamar get_data()) precisa dele. Respostas
+    descartadas por um after_request, ou de requisições HEAD, não pagam a serialização.
+    """
+    global _deferred
+    _deferred = True
+
+def disable_deferred_serialization() -> None:
+    """
+    Volta a serializar o corpo dentro de make_response() (comportamento padrão).
+    """
+    global _deferred
+    _deferred = False
+
+class _DeferredBody:
+    """
+    Corpo de um DeferredResponse ainda não serializado; iterá-lo dispara a serialização.
+    """
+    __slots__ = ("owner",)
+
+    def __init__(self, owner: "DeferredResponse"):
+        self.owner = owner
+
+    def __iter__(self) -> Iterator[bytes]:
+        self.owner.encode()
+        return iter(self.owner.response)
+
+class DeferredResponse(Response):
+    """
+    Response cujo corpo é serializado apenas quando necessário: quando o servidor
+    WSGI pede os cabeçalhos (o Content-Length depende do corpo), quando o corpo é
+    lido (get_data(), data, json) ou quando encode() é chamado.
+
+    Middlewares e hooks after_request podem consultar api_response (status_code,
+    message, details...) sem custo de serialização. Em requisições HEAD sem
+    compressão, o Content-Length de corpos com 'data' é calculado item a item,
+    sem montar o corpo. Os cabeçalhos que dependem do corpo (Content-Length,
+    Content-Encoding e, com compressão, ETag) só existem após a serialização;
+    as métricas também são registradas nesse momento.
+    """
+    def __init__(self, api_response: ApiResponse, response_format: ResponseFormat, mimetype: str, etag: Optional[str]):
+        headers = {"Vary": "Accept"} if _negotiable_formats else None
+        super().__init__(status=api_response._status_code, content_type=mimetype, headers=headers)
+        if etag is not None and _compression is None:
+            # Com compressão, o ETag ganha o sufixo da codificação escolhida (ver _build_response)
+            self.headers["ETag"] = f'"{etag}"'
+        self.api_response = api_response
+        self._response_format = response_format
+        self._etag = etag
+        self.response = _DeferredBody(self)
+
+    @property
+    def is_deferred(self) -> bool:
+        """
+        True enquanto o corpo ainda não foi serializado.
+        """
+        return isinstance(self.response, _DeferredBody)
+
+    def encode(self) -> None:
+        """
+        Serializa o corpo agora, se ainda não foi serializado (ou substituído via set_data).
+        """
+        if not self.is_deferred:
+            return
+        encoded = self.api_response._encoded_response(self._response_format, self.mimetype, self._etag)
+        for name, value in encoded.headers.items():
+            if name == "Content-Type":
+                continue
+            if name == "Vary" and "Vary" in self.headers:
+                value = _merge_vary(self.headers["Vary"], value)
+            elif name != "Content-Length" and name in self.headers:
+                continue # Cabeçalhos definidos por middlewares prevalecem
+            self.headers[name] = value
+        self.response = encoded.response
+        self.direct_passthrough = encoded.direct_passthrough
+
+    def _ensure_sequence(self, mutable: bool = False) -> None:
+        self.encode()
+        super()._ensure_sequence(mutable)
+
+    def get_wsgi_headers(self, environ: Dict[str, Any]) -> Any:
+        if self.is_deferred and (environ["REQUEST_METHOD"] != "HEAD" or not self._measure()):
+            self.encode()
+        return super().get_wsgi_headers(environ)
+
+    def _measure(self) -> bool:
+        """
+        Define o Content-Length de uma resposta HEAD sem serializar o corpo, quando possível.
+        """
+        if _compression is not None: # O tamanho comprimido só é conhecido comprimindo
+            return False
+        started = time.perf_counter()
+        size = self.api_response._measured_body_size(self._response_format)
+        if size is None:
+            return False
+        if _metrics is not None:
+            _metrics.record(self.api_response.__class__.__name__, self.status_code, time.perf_counter() - started, size)
+        self.content_length = size
+        return True
+
+def _merge_vary(current: str, extra: str) -> str:
+    values = [value.strip() for value in current.split(",") if value.strip()]
+    known = {value.lower() for value in values}
+    for value in extra.split(","):
+        value = value.strip()
+        if value and value.lower() not in known:
+            values.append(value)
+            known.add(value.lower())
+    return ", ".join(values)
+
+# --- Métricas de serialização, tamanho de payload e status ---
+
+SERIALIZATION_SECONDS_BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+PAYLOAD_BYTES_BUCKETS = (128, 512, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216, 67108864)
+
+# Callback(class_name, status_code, seconds, size, endpoint); seconds e size são None
+# quando não há serialização (204, 304 e streaming).
+MetricsCallback = Callable[[str, int, Optional[float], Optional[int], Optional[str]], None]
+
+_metrics_logger = logging.getLogger(__name__)
+
+class _Histogram:
+    __slots__ = ("buckets", "counts", "total", "count")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+class ResponseMetrics:
+    """
+    Contadores por classe/status e histogramas de tempo de serialização e de
+    tamanho do corpo (por classe e endpoint). Seguro para servidores WSGI multi-thread.
+    """
+    def __init__(
+        self,
+        seconds_buckets: Tuple[float, ...] = SERIALIZATION_SECONDS_BUCKETS,
+        size_buckets: Tuple[int, ...] = PAYLOAD_BYTES_BUCKETS,
+    ):
+        self.seconds_buckets = tuple(seconds_buckets)
+        self.size_buckets = tuple(size_buckets)
+        self.callbacks: List[MetricsCallback] = []
+        self._lock = threading.Lock()
+        self._responses: Dict[Tuple[str, int], int] = {}
+        self._seconds: Dict[Tuple[str, str], _Histogram] = {}
+        self._sizes: Dict[Tuple[str, str], _Histogram] = {}
+
+    def record(
+        self,
+        class_name: str,
+        status_code: int,
+        seconds: Optional[float] = None,
+        size: Optional[int] = None,
+    ) -> None:
+        """
+        Registra uma resposta. seconds e size são opcionais (respostas sem corpo serializado).
+        """
+        endpoint = request.endpoint if has_request_context() else None
+        endpoint_label = endpoint or ""
+        with self._lock:
+            key = (class_name, status_code)
+            self._responses[key] = self._responses.get(key, 0) + 1
+            if seconds is not None:
+                histogram = self._seconds.get((class_name, endpoint_label))
+                if histogram is None:
+                    histogram = self._seconds[(class_name, endpoint_label)] = _Histogram(self.seconds_buckets)
+                histogram.observe(seconds)
+            if size is not None:
+                histogram = self._sizes.get((class_name, endpoint_label))
+                if histogram is None:
+                    histogram = self._sizes[(class_name, endpoint_label)] = _Histogram(self.size_buckets)
+                histogram.observe(size)
+        for callback in self.callbacks:
+            try:
+                callback(class_name, status_code, seconds, size, endpoint)
+            except Exception:
+                _metrics_logger.exception("Metrics callback %r failed", callback)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Retorna uma cópia das métricas atuais em estruturas Python simples.
+        """
+        def histograms(source: Dict[Tuple[str, str], _Histogram]) -> List[Dict[str, Any]]:
+            return [
+                {
+                    "class": class_name,
+                    "endpoint": endpoint,
+                    "buckets": dict(zip(histogram.buckets, histogram.counts)),
+                    "overflow": histogram.counts[-1],
+                    "sum": histogram.total,
+                    "count": histogram.count,
+                }
+                for (class_name, endpoint), histogram in source.items()
+            ]
+
+        with self._lock:
+            return {
+                "responses": [
+                    {"class": class_name, "status": status_code, "count": count}
+                    for (class_name, status_code), count in self._responses.items()
+                ],
+                "serialization_seconds": histograms(self._seconds),
+                "payload_bytes": histograms(self._sizes),
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._responses.clear()
+            self._seconds.clear()
+            self._sizes.clear()
+
+    def render_prometheus(self) -> str:
+        """
+        Renderiza as métricas no formato texto do Prometheus (versão 0.0.4).
+        """
+        lines = [
+            "# HELP stellrent_responses_total Responses created, by class and status.",
+            "# TYPE stellrent_responses_total counter",
+        ]
+        with self._lock:
+            for (class_name, status_code), count in sorted(self._responses.items()):
+                lines.append(f'stellrent_responses_total{{class="{class_name}",status="{status_code}"}} {count}')
+            lines.extend(_render_histogram(
+                "stellrent_response_serialization_seconds",
+                "Time spent serializing response bodies.",
+                self._seconds,
+            ))
+            lines.extend(_render_histogram(
+                "stellrent_response_payload_bytes",
+                "Size of serialized response bodies.",
+                self._sizes,
+            ))
+        return "\n".join(lines) + "\n"
+
+def _render_histogram(name: str, help_text: str, histograms: Dict[Tuple[str, str], _Histogram]) -> List[str]:
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+    for (class_name, endpoint), histogram in sorted(histograms.items()):
+        labels = f'class="{class_name}",endpoint="{_escape_label(endpoint)}"'
+        cumulative = 0
+        for bound, count in zip(histogram.buckets, histogram.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+        lines.append(f"{name}_sum{{{labels}}} {histogram.total}")
+        lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+    return lines
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+_metrics: Optional[ResponseMetrics] = None
+
+def enable_metrics(metrics: Optional[ResponseMetrics] = None) -> ResponseMetrics:
+    """
+    Habilita a coleta de métricas em make_response. Desabilitada, a coleta custa
+    apenas a leitura de uma variável global por resposta.
+
+    Args:
+        metrics (Optional[ResponseMetrics]): Uma instância já configurada (buckets próprios).
+                                            Se None, usa os buckets padrão.
+
+    Returns:
+        ResponseMetrics: O coletor ativo.
+    """
+    global _metrics
+    _metrics = metrics if metrics is not None else ResponseMetrics()
+    return _metrics
+
+def disable_metrics() -> None:
+    """
+    Desabilita a coleta de métricas (comportamento padrão).
+    """
+    global _metrics
+    _metrics = None
+
+def get_metrics() -> Optional[ResponseMetrics]:
+    return _metrics
+
+def add_metrics_callback(callback: MetricsCallback) -> None:
+    """
+    Registra uma função chamada a cada resposta registrada, com
+    (class_name, status_code, seconds, size, endpoint). Requer enable_metrics().
+    """
+    if _metrics is None:
+        raise RuntimeError("Metrics are disabled. Call enable_metrics() first.")
+    _metrics.callbacks.append(callback)
+
+def metrics_view() -> Response:
+    """
+    View do Flask que expõe as métricas no formato do Prometheus:
+
+        app.add_url_rule("/metrics", view_func=json_response.metrics_view)
+    """
+    body = _metrics.render_prometheus() if _metrics is not None else ""
+    return Response(body, content_type="text/plain; version=0.0.4; charset=utf-8")
+
 # --- Classes para Respostas de Sucesso ---
 
+# Layouts de DataResponse para dados tabulares (arrays NumPy estruturados)
+DATA_LAYOUTS = ("rows", "columns")
+
 class DataResponse(ApiResponse):
     """
     Resposta de sucesso que contém dados.
     Corresponde a um status HTTP 200 OK por padrão.
     O corpo da resposta será APENAS os dados fornecidos.
+
+    Com 'fields' (ex.: "id,name,address.city", ou requested_fields() para ler
+    ?fields= da query string), apenas os campos selecionados são serializados,
+    inclusive em listas de registros e em modelos pydantic.
+
+    Arrays NumPy são serializados em bloco (ver numpy_encoding); 'layout' escolhe
+    entre linhas ("rows", padrão) e colunas ("columns") para dados tabulares.
     """
+    __slots__ = ("_fields", "_layout")
+
     def __init__(
         self, 
         data: Any, # Deve ser fornecido para esta classe
         status_code: int = 200,
-        logger: Optional[logging.Logger] = None
+        logger: Optional[logging.Logger] = None,
+        fields: Optional[Union[str, Iterable[str], FieldSelection]] = None,
+        layout: str = "rows"
     ):
         # Para DataResponse, a mensagem e detalhes não são parte do corpo JSON,
         # mas a classe base precisa deles para inicialização.
         # Eles não serão incluídos no JSON final devido à lógica de make_response.
-        super().__init__(
-            status_code=status_code,
-            message=None, # Define a mensagem padrão
-            data=data,
-            details=None, # Não usado neste tipo de resposta para o corpo JSON
-            errors=None,
-            logger=logger
-        )
+        ApiResponse.__init__(self, status_code, None, data, None, None, logger)
+        if fields is None or (isinstance(fields, tuple) and all(isinstance(item, tuple) for item in fields)):
+            self._fields = fields
+        else:
+            self._fields = parse_fields(fields)
+        if layout not in DATA_LAYOUTS:
+            raise ValueError(f"Unknown layout: {layout!r}. Expected one of {list(DATA_LAYOUTS)}.")
+        self._layout = layout
+
+    @property
+    def fields(self) -> Optional[FieldSelection]:
+        return self._fields
+
+    def with_etag(self, version: Optional[Union[str, int]] = None) -> "ApiResponse":
+        # Cada seleção de campos é uma representação distinta do mesmo recurso
+        if version is not None and self._fields is not None:
+            version = f"{version}|{self._fields!r}"
+        return ApiResponse.with_etag(self, version)
+
+    @property
+    def layout(self) -> str:
+        return self._layout
+
+    def _selected_fields(self) -> Optional[FieldSelection]:
+        return self._fields
+
+    def _encode_body(self, response_format: ResponseFormat = _JSON_FORMAT) -> Tuple[bytes, bool]:
+        if _is_numpy_array(self._data):
+            from stellrent_response import numpy_encoding
+            return numpy_encoding.dumps_array(self._data, self._layout, response_format, self._fields), False
+        if self._fields is None:
+            return ApiResponse._encode_body(self, response_format)
+        return _dumps_data(self._data, response_format, self._fields), False
+
+    def _body_value(self) -> Any:
+        if _is_numpy_array(self._data):
+            from stellrent_response import numpy_encoding
+            return numpy_encoding.to_python(self._data, self._layout, self._fields)
+        if self._fields is None:
+            return self._data
+        return _project(self._data, self._fields)
 
 class ConfirmationResponse(ApiResponse):
     """
@@ -187,6 +1735,8 @@ class ConfirmationResponse(ApiResponse):
     Corresponde a um status HTTP 200 OK por padrão.
     O corpo da resposta será um envelope com message, details e status.
     """
+    __slots__ = ()
+
     def __init__(
         self, 
         message: Optional[str] = None, # Permite customizar a mensagem
@@ -194,14 +1744,9 @@ class ConfirmationResponse(ApiResponse):
         status_code: int = 200,
         logger: Optional[logging.Logger] = None
     ):
-        super().__init__(
-            status_code=status_code,
-            message=message if message is not None else default_messages[status_code],
-            data=None, # Garante que o corpo estruturado seja usado
-            details=details,
-            errors=None,
-            logger=logger
-        )
+        if message is None:
+            message = default_messages[status_code]
+        ApiResponse.__init__(self, status_code, message, None, details, None, logger)
 
 class CreateConfirmationResponse(ApiResponse):
     """
@@ -210,6 +1755,8 @@ class CreateConfirmationResponse(ApiResponse):
     O corpo da resposta será um envelope com message, details e status.
     Se 'data' for fornecido, a lógica da classe base fará com que seja o corpo JSON direto.
     """
+    __slots__ = ()
+
     def __init__(
         self, 
         data: Optional[Any] = None, # Pode ser o recurso criado, ou None para um envelope simples
@@ -217,29 +1764,334 @@ class CreateConfirmationResponse(ApiResponse):
         details: Optional[Any] = None, 
         logger: Optional[logging.Logger] = None
     ):
-        super().__init__(
-            status_code=201,
-            message=message if message is not None else default_messages[201],
-            data=data, # Este é o 'response_data' que make_response vai verificar
-            details=details,
-            errors=None,
-            logger=logger
-        )
+        if message is None:
+            message = default_messages[201]
+        ApiResponse.__init__(self, 201, message, data, details, None, logger)
         
+class StreamingDataResponse(ApiResponse):
+    """
+    Resposta de sucesso que serializa um iterável de forma incremental.
+    Corresponde a um status HTTP 200 OK por padrão.
+    O corpo da resposta é um array JSON com o mesmo formato produzido por
+    DataResponse(list(data)), mas codificado item a item e enviado em blocos,
+    de modo que o consumo de memória não depende da quantidade de itens.
+    """
+    __slots__ = ("_chunk_size",)
+
+    def __init__(
+        self,
+        data: Iterable[Any], # Qualquer iterável, inclusive geradores
+        status_code: int = 200,
+        chunk_size: int = 64 * 1024, # Tamanho aproximado (em bytes) de cada bloco enviado
+        logger: Optional[logging.Logger] = None
+    ):
+        ApiResponse.__init__(self, status_code, None, data, None, None, logger)
+        self._chunk_size = chunk_size
+
+    def make_response(self) -> Response:
+        """
+        Cria um Flask Response em modo streaming (chunked) para o iterável.
+
+        Returns:
+            Response: O objeto de resposta do Flask, com o corpo gerado sob demanda.
+        """
+        if _metrics is not None:
+            # O tamanho e o tempo de serialização só são conhecidos durante o envio
+            _metrics.record(self.__class__.__name__, self._status_code)
+        body = _iter_json_array(self._data, self._chunk_size)
+        if has_request_context():
+            # Mantém o contexto da requisição disponível para geradores do usuário
+            body = stream_with_context(body)
+        return Response(
+            content_type="application/json",
+            status=self._status_code,
+            response=body
+        )
+
+    def _encode_body(self, response_format: ResponseFormat = _JSON_FORMAT) -> Tuple[bytes, bool]:
+        # Embutida em outra resposta (ex.: MultiStatusResponse), o iterável é consumido de uma vez
+        if response_format is _JSON_FORMAT:
+            return b"".join(_iter_json_array(self._items(), self._chunk_size)), False
+        return response_format.dumps(self._body_value()), False
+
+    def _body_value(self) -> Any:
+        return list(self._items())
+
+    def _items(self) -> Iterable[Any]:
+        if hasattr(self._data, "__aiter__"):
+            raise TypeError(
+                "A StreamingDataResponse over an async iterable can only be sent on its own, "
+                "not embedded in another response."
+            )
+        return self._data
+
+
+def _iter_json_array(
+    items: Iterable[Any],
+    chunk_size: int,
+    dumps: Optional[Callable[[Any], bytes]] = None
+) -> Iterator[bytes]:
+    """
+    Codifica um iterável como array JSON, agrupando os itens em blocos de
+    aproximadamente chunk_size bytes. Apenas um bloco fica em memória por vez.
+    'dumps' codifica cada item (padrão: o backend JSON ativo).
+    """
+    if dumps is None:
+        dumps = get_json_backend().dumps
+    buffer: List[bytes] = [b"["]
+    buffered = 1
+    first = True
+    for item in items:
+        encoded = dumps(item)
+        if not first:
+            buffer.append(b",")
+            buffered += 1
+        first = False
+        buffer.append(encoded)
+        buffered += len(encoded)
+        if buffered >= chunk_size:
+            yield b"".join(buffer)
+            buffer = []
+            buffered = 0
+    buffer.append(b"]")
+    yield b"".join(buffer)
+
+
+JsonValidation = Optional[str] # None, "shallow" ou "full"
+
+class RawJsonResponse(ApiResponse):
+    """
+    Resposta cujo corpo já é JSON: bytes (ex.: colunas json do Postgres, hits de
+    cache) ou um arquivo em disco. O conteúdo é enviado como application/json
+    sem decodificar e codificar novamente.
+
+    Arquivos são enviados pelo wsgi.file_wrapper do servidor (sendfile, quando
+    disponível), com Content-Length, sem carregar o arquivo na memória do Python;
+    nesse modo não há compressão e o ETag sem versão deriva do tamanho e da data
+    de modificação. Conteúdo vindo de fontes não confiáveis pode ser validado:
+    "shallow" confere apenas o início e o fim do documento, "full" faz o parsing completo.
+
+    Args:
+        body (Optional[Union[bytes, bytearray, memoryview, str]]): O JSON já codificado.
+        status_code (int): O status HTTP. Padrão 200.
+        path (Optional[Union[str, os.PathLike]]): Caminho de um arquivo JSON (em vez de 'body').
+        validate (Optional[str]): None (padrão), "shallow" ou "full".
+
+    Raises:
+        ValueError: Se nem 'body' nem 'path' (ou ambos) forem informados, ou se a
+                    validação falhar.
+    """
+    __slots__ = ("_body", "_path")
+
+    def __init__(
+        self,
+        body: Optional[Union[bytes, bytearray, memoryview, str]] = None,
+        status_code: int = 200,
+        path: Optional[Union[str, "os.PathLike[str]"]] = None,
+        validate: JsonValidation = None,
+        logger: Optional[logging.Logger] = None
+    ):
+        if (body is None) == (path is None):
+            raise ValueError("RawJsonResponse requires exactly one of 'body' or 'path'.")
+        if validate not in (None, "shallow", "full"):
+            raise ValueError(f"Unknown validation mode: {validate!r}. Use 'shallow' or 'full'.")
+        ApiResponse.__init__(self, status_code, None, None, None, None, logger)
+        self._path = path
+        self._body = None if body is None else _raw_bytes(body)
+        if validate is not None:
+            if path is not None:
+                _validate_json_file(path, validate)
+            else:
+                _validate_json_bytes(self._body, validate)
+
+    def _negotiate(self) -> Tuple[ResponseFormat, str]:
+        return _JSON_FORMAT, "application/json"
+
+    def _encode_body(self, response_format: ResponseFormat = _JSON_FORMAT) -> Tuple[bytes, bool]:
+        if self._body is not None:
+            return self._body, False
+        with open(self._path, "rb") as file:
+            return file.read(), False
+
+    def _body_value(self) -> Any:
+        return json.loads(self._encode_body()[0])
+
+    def make_response(self) -> Response:
+        if self._path is None or self._status_code == 204:
+            return ApiResponse.make_response(self)
+
+        file = open(self._path, "rb")
+        try:
+            stat = os.fstat(file.fileno())
+            etag = None
+            etag_version = self._etag_version
+            if etag_version is not _NO_ETAG and 200 <= self._status_code < 300:
+                if etag_version is _ETAG_FROM_BODY:
+                    etag = f"f{stat.st_size:x}-{stat.st_mtime_ns:x}"
+                else:
+                    etag = _version_etag(self._status_code, etag_version, _JSON_FORMAT)
+                known_etag = _matching_etag(etag)
+                if known_etag is not None:
+                    file.close()
+                    if _metrics is not None:
+                        _metrics.record(self.__class__.__name__, 304)
+                    return _not_modified_response(known_etag)
+            if _metrics is not None:
+                _metrics.record(self.__class__.__name__, self._status_code, size=stat.st_size)
+            body = wrap_file(request.environ, file) if has_request_context() else FileWrapper(file)
+        except BaseException:
+            file.close()
+            raise
+
+        response = Response(body, status=self._status_code, content_type="application/json", direct_passthrough=True)
+        response.content_length = stat.st_size
+        if etag is not None:
+            response.headers["ETag"] = f'"{etag}"'
+        return response
+
+
+def _raw_bytes(body: Union[bytes, bytearray, memoryview, str]) -> bytes:
+    if type(body) is bytes:
+        return body
+    if isinstance(body, str):
+        return body.encode("utf-8")
+    if isinstance(body, memoryview) and type(body.obj) is bytes and body.nbytes == len(body.obj) and body.contiguous:
+        # A view cobre o objeto bytes inteiro: reaproveita-o sem cópia
+        return body.obj
+    return bytes(body)
+
+_JSON_WHITESPACE = b" \t\r\n"
+_JSON_CLOSERS = {ord("{"): ord("}"), ord("["): ord("]"), ord('"'): ord('"')}
+_JSON_SCALAR_FIRST = frozenset(b"-0123456789tfn")
+_JSON_SCALAR_LAST = frozenset(b"0123456789el")
+_SHALLOW_WINDOW = 64
+
+def _validate_json_bytes(body: bytes, mode: str) -> None:
+    if mode == "full":
+        _full_json_check(body)
+    elif len(body) <= 2 * _SHALLOW_WINDOW:
+        _shallow_json_check(body, body)
+    else:
+        _shallow_json_check(body[:_SHALLOW_WINDOW], body[-_SHALLOW_WINDOW:])
+
+def _validate_json_file(path: Union[str, "os.PathLike[str]"], mode: str) -> None:
+    with open(path, "rb") as file:
+        if mode == "full":
+            _full_json_check(file.read())
+            return
+        size = os.fstat(file.fileno()).st_size
+        if size <= 2 * _SHALLOW_WINDOW:
+            body = file.read()
+            _shallow_json_check(body, body)
+            return
+        head = file.read(_SHALLOW_WINDOW)
+        file.seek(-_SHALLOW_WINDOW, os.SEEK_END)
+        _shallow_json_check(head, file.read())
+
+def _shallow_json_check(head: bytes, tail: bytes) -> None:
+    """
+    Validação barata: o documento precisa começar e terminar com delimitadores
+    compatíveis (objeto, array, string) ou ter a forma de um escalar JSON.
+    """
+    whole = head is tail
+    head = head.lstrip(_JSON_WHITESPACE)
+    tail = tail.rstrip(_JSON_WHITESPACE)
+    if not head or not tail:
+        raise ValueError("Invalid JSON body: empty document.")
+    first, last = head[0], tail[-1]
+    closer = _JSON_CLOSERS.get(first)
+    if closer is not None:
+        valid = last == closer and not (whole and len(head.rstrip(_JSON_WHITESPACE)) < 2)
+    else:
+        valid = first in _JSON_SCALAR_FIRST and last in _JSON_SCALAR_LAST
+    if not valid:
+        raise ValueError("Invalid JSON body: unexpected start or end of document.")
+
+def _full_json_check(body: bytes) -> None:
+    try:
+        import orjson
+        loads = orjson.loads
+    except ImportError:
+        loads = json.loads
+    try:
+        loads(body)
+    except ValueError as exc: # json.JSONDecodeError e orjson.JSONDecodeError são ValueError
+        raise ValueError(f"Invalid JSON body: {exc}") from exc
+
+
+class MultiStatusResponse(ApiResponse):
+    """
+    Resposta de lote (HTTP 207 Multi-Status) para endpoints que executam várias
+    sub-operações. O corpo é um array com uma entrada {"status": ..., "body": ...}
+    por ApiResponse, na ordem recebida; respostas 204 têm "body": null.
+
+    Em JSON, cada entrada é montada com os bytes já codificados da sub-resposta
+    (envelopes constantes vêm do cache), em uma única passada. Com stream=True
+    o array é enviado em blocos à medida que as respostas são consumidas,
+    útil para lotes muito grandes ou gerados sob demanda.
+    """
+    __slots__ = ("_responses", "_stream", "_chunk_size")
+
+    def __init__(
+        self,
+        responses: Iterable[ApiResponse],
+        status_code: int = 207,
+        stream: bool = False,
+        chunk_size: int = 64 * 1024, # Tamanho aproximado (em bytes) de cada bloco, com stream=True
+        logger: Optional[logging.Logger] = None
+    ):
+        ApiResponse.__init__(self, status_code, None, None, None, None, logger)
+        self._responses = responses
+        self._stream = stream
+        self._chunk_size = chunk_size
+
+    @property
+    def responses(self) -> Iterable[ApiResponse]:
+        return self._responses
+
+    def make_response(self) -> Response:
+        if not self._stream:
+            return ApiResponse.make_response(self)
+        if _metrics is not None:
+            # O tamanho e o tempo de serialização só são conhecidos durante o envio
+            _metrics.record(self.__class__.__name__, self._status_code)
+        body = _iter_json_array(self._responses, self._chunk_size, _multi_status_entry)
+        if has_request_context():
+            body = stream_with_context(body)
+        return Response(
+            content_type="application/json",
+            status=self._status_code,
+            response=body
+        )
+
+    def _encode_body(self, response_format: ResponseFormat = _JSON_FORMAT) -> Tuple[bytes, bool]:
+        if response_format is _JSON_FORMAT:
+            return b"[" + b",".join(map(_multi_status_entry, self._responses)) + b"]", False
+        # Outros formatos não são concatenáveis como texto: uma única dumps() do lote
+        return response_format.dumps(self._body_value()), False
+
+    def _body_value(self) -> Any:
+        return [
+            {"status": response._status_code, "body": None if response._status_code == 204 else response._body_value()}
+            for response in self._responses
+        ]
+
+
+def _multi_status_entry(response: ApiResponse) -> bytes:
+    status_code = response._status_code
+    body = b"null" if status_code == 204 else response._encode_body(_JSON_FORMAT)[0]
+    return b'{"status":%d,"body":%b}' % (status_code, body)
+
+
 class NoDataResponse(ApiResponse):
     """
     Resposta para requisições que resultam em "No Content".
     Corresponde a um status HTTP 204 No Content. O corpo da resposta será vazio.
     """
+    __slots__ = ()
+
     def __init__(self, logger: Optional[logging.Logger] = None):
-        super().__init__(
-            status_code=204,
-            message=None, # 204 não deve ter mensagem no corpo
-            data=None,
-            details=None,
-            errors=None,
-            logger=logger
-        )
+        ApiResponse.__init__(self, 204, None, None, None, None, logger)
 
 # --- Classes para Respostas de Erro ---
 
@@ -248,6 +2100,8 @@ class ErrorResponse(ApiResponse):
     Classe base para respostas de erro.
     Define a estrutura comum para mensagens de erro, incluindo o status numérico.
     """
+    __slots__ = ()
+
     def __init__(
         self, 
         status_code: int, 
@@ -257,135 +2111,197 @@ class ErrorResponse(ApiResponse):
         logger: Optional[logging.Logger] = None
     ):
         # Para erros, garantimos que 'data' seja None para usar o corpo estruturado.
-        super().__init__(
-            status_code=status_code,
-            message=message if message is not None else default_messages.get(status_code),
-            data=None, # Erros não devem ter 'data' diretamente no corpo
-            details=details,
-            errors=errors,
-            logger=logger
-        )
+        ApiResponse.__init__(self, status_code, message, None, details, errors, logger)
 
 
 class BadRequest(ErrorResponse):
-    from pydantic import ValidationError
     """
     Erro 400 Bad Request: A requisição não pôde ser entendida ou processada.
+
+    Ao receber um ValidationError (pydantic), os erros viram 'details'. Os atributos
+    de classe abaixo limitam o custo desse caminho e podem ser sobrescritos
+    globalmente (BadRequest.validation_max_errors = 100) ou por chamada.
     """
+    __slots__ = ("_truncated_errors",)
+
+    # Campos do pydantic omitidos por padrão: 'input' pode ecoar payloads inteiros
+    # e 'ctx' pode conter objetos de exceção não serializáveis.
+    validation_include_input: bool = False
+    validation_include_url: bool = False
+    validation_include_context: bool = False
+    # Quantidade máxima de erros (ou grupos) em 'details'; None não limita
+    validation_max_errors: Optional[int] = None
+    # Agrupa os erros por padrão de localização (ex.: "items.*.price") com contagem
+    validation_group_errors: bool = False
+
     def __init__(
         self, 
         message: Optional[str] = None, # Permite customizar a mensagem
         details: Optional[Any] = None, 
         errors: Optional[List[Dict]] = None, # Para erros de validação de campos
         logger: Optional[logging.Logger] = None,
-        validate_exception: Optional[ValidationError] = None, # Permite customizar details com base em um ValidationError(Pydantic)
+        validate_exception: Optional["ValidationError"] = None, # Permite customizar details com base em um ValidationError(Pydantic)
+        max_errors: Optional[int] = None, # Sobrescreve validation_max_errors
+        group_errors: Optional[bool] = None, # Sobrescreve validation_group_errors
     ):
+        self._truncated_errors = 0
         if validate_exception is not None:
-           details = self.parser_pydantic_validation_error(validate_exception)
-        super().__init__(
-            status_code=400,
-            message=message,
-            details=details,
-            errors=errors,
-            logger=logger
+           details = self.parser_pydantic_validation_error(validate_exception, max_errors, group_errors)
+        ApiResponse.__init__(self, 400, message, None, details, errors, logger)
+
+    @property
+    def truncated_errors(self) -> int:
+        """Quantidade de erros (ou grupos) de validação omitidos de 'details'."""
+        return self._truncated_errors
+
+    def _envelope_body(self) -> Dict[str, Any]:
+        response_body = super()._envelope_body()
+        if self._truncated_errors:
+            response_body["truncated_errors"] = self._truncated_errors
+        return response_body
+
+    def parser_pydantic_validation_error(
+        self,
+        validate_exception: "ValidationError",
+        max_errors: Optional[int] = None,
+        group_errors: Optional[bool] = None,
+    ):
+        """
+        Converte um ValidationError em uma lista de erros para 'details'.
+
+        O trabalho em Python é proporcional ao limite de erros, não ao total:
+        apenas os primeiros max_errors erros são copiados. O agrupamento precisa
+        percorrer todos os erros para contá-los.
+
+        Args:
+            validate_exception (ValidationError): O erro de validação do pydantic.
+            max_errors (Optional[int]): Limite de itens em 'details'. Se None, usa validation_max_errors.
+            group_errors (Optional[bool]): Se True, agrupa por padrão de localização.
+                                           Se None, usa validation_group_errors.
+        """
+        if max_errors is None:
+            max_errors = self.validation_max_errors
+        if group_errors is None:
+            group_errors = self.validation_group_errors
+
+        raw_errors = validate_exception.errors(
+            include_url=self.validation_include_url,
+            include_context=self.validation_include_context,
+            include_input=self.validation_include_input,
         )
-    def parser_pydantic_validation_error(self, validate_exception: ValidationError):
-        list_errors = []
 
-        for error in validate_exception.errors():
-            parsed_error = dict(error)
-            location = list(parsed_error.get("loc", []))
+        if group_errors:
+            return self._group_validation_errors(raw_errors, max_errors)
 
-            if location and (isinstance(location[0], int) or (isinstance(location[0], str) and location[0].isdigit())):
-                location = location[1:]
+        if max_errors is not None and len(raw_errors) > max_errors:
+            self._truncated_errors = len(raw_errors) - max_errors
+            raw_errors = raw_errors[:max_errors]
 
-            parsed_error["loc"] = location
+        list_errors = []
+
+        for parsed_error in raw_errors:
+            parsed_error["loc"] = _strip_root_index(parsed_error.get("loc", ()))
             list_errors.append(parsed_error)
 
         return list_errors
 
+    def _group_validation_errors(self, raw_errors: List[Dict], max_errors: Optional[int]) -> List[Dict]:
+        groups: Dict[Tuple[str, str], Dict[str, Any]] = {}
+
+        for error in raw_errors:
+            location = _strip_root_index(error.get("loc", ()))
+            pattern = ".".join("*" if isinstance(part, int) else str(part) for part in location)
+            key = (pattern, error.get("type", ""))
+            group = groups.get(key)
+            if group is None:
+                groups[key] = {"loc": pattern, "type": error.get("type"), "msg": error.get("msg"), "count": 1}
+            else:
+                group["count"] += 1
+
+        list_groups = list(groups.values())
+        if max_errors is not None and len(list_groups) > max_errors:
+            self._truncated_errors = len(list_groups) - max_errors
+            list_groups = list_groups[:max_errors]
+        return list_groups
+
+
+def _strip_root_index(loc: Iterable[Any]) -> List[Any]:
+    """
+    Remove o índice inicial da localização de um erro de validação
+    (erros de listas validadas na raiz começam pelo índice do item).
+    """
+    location = list(loc)
+    if location and (isinstance(location[0], int) or (isinstance(location[0], str) and location[0].isdigit())):
+        location = location[1:]
+    return location
+
 
 class Unauthorized(ErrorResponse):
     """
     Erro 401 Unauthorized: A autenticação é necessária e falhou ou não foi fornecida.
     """
+    __slots__ = ()
+
     def __init__(
         self, 
         message: Optional[str] = None, 
         details: Optional[Any] = None, 
         logger: Optional[logging.Logger] = None
     ):
-        super().__init__(
-            status_code=401,
-            message=message, 
-            details=details,
-            logger=logger
-        )
+        ApiResponse.__init__(self, 401, message, None, details, None, logger)
 
 class Forbidden(ErrorResponse):
     """
     Erro 403 Forbidden: O servidor entendeu a requisição, mas se recusa a autorizá-la.
     """
+    __slots__ = ()
+
     def __init__(
         self, 
         message: Optional[str] = None, 
         details: Optional[Any] = None, 
         logger: Optional[logging.Logger] = None
     ):
-        super().__init__(
-            status_code=403,
-            message=message,
-            details=details,
-            logger=logger
-        )
+        ApiResponse.__init__(self, 403, message, None, details, None, logger)
 
 class NotFound(ErrorResponse):
     """
     Erro 404 Not Found: O recurso solicitado não pôde ser encontrado.
     """
+    __slots__ = ()
+
     def __init__(
         self, 
         message: Optional[str] = None, 
         details: Optional[Any] = None, 
         logger: Optional[logging.Logger] = None
     ):
-        super().__init__(
-            status_code=404,
-            message=message,
-            details=details,
-            logger=logger
-        )
+        ApiResponse.__init__(self, 404, message, None, details, None, logger)
 
 class MethodNotAllowed(ErrorResponse):
     """
     Erro 405 Method Not Allowed: O método HTTP da requisição não é permitido para o recurso.
     """
+    __slots__ = ()
+
     def __init__(
         self, 
         message: Optional[str] = None, 
         details: Optional[Any] = None, 
         logger: Optional[logging.Logger] = None
     ):
-        super().__init__(
-            status_code=405,
-            message=message,
-            details=details,
-            logger=logger
-        )
+        ApiResponse.__init__(self, 405, message, None, details, None, logger)
 
 class ServerError(ErrorResponse):
     """
     Erro 500 Internal Server Error: Um erro inesperado ocorreu no servidor.
     """
+    __slots__ = ()
+
     def __init__(
         self, 
         message: Optional[str] = None, 
         details: Optional[Any] = None, 
         logger: Optional[logging.Logger] = None
     ):
-        super().__init__(
-            status_code=500,
-            message=message,
-            details=details,
-            logger=logger
-        )
+        ApiResponse.__init__(self, 500, message, None, details, None, logger)
@@ -0,0 +1,244 @@
+# -*- coding: utf-8 -*-
+"""
+Serialização em bloco de arrays NumPy (requer o pacote opcional 'numpy').
+
+json_response importa este módulo sob demanda, apenas quando recebe um objeto
+do NumPy; não é preciso importá-lo diretamente:
+
+    return json_response.DataResponse(data=readings, layout="columns").make_response()
+
+Arrays comuns viram arrays JSON (aninhados, para mais de uma dimensão). Arrays
+estruturados (record arrays) são tabulares: layout "rows" produz uma lista de
+objetos [{"a": 1, "b": 2.5}, ...] e layout "columns" um objeto de colunas
+{"a": [...], "b": [...]}. Em ambos os layouts NaN, Infinity e -Infinity viram null.
+
+Com o backend orjson ativo, cada coluna numérica é codificada pelo próprio
+orjson, sem criar um objeto Python por elemento, e as linhas do layout "rows"
+são montadas por indexação vetorizada sobre os bytes das colunas. Com outro
+backend (ou para strings, objetos e datas, inclusive NaT) os valores passam
+por tolist() e pelo backend ativo.
+"""
+import json
+import numpy
+from typing import Any, List, Optional, Tuple
+
+from stellrent_response import json_response
+
+LAYOUTS = json_response.DATA_LAYOUTS
+
+# Quantidade aproximada de bytes montados por vez no layout "rows"; o vetor de
+# índices usado na montagem ocupa 8 vezes esse tamanho.
+ROWS_CHUNK_BYTES = 4 * 1024 * 1024
+
+# dtypes que o orjson serializa nativamente e cujo JSON nunca contém vírgulas
+# dentro de um valor (números, booleanos e null). datetime64 fica de fora: o
+# orjson não trata NaT (gera 1970-01-01 ou derruba o processo, conforme a unidade).
+_BULK_KINDS = frozenset("biuf")
+
+_SUBMICROSECOND_UNITS = frozenset(("ns", "ps", "fs", "as"))
+
+try:
+    import orjson
+    _ORJSON_OPTION: Optional[int] = orjson.OPT_SERIALIZE_NUMPY
+except ImportError: # Sem orjson, o caminho em bloco não está disponível
+    orjson = None
+    _ORJSON_OPTION = None
+
+
+def dumps_array(
+    array: numpy.ndarray,
+    layout: str = "rows",
+    response_format: Optional[json_response.ResponseFormat] = None,
+    fields: Optional[json_response.FieldSelection] = None,
+) -> bytes:
+    """
+    Serializa um array no layout informado.
+
+    Args:
+        array (numpy.ndarray): O array (comum ou estruturado).
+        layout (str): "rows" (padrão) ou "columns".
+        response_format (Optional[ResponseFormat]): Formato do corpo; padrão JSON.
+        fields (Optional[FieldSelection]): Seleção de colunas de um array estruturado.
+    """
+    if layout not in LAYOUTS:
+        raise ValueError(f"Unknown layout: {layout!r}. Expected one of {list(LAYOUTS)}.")
+    array = _select_columns(array, fields)
+    if response_format is not None and response_format is not json_response._JSON_FORMAT:
+        return response_format.dumps(to_python(array, layout))
+
+    if array.dtype.names is None:
+        if layout == "columns" and array.ndim >= 2:
+            array = numpy.swapaxes(array, 0, 1)
+        return _dumps_values(array)
+    if array.ndim != 1:
+        return json_response.get_json_backend().dumps(to_python(array, layout))
+    if layout == "columns":
+        return _dumps_columns(array)
+    return _dumps_records(array)
+
+
+def to_python(
+    array: numpy.ndarray,
+    layout: str = "rows",
+    fields: Optional[json_response.FieldSelection] = None,
+) -> Any:
+    """
+    Converte o array para listas/dicionários Python no layout informado, com
+    NaN e infinitos como None. Usado pelos formatos sem caminho em bloco.
+    """
+    array = _select_columns(array, fields)
+    names = array.dtype.names
+    if names is None:
+        if layout == "columns" and array.ndim >= 2:
+            array = numpy.swapaxes(array, 0, 1)
+        return _tolist(array)
+    columns = {name: _tolist(array[name]) for name in names}
+    if layout == "columns":
+        return columns
+    return [dict(zip(names, values)) for values in zip(*columns.values())]
+
+
+def _select_columns(array: numpy.ndarray, fields: Optional[json_response.FieldSelection]) -> numpy.ndarray:
+    if fields is None or array.dtype.names is None:
+        return array
+    return array[[name for name, _ in fields if name in array.dtype.names]]
+
+
+def encode_scalar(value: numpy.generic) -> Any:
+    """
+    Encoder dos escalares do NumPy (numpy.int64, numpy.float32, numpy.bool_...).
+    """
+    if isinstance(value, numpy.datetime64) or (value.dtype.kind == "f" and value.dtype.itemsize < 8):
+        # Mesma conversão dos arrays: datas em microssegundos, float16/float32 na representação mais curta
+        return _tolist(numpy.asarray(value))
+    item = value.item()
+    if isinstance(item, float) and not numpy.isfinite(item):
+        return None
+    return item
+
+
+def _tolist(array: numpy.ndarray) -> Any:
+    if array.dtype.kind == "f" and array.dtype.itemsize < 8:
+        # Representação mais curta de float16/float32 (0.1, e não 0.10000000149011612), como o orjson
+        array = array.astype(str).astype(numpy.float64)
+    if array.dtype.kind in "fc":
+        finite = numpy.isfinite(array)
+        if not finite.all():
+            values = array.astype(object)
+            values[~finite] = None
+            return values.tolist()
+    elif array.dtype.kind == "M":
+        # Unidades abaixo de microssegundos viram inteiros em tolist(); NaT vira None
+        if numpy.datetime_data(array.dtype)[0] in _SUBMICROSECOND_UNITS:
+            array = array.astype("datetime64[us]")
+        return array.astype(object).tolist()
+    return array.tolist()
+
+
+def _dumps_values(array: numpy.ndarray) -> bytes:
+    backend = json_response.get_json_backend()
+    if orjson is not None and array.dtype.kind in _BULK_KINDS and isinstance(backend, json_response.OrjsonBackend):
+        try:
+            return orjson.dumps(numpy.ascontiguousarray(array), option=_ORJSON_OPTION)
+        except TypeError: # dtype sem suporte nativo nesta versão do orjson
+            pass
+    return backend.dumps(_tolist(array))
+
+
+def _dumps_columns(array: numpy.ndarray) -> bytes:
+    parts = [
+        _json_key(name) + b":" + _dumps_values(array[name])
+        for name in array.dtype.names
+    ]
+    return b"{" + b",".join(parts) + b"}"
+
+
+def _json_key(name: str) -> bytes:
+    return json.dumps(name, ensure_ascii=False).encode("utf-8")
+
+
+def _column_slices(column: numpy.ndarray) -> Tuple[bytes, numpy.ndarray, numpy.ndarray]:
+    """
+    Codifica uma coluna e devolve (bytes, início, tamanho) de cada valor.
+    Para dtypes em bloco os limites vêm das vírgulas do array JSON.
+    """
+    count = len(column)
+    if column.ndim == 1 and column.dtype.kind in _BULK_KINDS:
+        encoded = _dumps_values(column)
+        buffer = numpy.frombuffer(encoded, dtype=numpy.uint8)
+        commas = numpy.flatnonzero(buffer == ord(","))
+        if len(commas) == count - 1:
+            starts = numpy.empty(count, dtype=numpy.int64)
+            starts[0] = 1
+            starts[1:] = commas + 1
+            ends = numpy.empty(count, dtype=numpy.int64)
+            ends[:-1] = commas
+            ends[-1] = len(encoded) - 1
+            return encoded, starts, ends - starts
+    # Strings, objetos e subarrays: um valor por vez
+    dumps = json_response.get_json_backend().dumps
+    values: List[bytes] = [dumps(value) for value in _tolist(column)]
+    lengths = numpy.fromiter(map(len, values), dtype=numpy.int64, count=count)
+    starts = numpy.zeros(count, dtype=numpy.int64)
+    numpy.cumsum(lengths[:-1], out=starts[1:])
+    return b"".join(values), starts, lengths
+
+
+def _dumps_records(array: numpy.ndarray) -> bytes:
+    """
+    Monta [{"a":..,"b":..},...] a partir dos bytes já codificados de cada coluna.
+    Cada linha é uma sequência fixa de trechos (valor da coluna k seguido da
+    chave da coluna k+1, ou de "},{" ao fim da linha), copiados por uma única
+    indexação vetorizada por bloco de linhas.
+    """
+    names = array.dtype.names
+    count = len(array)
+    if count == 0:
+        return b"[]"
+    if not names:
+        return b"[" + b",".join([b"{}"] * count) + b"]"
+
+    keys = [_json_key(name) + b":" for name in names]
+    # Trechos fixos: a chave seguinte após cada valor; após o último, o fim da linha
+    fixed = [b"," + key for key in keys[1:]] + [b"},{" + keys[0], b"}]"]
+    sources = [b"".join(fixed)]
+    fixed_starts = numpy.cumsum([0] + [len(piece) for piece in fixed[:-1]])
+    offset = len(sources[0])
+    columns = []
+    for name in names:
+        encoded, starts, lengths = _column_slices(array[name])
+        sources.append(encoded)
+        columns.append((starts + offset, lengths))
+        offset += len(encoded)
+    source = numpy.frombuffer(b"".join(sources), dtype=numpy.uint8)
+    index_type = numpy.int32 if len(source) < 2 ** 31 else numpy.int64
+
+    pieces = 2 * len(names)
+    row_bytes = sum(len(piece) for piece in fixed[:-1]) + sum(int(lengths[0]) for _, lengths in columns)
+    chunk_rows = max(1, ROWS_CHUNK_BYTES // row_bytes)
+    chunks = [b"[{" + keys[0]]
+    for first in range(0, count, chunk_rows):
+        last = min(first + chunk_rows, count)
+        starts = numpy.empty((last - first, pieces), dtype=index_type)
+        lengths = numpy.empty((last - first, pieces), dtype=index_type)
+        for index, (value_starts, value_lengths) in enumerate(columns):
+            starts[:, 2 * index] = value_starts[first:last]
+            lengths[:, 2 * index] = value_lengths[first:last]
+            starts[:, 2 * index + 1] = fixed_starts[index]
+            lengths[:, 2 * index + 1] = len(fixed[index])
+        if last == count:
+            starts[-1, -1] = fixed_starts[-1]
+            lengths[-1, -1] = len(fixed[-1])
+        starts = starts.ravel()
+        lengths = lengths.ravel()
+        # Índices de origem de cada byte: +1 dentro de um trecho, salto no início do próximo
+        steps = numpy.ones(int(lengths.sum()), dtype=index_type)
+        piece_ends = numpy.cumsum(lengths[:-1])
+        steps[0] = starts[0]
+        steps[piece_ends] = starts[1:] - (starts[:-1] + lengths[:-1]) + 1
+        chunks.append(source[numpy.cumsum(steps, dtype=index_type)].tobytes())
+    return b"".join(chunks)
+
+
+json_response.register_encoder(numpy.generic, encode_scalar)
+json_response.register_encoder(numpy.ndarray, to_python)
@@ -0,0 +1,153 @@
+from stellrent_response import async_response, json_response
+from flask import Flask, Response
+import flask
+import asyncio
+import gzip
+import json
+import threading
+import pytest
+
+app = Flask(__name__)
+
+class _ThreadRecordingData(dict):
+    """Dicionário que registra a thread em que foi serializado pelo backend stdlib."""
+    threads = []
+
+    def items(self):
+        _ThreadRecordingData.threads.append(threading.get_ident())
+        return super().items()
+
+@pytest.fixture(autouse=True)
+def offload_settings():
+    previous = json_response.get_json_backend()
+    json_response.set_json_backend("stdlib")
+    _ThreadRecordingData.threads = []
+    yield
+    async_response.configure_offload()
+    json_response.set_json_backend(previous)
+    json_response.disable_compression()
+
+@pytest.mark.parametrize("async_class,kwargs", [
+    (async_response.DataResponse, {"data": {"a": 1}}),
+    (async_response.ConfirmationResponse, {"details": "done"}),
+    (async_response.CreateConfirmationResponse, {}),
+    (async_response.NoDataResponse, {}),
+    (async_response.BadRequest, {"details": "invalid"}),
+    (async_response.Unauthorized, {}),
+    (async_response.Forbidden, {}),
+    (async_response.NotFound, {"message": "Missing"}),
+    (async_response.MethodNotAllowed, {}),
+    (async_response.ServerError, {}),
+    (async_response.MultiStatusResponse, {"responses": [json_response.NotFound(), json_response.DataResponse(data=[1])]}),
+])
+def test_async_responses_match_sync(async_class, kwargs):
+    sync_class = getattr(json_response, async_class.__name__)
+    async_resp = async_class(**kwargs)
+    assert(isinstance(async_resp, sync_class))
+    response_obj = asyncio.run(async_resp.make_response())
+    expected = sync_class(**kwargs).make_response()
+    assert(isinstance(response_obj, Response))
+    assert(response_obj.status_code == expected.status_code)
+    assert(response_obj.content_type == expected.content_type)
+    assert(response_obj.get_data() == expected.get_data())
+
+def test_small_payload_stays_on_event_loop():
+    data = _ThreadRecordingData(a=1)
+    asyncio.run(async_response.DataResponse(data=data).make_response())
+    assert(_ThreadRecordingData.threads == [threading.get_ident()])
+
+def test_large_payload_is_offloaded():
+    async_response.configure_offload(threshold=10, max_workers=1)
+    data = _ThreadRecordingData(payload="x" * 100)
+    response_obj = asyncio.run(async_response.DataResponse(data=data).make_response())
+    assert(json.loads(response_obj.get_data()) == data)
+    assert(_ThreadRecordingData.threads != [threading.get_ident()])
+
+def test_offload_keeps_request_context():
+    async_response.configure_offload(threshold=0)
+    json_response.enable_compression(min_size=1)
+    data = [{"index": index} for index in range(100)]
+
+    async def build():
+        return await async_response.DataResponse(data=data).make_response()
+
+    with app.test_request_context("/", headers={"Accept-Encoding": "gzip"}):
+        response_obj = asyncio.run(build())
+    assert(response_obj.headers["Content-Encoding"] == "gzip")
+    assert(json.loads(gzip.decompress(response_obj.get_data())) == data)
+
+def test_streaming_async_generator():
+    closed = []
+
+    async def rows():
+        try:
+            for index in range(5):
+                await asyncio.sleep(0)
+                yield {"index": index}
+        finally:
+            closed.append(True)
+
+    @async_response.on_stream_loop
+    async def view():
+        return await async_response.StreamingDataResponse(data=rows(), chunk_size=8).make_response()
+
+    response_obj = asyncio.run(view())
+    assert(response_obj.is_streamed)
+    assert(json.loads(response_obj.get_data()) == [{"index": index} for index in range(5)])
+    assert(closed == [True])
+
+def test_streaming_loop_bound_source():
+    # Fila alimentada por uma tarefa iniciada na view: ambas precisam sobreviver ao fim da view
+    @async_response.on_stream_loop
+    async def view():
+        queue = asyncio.Queue()
+
+        async def produce():
+            for index in range(3):
+                await asyncio.sleep(0.01)
+                await queue.put(index)
+            await queue.put(None)
+
+        async def consume():
+            while True:
+                item = await queue.get()
+                if item is None:
+                    return
+                yield item
+
+        view.producer = asyncio.ensure_future(produce())
+        return await async_response.StreamingDataResponse(data=consume()).make_response()
+
+    response_obj = asyncio.run(view())
+    assert(json.loads(response_obj.get_data()) == [0, 1, 2])
+
+def test_streaming_keeps_request_context():
+    @async_response.on_stream_loop
+    async def view():
+        async def rows():
+            yield flask.request.path
+
+        return await async_response.StreamingDataResponse(data=rows()).make_response()
+
+    with app.test_request_context("/rows"):
+        response_obj = asyncio.run(view())
+        assert(json.loads(response_obj.get_data()) == ["/rows"])
+
+def test_streaming_async_iterable_outside_stream_loop_is_rejected():
+    async def rows():
+        yield 1
+
+    with pytest.raises(RuntimeError, match="on_stream_loop"):
+        asyncio.run(async_response.StreamingDataResponse(data=rows()).make_response())
+
+def test_streaming_sync_iterable():
+    response_obj = asyncio.run(async_response.StreamingDataResponse(data=iter([1, 2, 3])).make_response())
+    assert(json.loads(response_obj.get_data()) == [1, 2, 3])
+
+def test_async_streaming_entry_in_batch_is_rejected():
+    async def rows():
+        yield 1
+
+    entries = [async_response.StreamingDataResponse(data=rows())]
+    with pytest.raises(TypeError, match="async iterable"):
+        json_response.MultiStatusResponse(entries).make_response()
@@ -0,0 +1,31 @@
+from benchmarks import bench_responses
+import json
+
+def test_run_produces_machine_readable_results():
+    results = bench_responses.run(["tiny"], repeat=1, min_time=0.0001)
+    assert(set(results) == {"meta", "results"})
+    assert(results["meta"]["json_backend"])
+    assert("construct/NotFound" in results["results"])
+    assert("make_response/BadRequest/validation/1000" in results["results"])
+    assert("make_response/DataResponse/uuid_datetime/tiny" in results["results"])
+    for result in results["results"].values():
+        assert(result["seconds_per_op"] > 0)
+    assert(json.loads(json.dumps(results)) == results)
+
+def test_compare_detects_regressions():
+    baseline = {"results": {"a": {"seconds_per_op": 1.0}, "b": {"seconds_per_op": 1.0}}}
+    current = {"results": {"a": {"seconds_per_op": 1.2}, "b": {"seconds_per_op": 1.5}, "c": {"seconds_per_op": 9.0}}}
+    regressions = bench_responses.compare(current, baseline, threshold=0.25)
+    assert([regression["name"] for regression in regressions] == ["b"])
+    assert(regressions[0]["ratio"] == 1.5)
+
+def test_main_fails_on_regression(tmp_path):
+    baseline_path = tmp_path / "baseline.json"
+    output_path = tmp_path / "current.json"
+    arguments = ["--sizes", "tiny", "--repeat", "1", "--min-time", "0.0001", "--filter", "construct/NotFound"]
+    assert(bench_responses.main(arguments + ["--output", str(baseline_path)]) == 0)
+    baseline = json.loads(baseline_path.read_text())
+    baseline["results"]["construct/NotFound"]["seconds_per_op"] /= 1000
+    baseline_path.write_text(json.dumps(baseline))
+    exit_code = bench_responses.main(arguments + ["--output", str(output_path), "--baseline", str(baseline_path)])
+    assert(exit_code == 1)
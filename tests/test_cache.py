@@ -0,0 +1,184 @@
+from stellrent_response import cache, json_response
+from flask import Flask
+import json
+import threading
+import time
+import pytest
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake_clock = _Clock()
+    monkeypatch.setattr(cache, "_now", fake_clock)
+    return fake_clock
+
+def _build_app(store, **options):
+    app = Flask(__name__)
+    calls = {"items": 0, "missing": 0}
+
+    @app.route("/items", methods=["GET", "POST"])
+    @cache.cached_response(ttl=10, store=store, **options)
+    def items():
+        calls["items"] += 1
+        return json_response.DataResponse(data={"calls": calls["items"]})
+
+    @app.route("/missing")
+    @cache.cached_response(ttl=10, store=store, **options)
+    def missing():
+        calls["missing"] += 1
+        return json_response.NotFound()
+
+    return app, calls
+
+def test_response_is_cached(clock):
+    store = cache.DictResponseStore()
+    app, calls = _build_app(store)
+    client = app.test_client()
+    first = client.get("/items")
+    second = client.get("/items")
+    assert(calls["items"] == 1)
+    assert(second.status_code == 200)
+    assert(second.content_type == "application/json")
+    assert(second.get_data() == first.get_data())
+    assert(json.loads(second.get_data()) == {"calls": 1})
+
+def test_query_string_and_method_are_part_of_the_key(clock):
+    app, calls = _build_app(cache.DictResponseStore())
+    client = app.test_client()
+    client.get("/items?page=1")
+    client.get("/items?page=2")
+    client.post("/items")
+    client.post("/items")
+    assert(calls["items"] == 4)
+
+def test_custom_key(clock):
+    app, calls = _build_app(cache.DictResponseStore(), key=lambda: "items")
+    client = app.test_client()
+    client.get("/items?page=1")
+    client.get("/items?page=2")
+    assert(calls["items"] == 1)
+
+def test_entry_expires(clock):
+    app, calls = _build_app(cache.DictResponseStore())
+    client = app.test_client()
+    client.get("/items")
+    clock.now += 11
+    response_obj = client.get("/items")
+    assert(calls["items"] == 2)
+    assert(json.loads(response_obj.get_data()) == {"calls": 2})
+
+def test_errors_are_not_cached_by_default(clock):
+    app, calls = _build_app(cache.DictResponseStore())
+    client = app.test_client()
+    client.get("/missing")
+    response_obj = client.get("/missing")
+    assert(response_obj.status_code == 404)
+    assert(calls["missing"] == 2)
+
+def test_errors_cached_when_requested(clock):
+    app, calls = _build_app(cache.DictResponseStore(), cache_errors=True)
+    client = app.test_client()
+    client.get("/missing")
+    response_obj = client.get("/missing")
+    assert(response_obj.status_code == 404)
+    assert(json.loads(response_obj.get_data())["status"] == 404)
+    assert(calls["missing"] == 1)
+
+def test_stale_entry_served_while_another_worker_recomputes(clock):
+    store = cache.DictResponseStore()
+    app, calls = _build_app(store)
+    client = app.test_client()
+    client.get("/items")
+    clock.now += 11
+    lock_key = next(key for key in store.mapping) + ":lock"
+    assert(store.add(lock_key, "other-worker", 30))
+    response_obj = client.get("/items")
+    assert(json.loads(response_obj.get_data()) == {"calls": 1})
+    assert(calls["items"] == 1)
+
+def test_only_one_thread_recomputes():
+    store = cache.MemoryResponseStore()
+    app = Flask(__name__)
+    calls = []
+    release = threading.Event()
+
+    @app.route("/slow")
+    @cache.cached_response(ttl=10, store=store, poll_interval=0.01)
+    def slow():
+        calls.append(1)
+        release.wait(2)
+        return json_response.DataResponse(data={"value": 1})
+
+    results = []
+
+    def request_slow():
+        results.append(app.test_client().get("/slow").get_data())
+
+    threads = [threading.Thread(target=request_slow) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.1)
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert(len(calls) == 1)
+    assert(results == [b'{"value":1}'] * 8)
+
+def test_memory_store_is_bounded_by_bytes(clock):
+    store = cache.MemoryResponseStore(max_bytes=300)
+    for index in range(5):
+        entry = cache.CachedResponse(b"x" * 100, 200, [("Content-Type", "application/json")], clock.now + 10)
+        store.set(f"key-{index}", entry, 10)
+    assert(store.size <= 300)
+    assert(store.get("key-0") is None)
+    assert(store.get("key-4") is not None)
+    store.set("huge", cache.CachedResponse(b"x" * 1000, 200, [], clock.now + 10), 10)
+    assert(store.get("huge") is None)
+
+def test_entry_serialization_roundtrip():
+    entry = cache.CachedResponse(b'{"a":1}', 201, [("Content-Type", "application/json"), ("X-Test", "1")], 123.5)
+    restored = cache.CachedResponse.from_bytes(entry.to_bytes())
+    assert(restored.body == entry.body)
+    assert(restored.status == 201)
+    assert(restored.headers == entry.headers)
+    assert(restored.expires_at == 123.5)
+
+@pytest.mark.parametrize("store_class", [cache.MemoryResponseStore, cache.DictResponseStore])
+def test_add_is_atomic(store_class):
+    store = store_class()
+    barrier = threading.Barrier(8)
+    results = []
+
+    def worker(index):
+        barrier.wait()
+        results.append(store.add("lock", f"worker-{index}", 30))
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert(results.count(True) == 1)
+
+def test_expired_lock_held_by_another_worker_is_kept(clock):
+    store = cache.DictResponseStore()
+    app = Flask(__name__)
+
+    @app.route("/slow")
+    @cache.cached_response(ttl=10, store=store, lock_timeout=5)
+    def slow():
+        # A trava desta requisição expira e outro worker a obtém antes do fim da view
+        clock.now += 6
+        lock_key = next(key for key in store.mapping if key.endswith(":lock"))
+        assert(store.add(lock_key, "other-worker", 5))
+        return json_response.DataResponse(data={"value": 1})
+
+    app.test_client().get("/slow")
+    lock_key = next(key for key in store.mapping if key.endswith(":lock"))
+    assert(store.mapping[lock_key][0] == "other-worker")
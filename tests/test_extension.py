@@ -0,0 +1,114 @@
+from stellrent_response import json_response
+from stellrent_response.extension import StellrentResponse
+from flask import Flask, abort
+from werkzeug.datastructures import WWWAuthenticate
+from pydantic import BaseModel
+import json
+import pytest
+
+class Item(BaseModel):
+    name: str
+    price: float
+
+def _build_app(**options):
+    app = Flask(__name__)
+    StellrentResponse(app, **options)
+
+    @app.route("/items", methods=["GET"])
+    def items():
+        return json_response.DataResponse(data={"id": 1})
+
+    @app.route("/created", methods=["POST"])
+    def created():
+        return json_response.CreateConfirmationResponse(data={"id": 1}), {"Location": "/items/1"}
+
+    @app.route("/custom")
+    def custom():
+        abort(404, description="Order not found")
+
+    @app.route("/validate")
+    def validate():
+        Item(name="x", price="free")
+
+    @app.route("/boom")
+    def boom():
+        raise RuntimeError("boom")
+
+    @app.route("/unauthorized")
+    def unauthorized():
+        abort(401, www_authenticate=WWWAuthenticate("bearer"))
+
+    @app.route("/conflict")
+    def conflict():
+        abort(409)
+
+    return app
+
+def test_views_may_return_api_response():
+    client = _build_app().test_client()
+    response_obj = client.get("/items")
+    assert(response_obj.status_code == 200)
+    assert(json.loads(response_obj.get_data()) == {"id": 1})
+    created = client.post("/created")
+    assert(created.status_code == 201)
+    assert(created.headers["Location"] == "/items/1")
+
+def test_not_found_uses_prebuilt_body():
+    client = _build_app().test_client()
+    response_obj = client.get("/nowhere")
+    assert(response_obj.status_code == 404)
+    assert(response_obj.content_type == "application/json")
+    assert(response_obj.get_data() == json_response.NotFound().make_response().get_data())
+
+def test_method_not_allowed_carries_allow_header():
+    response_obj = _build_app().test_client().post("/items")
+    assert(response_obj.status_code == 405)
+    assert(set(response_obj.headers["Allow"].split(", ")) == {"GET", "HEAD", "OPTIONS"})
+    assert(json.loads(response_obj.get_data()) == {"message": "Method not allowed", "status": 405})
+
+def test_exception_headers_are_copied():
+    response_obj = _build_app().test_client().get("/unauthorized")
+    assert(response_obj.status_code == 401)
+    assert(response_obj.headers["WWW-Authenticate"] == "Bearer")
+    assert(json.loads(response_obj.get_data()) == {"message": "Unauthorized", "status": 401})
+
+def test_codes_without_default_message_use_reason_phrase():
+    response_obj = _build_app().test_client().get("/conflict")
+    assert(response_obj.status_code == 409)
+    assert(json.loads(response_obj.get_data()) == {"message": "Conflict", "status": 409})
+
+def test_custom_description_becomes_message():
+    response_obj = _build_app().test_client().get("/custom")
+    assert(json.loads(response_obj.get_data()) == {"message": "Order not found", "status": 404})
+
+def test_validation_error_becomes_bad_request():
+    response_obj = _build_app().test_client().get("/validate")
+    assert(response_obj.status_code == 400)
+    body = json.loads(response_obj.get_data())
+    assert(body["details"][0]["loc"] == ["price"])
+
+def test_uncaught_exception_becomes_server_error():
+    response_obj = _build_app().test_client().get("/boom")
+    assert(response_obj.status_code == 500)
+    assert(json.loads(response_obj.get_data()) == {"message": "Internal Server Error", "status": 500})
+
+def test_uncaught_exception_propagates_when_disabled():
+    app = _build_app(handle_exceptions=False)
+    app.testing = True
+    with pytest.raises(RuntimeError):
+        app.test_client().get("/boom")
+
+def test_prebuilt_bodies_follow_default_messages():
+    client = _build_app().test_client()
+    json_response.default_messages[404] = "Nothing here"
+    try:
+        assert(json.loads(client.get("/nowhere").get_data())["message"] == "Nothing here")
+    finally:
+        json_response.default_messages[404] = "Resource Not Found"
+    assert(json.loads(client.get("/nowhere").get_data())["message"] == "Resource Not Found")
+
+def test_registered_on_app_extensions():
+    app = Flask(__name__)
+    extension = StellrentResponse()
+    extension.init_app(app)
+    assert(app.extensions["stellrent_response"] is extension)
@@ -0,0 +1,43 @@
+from stellrent_response import json_response
+import inspect
+import logging
+import pytest
+
+response_classes = [
+    cls for _, cls in inspect.getmembers(json_response, inspect.isclass)
+    if issubclass(cls, json_response.ApiResponse)
+]
+
+@pytest.mark.parametrize("response_class", response_classes, ids=lambda cls: cls.__name__)
+def test_fields_live_in_slots(response_class):
+    response_obj = response_class.__new__(response_class)
+    assert("_status_code" in json_response.ApiResponse.__slots__)
+    assert(vars(response_obj) == {})
+
+def test_constructors_do_not_use_instance_dict():
+    assert(vars(json_response.NotFound(details=1)) == {})
+    assert(vars(json_response.DataResponse(data=[1], fields="a")) == {})
+    assert(vars(json_response.BadRequest(errors=[{"field": "name"}])) == {})
+
+def test_logger_is_resolved_lazily():
+    not_found_response = json_response.NotFound()
+    assert(not_found_response._logger is None)
+    assert(not_found_response.logger is logging.getLogger("NotFound"))
+    assert(not_found_response._logger is not_found_response.logger)
+
+def test_custom_logger_is_kept():
+    custom_logger = logging.getLogger("custom")
+    data_response = json_response.DataResponse(data={"a": 1}, logger=custom_logger)
+    assert(data_response.logger is custom_logger)
+
+def test_invalid_logger_falls_back_with_warning(caplog):
+    with caplog.at_level(logging.WARNING, logger="Forbidden"):
+        forbidden_response = json_response.Forbidden(logger="not a logger")
+    assert(forbidden_response.logger is logging.getLogger("Forbidden"))
+    assert("Invalid logger type" in caplog.text)
+
+def test_error_constructors_keep_signatures():
+    assert(json_response.ErrorResponse(404).message == json_response.default_messages[404])
+    assert(json_response.ErrorResponse(418).message is None)
+    assert(json_response.ServerError(message="Boom", details=1).details == 1)
+    assert(json_response.BadRequest(errors=[{"field": "name"}]).errors == [{"field": "name"}])
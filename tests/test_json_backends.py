@@ -0,0 +1,103 @@
+from stellrent_response import json_response
+import dataclasses
+import datetime
+import json
+import uuid
+import pytest
+
+def _available_backends():
+    backends = []
+    for name, factory in json_response.json_backends.items():
+        try:
+            backends.append(factory())
+        except ImportError:
+            continue
+    return backends
+
+backends = _available_backends()
+backend_ids = [backend.name for backend in backends]
+
+special_values = [
+    uuid.UUID("12345678-1234-5678-1234-567812345678"),
+    datetime.datetime(2024, 1, 2, 3, 4, 5),
+    datetime.datetime(2024, 1, 2, 3, 4, 5, 123456),
+    datetime.datetime(2024, 1, 2, 3, 4, 5, tzinfo=datetime.timezone.utc),
+    datetime.datetime(2024, 1, 2, 3, 4, 5, tzinfo=datetime.timezone(datetime.timedelta(hours=-3))),
+    datetime.datetime(2024, 1, 2, 3, 4, 5, tzinfo=datetime.timezone(datetime.timedelta(seconds=30))),
+    datetime.date(2024, 1, 2),
+]
+
+payloads = [
+    {"message": "Resource Not Found", "status": 404},
+    {"param1": "value1", "param2": 2, "param3": 3.5, "param4": None, "param5": True},
+    [1, 2, 3, [4, [5, {"nested": "ção"}]]],
+    {"id": special_values[0], "created": special_values[1], "items": special_values},
+    {1: "int key", "text": "emoji \U0001F600"},
+    2 ** 70,
+    [],
+    {},
+]
+
+@dataclasses.dataclass
+class _Reading:
+    value: float
+
+# NaN e infinitos viram null em todos os backends
+non_finite_payloads = [
+    (float("nan"), b"null"),
+    ([float("nan"), float("inf"), -float("inf"), 1.5], b"[null,null,null,1.5]"),
+    ({"a": {"b": (float("nan"),)}}, b'{"a":{"b":[null]}}'),
+    ([_Reading(float("inf"))], b'[{"value":null}]'),
+    ([2 ** 70, float("nan")], b"[1180591620717411303424,null]"),
+]
+
+@pytest.fixture(autouse=True)
+def restore_backend():
+    previous = json_response.get_json_backend()
+    yield
+    json_response.set_json_backend(previous)
+
+@pytest.mark.parametrize("backend", backends, ids=backend_ids)
+@pytest.mark.parametrize("value", special_values, ids=repr)
+def test_special_values_are_byte_identical(backend, value):
+    assert(backend.dumps(value) == json.dumps(value, cls=json_response.CustomJsonEncoder).encode())
+
+@pytest.mark.parametrize("backend", backends, ids=backend_ids)
+@pytest.mark.parametrize("payload", payloads, ids=repr)
+def test_payloads_match_reference(backend, payload):
+    reference = json_response.StdlibJsonBackend().dumps(payload)
+    assert(backend.dumps(payload) == reference)
+    assert(json.loads(reference) == json.loads(json.dumps(payload, cls=json_response.CustomJsonEncoder)))
+
+@pytest.mark.parametrize("backend", backends, ids=backend_ids)
+@pytest.mark.parametrize("payload,expected", non_finite_payloads, ids=repr)
+def test_non_finite_floats_become_null(backend, payload, expected):
+    assert(backend.dumps(payload) == expected)
+
+@pytest.mark.parametrize("backend", backends, ids=backend_ids)
+def test_circular_reference_still_fails(backend):
+    payload = []
+    payload.append(payload)
+    with pytest.raises((ValueError, TypeError)):
+        backend.dumps(payload)
+
+@pytest.mark.parametrize("backend", backends, ids=backend_ids)
+def test_unsupported_type_raises(backend):
+    with pytest.raises(TypeError):
+        backend.dumps({"value": object()})
+
+@pytest.mark.parametrize("backend", backends, ids=backend_ids)
+def test_make_response_uses_active_backend(backend):
+    json_response.set_json_backend(backend)
+    assert(json_response.get_json_backend() is backend)
+    response_obj = json_response.NotFound().make_response()
+    assert(response_obj.get_data() == b'{"message":"Resource Not Found","status":404}')
+
+def test_set_backend_by_name():
+    assert(json_response.set_json_backend("stdlib").name == "stdlib")
+    with pytest.raises(ValueError):
+        json_response.set_json_backend("unknown")
+
+def test_auto_selection_prefers_native_backend():
+    selected = json_response.set_json_backend()
+    assert(selected.name == backend_ids[0])
@@ -2,6 +2,7 @@ from stellrent_response import json_response
 from flask import Response
 import json
 from pydantic import BaseModel, Field, ValidationError
+from typing import List
 
 detailed_error_message = "A detailed error message"
 custom_message = "A custom Bad Request message"
@@ -97,3 +98,54 @@ def test_response_with_pydantic_validation_error():
         # assert(response_data_dict['message'] == custom_message)
         # assert(response_data_dict['details'] == detailed_error_message)
         # assert(response_data_dict['status'] == 400)
+
+class _TestItem(BaseModel):
+    price: float = Field(...)
+    quantity: int = Field(...)
+
+class _TestBulkSchema(BaseModel):
+    items: List[_TestItem] = Field(...)
+
+def _bulk_validation_error(count):
+    with pytest.raises(ValidationError) as excinfo:
+        _TestBulkSchema(items=[{"price": "free", "quantity": "many"} for _ in range(count)])
+    return excinfo.value
+
+def test_response_with_pydantic_validation_error_excludes_input_url_and_ctx():
+    bad_request_response = json_response.BadRequest(validate_exception=_bulk_validation_error(1))
+    for error in bad_request_response.details:
+        assert("input" not in error)
+        assert("url" not in error)
+        assert("ctx" not in error)
+    assert(bad_request_response.details[0]['loc'] == ['items', 0, 'price'])
+
+def test_response_with_pydantic_validation_error_truncated():
+    bad_request_response = json_response.BadRequest(validate_exception=_bulk_validation_error(50), max_errors=10)
+    __test_basic_bad_response(bad_request_response)
+    assert(len(bad_request_response.details) == 10)
+    assert(bad_request_response.truncated_errors == 90)
+    response_data_dict = json.loads(bad_request_response.make_response().get_data())
+    assert(len(response_data_dict['details']) == 10)
+    assert(response_data_dict['truncated_errors'] == 90)
+    assert(response_data_dict['status'] == 400)
+
+def test_response_with_pydantic_validation_error_grouped():
+    bad_request_response = json_response.BadRequest(validate_exception=_bulk_validation_error(50), group_errors=True)
+    assert(bad_request_response.truncated_errors == 0)
+    assert(bad_request_response.details == [
+        {"loc": "items.*.price", "type": "float_parsing", "msg": "Input should be a valid number, unable to parse string as a number", "count": 50},
+        {"loc": "items.*.quantity", "type": "int_parsing", "msg": "Input should be a valid integer, unable to parse string as an integer", "count": 50},
+    ])
+    response_data_dict = json.loads(bad_request_response.make_response().get_data())
+    assert("truncated_errors" not in response_data_dict)
+
+def test_response_with_pydantic_validation_error_class_defaults(monkeypatch):
+    monkeypatch.setattr(json_response.BadRequest, "validation_max_errors", 1)
+    monkeypatch.setattr(json_response.BadRequest, "validation_group_errors", True)
+    monkeypatch.setattr(json_response.BadRequest, "validation_include_input", True)
+    bad_request_response = json_response.BadRequest(validate_exception=_bulk_validation_error(5))
+    assert(len(bad_request_response.details) == 1)
+    assert(bad_request_response.details[0]["count"] == 5)
+    assert(bad_request_response.truncated_errors == 1)
+    ungrouped_response = json_response.BadRequest(validate_exception=_bulk_validation_error(1), group_errors=False, max_errors=5)
+    assert(ungrouped_response.details[0]["input"] == "free")
@@ -0,0 +1,73 @@
+from stellrent_response import json_response
+from flask import Flask
+import gzip
+import json
+import zlib
+import pytest
+
+app = Flask(__name__)
+large_data = [{"index": index, "name": f"record-{index}"} for index in range(500)]
+
+@pytest.fixture(autouse=True)
+def compression():
+    settings = json_response.enable_compression(min_size=256, level=6)
+    json_response._clear_envelope_cache()
+    yield settings
+    json_response.disable_compression()
+    json_response._clear_envelope_cache()
+
+def _make_response(response, accept_encoding):
+    with app.test_request_context("/", headers={"Accept-Encoding": accept_encoding}):
+        return response.make_response()
+
+def test_gzip_negotiated():
+    response_obj = _make_response(json_response.DataResponse(data=large_data), "gzip, deflate")
+    assert(response_obj.headers["Content-Encoding"] == "gzip")
+    assert(response_obj.headers["Vary"] == "Accept-Encoding")
+    assert(response_obj.content_type == "application/json")
+    assert(response_obj.content_length == len(response_obj.get_data()))
+    assert(json.loads(gzip.decompress(response_obj.get_data())) == large_data)
+
+def test_deflate_negotiated_by_quality():
+    response_obj = _make_response(json_response.DataResponse(data=large_data), "gzip;q=0.5, deflate")
+    assert(response_obj.headers["Content-Encoding"] == "deflate")
+    assert(json.loads(zlib.decompress(response_obj.get_data())) == large_data)
+
+def test_not_accepted_encoding_is_uncompressed():
+    response_obj = _make_response(json_response.DataResponse(data=large_data), "br, gzip;q=0")
+    assert("Content-Encoding" not in response_obj.headers)
+    assert(response_obj.headers["Vary"] == "Accept-Encoding")
+    assert(json.loads(response_obj.get_data()) == large_data)
+
+def test_small_envelopes_skip_compression():
+    response_obj = _make_response(json_response.NotFound(), "gzip")
+    assert("Content-Encoding" not in response_obj.headers)
+    assert("Vary" not in response_obj.headers)
+    assert(json.loads(response_obj.get_data())["status"] == 404)
+
+def test_outside_request_context_is_uncompressed():
+    response_obj = json_response.DataResponse(data=large_data).make_response()
+    assert("Content-Encoding" not in response_obj.headers)
+
+def test_cached_envelope_compressed_once():
+    message = "x" * 250
+    first = _make_response(json_response.NotFound(message=message), "gzip")
+    second = _make_response(json_response.NotFound(message=message), "gzip")
+    assert(first.headers["Content-Encoding"] == "gzip")
+    assert(first.get_data() == second.get_data())
+    cache_info = json_response._cached_compress.cache_info()
+    assert(cache_info.misses == 1)
+    assert(cache_info.hits == 1)
+
+def test_compression_level(compression):
+    json_response.enable_compression(min_size=256, level=1)
+    fastest = _make_response(json_response.DataResponse(data=large_data), "gzip")
+    json_response.enable_compression(min_size=256, level=9)
+    best = _make_response(json_response.DataResponse(data=large_data), "gzip")
+    # Byte XFL do cabeçalho gzip: 4 = compressão mais rápida, 2 = compressão máxima
+    assert(fastest.get_data()[8] == 4)
+    assert(best.get_data()[8] == 2)
+
+def test_unknown_encoding_rejected():
+    with pytest.raises(ValueError):
+        json_response.enable_compression(encodings=("br",))
@@ -0,0 +1,166 @@
+from stellrent_response import cache, json_response
+from flask import Flask, Response
+import gzip
+import json
+import pytest
+
+class Counted:
+    def __init__(self, value):
+        self.value = value
+
+encoded = []
+
+@pytest.fixture(autouse=True)
+def counted_encoder():
+    encoded.clear()
+    json_response.register_encoder(Counted, lambda obj: encoded.append(obj.value) or obj.value)
+    yield
+    json_response.unregister_encoder(Counted)
+
+@pytest.fixture
+def deferred():
+    json_response.enable_deferred_serialization()
+    yield
+    json_response.disable_deferred_serialization()
+
+records = [{"id": index, "name": f"record {index}", "value": Counted(index)} for index in range(50)]
+
+def _build_app():
+    app = Flask(__name__)
+
+    @app.route("/records", methods=["GET", "HEAD"])
+    def list_records():
+        return json_response.DataResponse(data=records, fields=json_response.requested_fields()).make_response()
+
+    @app.route("/missing")
+    def missing():
+        return json_response.NotFound(details={"id": Counted(1)}).make_response()
+
+    return app
+
+def test_disabled_by_default():
+    response_obj = json_response.DataResponse(data=records).make_response()
+    assert(not isinstance(response_obj, json_response.DeferredResponse))
+    assert(len(encoded) == 50)
+
+def test_body_is_encoded_on_first_access(deferred):
+    response_obj = json_response.NotFound(details={"id": Counted(1)}).make_response()
+    assert(isinstance(response_obj, json_response.DeferredResponse))
+    assert(response_obj.is_deferred)
+    assert(response_obj.status_code == 404)
+    assert(response_obj.api_response.message == "Resource Not Found")
+    assert(response_obj.api_response.details["id"].value == 1)
+    assert(encoded == [])
+    assert(json.loads(response_obj.get_data()) == {"message": "Resource Not Found", "details": {"id": 1}, "status": 404})
+    assert(response_obj.content_length == len(response_obj.get_data()))
+    assert(encoded == [1])
+
+def test_through_flask_matches_eager_response(deferred):
+    client = _build_app().test_client()
+    response_obj = client.get("/records?fields=id,value")
+    assert(response_obj.headers["Content-Length"] == str(len(response_obj.get_data())))
+    json_response.disable_deferred_serialization()
+    assert(response_obj.get_data() == client.get("/records?fields=id,value").get_data())
+
+def test_after_request_replacement_skips_encoding(deferred):
+    app = _build_app()
+
+    @app.after_request
+    def replace(response_obj):
+        if response_obj.status_code == 404:
+            return Response("gone", status=410)
+        return response_obj
+
+    response_obj = app.test_client().get("/missing")
+    assert(response_obj.status_code == 410)
+    assert(encoded == [])
+
+def test_head_content_length_without_encoding(deferred, monkeypatch):
+    client = _build_app().test_client()
+    body = client.get("/records?fields=name,value").get_data()
+    encoded.clear()
+
+    def fail(*args, **kwargs):
+        raise AssertionError("HEAD must not build the body")
+
+    monkeypatch.setattr(json_response, "_dumps_data", fail)
+    response_obj = client.head("/records?fields=name,value")
+    assert(response_obj.status_code == 200)
+    assert(response_obj.headers["Content-Length"] == str(len(body)))
+    assert(response_obj.get_data() == b"")
+
+def test_head_with_compression(deferred):
+    json_response.enable_compression(min_size=64)
+    try:
+        client = _build_app().test_client()
+        response_obj = client.get("/records", headers={"Accept-Encoding": "gzip"})
+        assert(response_obj.headers["Content-Encoding"] == "gzip")
+        assert("Accept-Encoding" in response_obj.headers["Vary"])
+        assert(json.loads(gzip.decompress(response_obj.get_data()))[1]["value"] == 1)
+        head = client.head("/records", headers={"Accept-Encoding": "gzip"})
+        assert(head.headers["Content-Length"] == response_obj.headers["Content-Length"])
+    finally:
+        json_response.disable_compression()
+
+def test_vary_is_merged_with_middleware_headers(deferred):
+    json_response.enable_compression(min_size=1)
+    json_response.enable_format_negotiation("msgpack")
+    try:
+        with Flask(__name__).test_request_context(headers={"Accept-Encoding": "gzip"}):
+            response_obj = json_response.DataResponse(data={"a": 1}).make_response()
+            assert(response_obj.headers["Vary"] == "Accept")
+            response_obj.headers["Vary"] = "Accept, Cookie"
+            response_obj.encode()
+        assert(response_obj.headers["Vary"] == "Accept, Cookie, Accept-Encoding")
+        assert(response_obj.headers["Content-Encoding"] == "gzip")
+    finally:
+        json_response.disable_format_negotiation()
+        json_response.disable_compression()
+
+def test_etags(deferred):
+    app = Flask(__name__)
+    app.add_url_rule("/versioned", "versioned", lambda: json_response.DataResponse(data=records).with_etag(3).make_response())
+    app.add_url_rule("/hashed", "hashed", lambda: json_response.DataResponse(data=records).with_etag().make_response())
+    client = app.test_client()
+    with app.test_request_context("/versioned"):
+        response_obj = json_response.DataResponse(data=records).with_etag(3).make_response()
+        assert(response_obj.is_deferred)
+        assert(response_obj.headers["ETag"])
+        # O ETag do corpo exige serializar antes dos cabeçalhos
+        assert(not isinstance(json_response.DataResponse(data=records).with_etag().make_response(), json_response.DeferredResponse))
+    for path in ("/versioned", "/hashed"):
+        etag = client.get(path).headers["ETag"]
+        assert(client.get(path, headers={"If-None-Match": etag}).status_code == 304)
+
+def test_set_data_replaces_deferred_body(deferred):
+    response_obj = json_response.DataResponse(data=records).make_response()
+    response_obj.set_data(b"[]")
+    assert(not response_obj.is_deferred)
+    assert(response_obj.get_data() == b"[]")
+    assert(encoded == [])
+
+def test_metrics_recorded_when_encoded(deferred):
+    metrics = json_response.enable_metrics()
+    try:
+        response_obj = json_response.DataResponse(data=records).make_response()
+        assert(metrics.snapshot()["responses"] == [])
+        size = len(response_obj.get_data())
+        sizes = {entry["class"]: entry for entry in metrics.snapshot()["payload_bytes"]}
+        assert(sizes["DataResponse"]["sum"] == size)
+    finally:
+        json_response.disable_metrics()
+
+def test_cached_view(deferred):
+    app = Flask(__name__)
+    calls = []
+
+    @app.route("/cached")
+    @cache.cached_response(ttl=10, store=cache.DictResponseStore())
+    def cached():
+        calls.append(1)
+        return json_response.DataResponse(data={"value": Counted(7)})
+
+    client = app.test_client()
+    assert(client.get("/cached").get_data() == b'{"value":7}')
+    assert(client.get("/cached").get_data() == b'{"value":7}')
+    assert(len(calls) == 1)
@@ -0,0 +1,149 @@
+from stellrent_response import json_response
+import collections
+import dataclasses
+import datetime
+import decimal
+import enum
+import ipaddress
+import json
+import pathlib
+import uuid
+import pytest
+
+class Color(enum.Enum):
+    RED = "red"
+    BLUE = "blue"
+
+class Money:
+    def __init__(self, amount, currency):
+        self.amount = amount
+        self.currency = currency
+
+class Euro(Money):
+    def __init__(self, amount):
+        super().__init__(amount, "EUR")
+
+@dataclasses.dataclass
+class Point:
+    x: int
+    price: decimal.Decimal
+
+payload = {
+    "decimal": decimal.Decimal("10.10"),
+    "enum": Color.RED,
+    "set": {1},
+    "frozenset": frozenset(["a"]),
+    "deque": collections.deque([1, 2]),
+    "ipv4": ipaddress.IPv4Address("10.0.0.1"),
+    "ipv6": ipaddress.IPv6Address("::1"),
+    "network": ipaddress.ip_network("10.0.0.0/8"),
+    "path": pathlib.PurePosixPath("/tmp/report.json"),
+    "time": datetime.time(12, 30),
+    "timedelta": datetime.timedelta(minutes=1, seconds=30),
+    "uuid": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+    "dataclass": Point(x=1, price=decimal.Decimal("2.50")),
+}
+
+expected = {
+    "decimal": "10.10",
+    "enum": "red",
+    "set": [1],
+    "frozenset": ["a"],
+    "deque": [1, 2],
+    "ipv4": "10.0.0.1",
+    "ipv6": "::1",
+    "network": "10.0.0.0/8",
+    "path": "/tmp/report.json",
+    "time": "12:30:00",
+    "timedelta": 90.0,
+    "uuid": "12345678-1234-5678-1234-567812345678",
+    "dataclass": {"x": 1, "price": "2.50"},
+}
+
+@pytest.fixture(params=["stdlib", "orjson"])
+def backend(request):
+    previous = json_response.get_json_backend()
+    json_response.set_json_backend(request.param)
+    yield request.param
+    json_response.set_json_backend(previous)
+
+@pytest.fixture
+def money_encoder():
+    json_response.register_encoder(Money, lambda value: {"amount": str(value.amount), "currency": value.currency})
+    yield
+    json_response.unregister_encoder(Money)
+    json_response.unregister_encoder(Euro)
+
+def test_builtin_encoders(backend):
+    response_obj = json_response.DataResponse(data=payload).make_response()
+    assert(json.loads(response_obj.get_data()) == expected)
+
+def test_builtin_encoders_in_msgpack():
+    msgpack = pytest.importorskip("msgpack")
+    assert(msgpack.unpackb(json_response.MessagePackFormat().dumps(payload)) == expected)
+
+def test_registered_encoder_applies_to_subclasses(backend, money_encoder):
+    body = json_response.ConfirmationResponse(details=[Money(decimal.Decimal("1.5"), "BRL"), Euro(2)]).make_response().get_data()
+    assert(json.loads(body)["details"] == [{"amount": "1.5", "currency": "BRL"}, {"amount": "2", "currency": "EUR"}])
+
+def test_more_specific_encoder_wins(backend, money_encoder):
+    # Euro já foi resolvido via Money; registrar um encoder invalida o cache
+    json_response.DataResponse(data=Euro(1)).make_response()
+    json_response.register_encoder(Euro, lambda value: f"EUR {value.amount}")
+    assert(json_response.DataResponse(data=[Euro(1), Money(1, "BRL")]).make_response().get_data() == b'["EUR 1",{"amount":"1","currency":"BRL"}]')
+
+def test_decorator_registration(backend):
+    @json_response.register_encoder(Money)
+    def encode_money(value):
+        return value.currency
+
+    try:
+        assert(encode_money(Money(1, "BRL")) == "BRL")
+        assert(json_response.DataResponse(data=[Money(1, "BRL")]).make_response().get_data() == b'["BRL"]')
+    finally:
+        json_response.unregister_encoder(Money)
+
+def test_unknown_type_still_fails(backend):
+    with pytest.raises(TypeError):
+        json_response.DataResponse(data={"value": object()}).make_response()
+    with pytest.raises(TypeError):
+        json_response.DataResponse(data=[Money(1, "BRL")]).make_response()
+
+def test_registered_encoder_wins_over_dataclass(backend):
+    json_response.register_encoder(Point, lambda value: f"{value.price} x{value.x}")
+    try:
+        for data, body in (
+            (Point(3, decimal.Decimal("1.50")), b'"1.50 x3"'),
+            ({"point": Point(3, decimal.Decimal("1.50"))}, b'{"point":"1.50 x3"}'),
+            ([Point(3, decimal.Decimal("1.50"))], b'["1.50 x3"]'),
+        ):
+            assert(json_response.DataResponse(data=data).make_response().get_data() == body)
+    finally:
+        json_response.unregister_encoder(Point)
+
+def test_fields_apply_to_registered_encoder_output(backend):
+    json_response.register_encoder(Point, lambda value: {"x": value.x, "price": str(value.price), "label": "point"})
+    try:
+        response_obj = json_response.DataResponse(data=[Point(3, decimal.Decimal("1.50"))], fields="x,label").make_response()
+        assert(json.loads(response_obj.get_data()) == [{"x": 3, "label": "point"}])
+    finally:
+        json_response.unregister_encoder(Point)
+
+def test_registered_encoder_wins_over_pydantic_model(backend):
+    pydantic = pytest.importorskip("pydantic")
+
+    class Amount(pydantic.BaseModel):
+        value: decimal.Decimal
+
+    json_response.register_encoder(Amount, lambda value: f"{value.value} EUR")
+    try:
+        for data, body in ((Amount(value="3"), b'"3 EUR"'), ([Amount(value="3")], b'["3 EUR"]'), ({"m": Amount(value="3")}, b'{"m":"3 EUR"}')):
+            assert(json_response.DataResponse(data=data).make_response().get_data() == body)
+    finally:
+        json_response.unregister_encoder(Amount)
+
+@pytest.mark.parametrize("obj_type", [Color, enum.Enum, uuid.UUID])
+def test_natively_serialized_types_are_rejected(obj_type):
+    with pytest.raises(TypeError):
+        json_response.register_encoder(obj_type, str)
+    assert(json_response.DataResponse(data=[Color.RED, uuid.UUID(int=1)]).make_response().get_data() == b'["red","00000000-0000-0000-0000-000000000001"]')
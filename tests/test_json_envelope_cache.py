@@ -0,0 +1,61 @@
+from stellrent_response import json_response
+import json
+import pytest
+
+@pytest.fixture(autouse=True)
+def clean_cache():
+    json_response._clear_envelope_cache()
+    yield
+    json_response._clear_envelope_cache()
+
+@pytest.mark.parametrize("response_class,status_code", [
+    (json_response.NotFound, 404),
+    (json_response.Unauthorized, 401),
+    (json_response.Forbidden, 403),
+    (json_response.MethodNotAllowed, 405),
+    (json_response.ConfirmationResponse, 200),
+])
+def test_constant_envelopes_are_cached(response_class, status_code):
+    first = response_class().make_response().get_data()
+    second = response_class().make_response().get_data()
+    assert(first == second)
+    assert(json.loads(first) == {"message": json_response.default_messages[status_code], "status": status_code})
+    cache_info = json_response._cached_envelope.cache_info()
+    assert(cache_info.misses == 1)
+    assert(cache_info.hits == 1)
+
+def test_custom_message_is_cached():
+    json_response.NotFound(message="Order not found").make_response()
+    response_obj = json_response.NotFound(message="Order not found").make_response()
+    assert(json.loads(response_obj.get_data()) == {"message": "Order not found", "status": 404})
+    assert(json_response._cached_envelope.cache_info().hits == 1)
+
+def test_long_custom_message_is_not_cached():
+    message = "x" * (json_response.ENVELOPE_CACHE_MAX_MESSAGE_LENGTH + 1)
+    response_obj = json_response.NotFound(message=message).make_response()
+    assert(json.loads(response_obj.get_data()) == {"message": message, "status": 404})
+    assert(json_response._cached_envelope.cache_info().currsize == 0)
+
+def test_details_bypass_cache():
+    response_obj = json_response.NotFound(details="Order 10").make_response()
+    assert(json.loads(response_obj.get_data())["details"] == "Order 10")
+    assert(json_response._cached_envelope.cache_info().currsize == 0)
+
+def test_cache_is_bounded():
+    for index in range(json_response.ENVELOPE_CACHE_SIZE + 10):
+        json_response.NotFound(message=f"Message {index}").make_response()
+    assert(json_response._cached_envelope.cache_info().currsize == json_response.ENVELOPE_CACHE_SIZE)
+
+def test_cache_invalidated_when_default_messages_change():
+    original = json_response.default_messages[404]
+    json_response.NotFound().make_response()
+    assert(json_response._cached_envelope.cache_info().currsize == 1)
+    try:
+        json_response.default_messages[404] = "Nothing here"
+        assert(json_response._cached_envelope.cache_info().currsize == 0)
+        response_obj = json_response.NotFound().make_response()
+        assert(json.loads(response_obj.get_data())["message"] == "Nothing here")
+    finally:
+        json_response.default_messages[404] = original
+    response_obj = json_response.NotFound().make_response()
+    assert(json.loads(response_obj.get_data())["message"] == original)
@@ -0,0 +1,92 @@
+from stellrent_response import json_response
+from flask import Flask
+import gzip
+import json
+import pytest
+
+app = Flask(__name__)
+content_response_data = {"param1": "value1", "param2": "value2"}
+
+class _CountingData(dict):
+    """Dicionário que conta quantas vezes foi serializado pelo backend stdlib."""
+    encoded = 0
+
+    def items(self):
+        _CountingData.encoded += 1
+        return super().items()
+
+@pytest.fixture(autouse=True)
+def stdlib_backend():
+    previous = json_response.get_json_backend()
+    json_response.set_json_backend("stdlib")
+    yield
+    json_response.set_json_backend(previous)
+    json_response.disable_compression()
+
+def _make_response(response, method="GET", **headers):
+    with app.test_request_context("/", method=method, headers=headers):
+        return response.make_response()
+
+def test_body_etag():
+    response_obj = _make_response(json_response.DataResponse(data=content_response_data).with_etag())
+    etag = response_obj.headers["ETag"]
+    assert(response_obj.status_code == 200)
+    assert(etag.startswith('"') and etag.endswith('"'))
+    same_response_obj = _make_response(json_response.DataResponse(data=dict(content_response_data)).with_etag())
+    assert(same_response_obj.headers["ETag"] == etag)
+    other_response_obj = _make_response(json_response.DataResponse(data={"param1": "other"}).with_etag())
+    assert(other_response_obj.headers["ETag"] != etag)
+
+def test_body_etag_not_modified():
+    etag = _make_response(json_response.DataResponse(data=content_response_data).with_etag()).headers["ETag"]
+    response_obj = _make_response(json_response.DataResponse(data=content_response_data).with_etag(), **{"If-None-Match": etag})
+    assert(response_obj.status_code == 304)
+    assert(response_obj.get_data() == b"")
+    assert(response_obj.headers["ETag"] == etag)
+
+def test_version_etag_skips_serialization():
+    data = _CountingData(content_response_data)
+    response_obj = _make_response(json_response.DataResponse(data=data).with_etag(version="42"))
+    assert(response_obj.status_code == 200)
+    assert(_CountingData.encoded == 1)
+    etag = response_obj.headers["ETag"]
+    not_modified = _make_response(json_response.DataResponse(data=data).with_etag(version="42"), **{"If-None-Match": etag})
+    assert(not_modified.status_code == 304)
+    assert(_CountingData.encoded == 1)
+    changed = _make_response(json_response.DataResponse(data=data).with_etag(version="43"), **{"If-None-Match": etag})
+    assert(changed.status_code == 200)
+    assert(changed.headers["ETag"] != etag)
+
+def test_star_and_weak_match():
+    star = _make_response(json_response.DataResponse(data=content_response_data).with_etag(version=1), **{"If-None-Match": "*"})
+    assert(star.status_code == 304)
+    etag = _make_response(json_response.DataResponse(data=content_response_data).with_etag(version=1)).headers["ETag"]
+    weak = _make_response(json_response.DataResponse(data=content_response_data).with_etag(version=1), **{"If-None-Match": "W/" + etag})
+    assert(weak.status_code == 304)
+
+def test_unsafe_methods_and_errors_ignore_if_none_match():
+    etag = _make_response(json_response.DataResponse(data=content_response_data).with_etag(version=1)).headers["ETag"]
+    post = _make_response(json_response.DataResponse(data=content_response_data).with_etag(version=1), method="POST", **{"If-None-Match": etag})
+    assert(post.status_code == 200)
+    not_found = _make_response(json_response.NotFound().with_etag(), **{"If-None-Match": "*"})
+    assert(not_found.status_code == 404)
+    assert("ETag" not in not_found.headers)
+
+def test_etag_is_disabled_by_default():
+    response_obj = _make_response(json_response.DataResponse(data=content_response_data), **{"If-None-Match": "*"})
+    assert(response_obj.status_code == 200)
+    assert("ETag" not in response_obj.headers)
+
+def test_compressed_representation_has_distinct_etag():
+    json_response.enable_compression(min_size=1)
+    data = [content_response_data] * 10
+    plain = _make_response(json_response.DataResponse(data=data).with_etag())
+    compressed = _make_response(json_response.DataResponse(data=data).with_etag(), **{"Accept-Encoding": "gzip"})
+    assert(json.loads(gzip.decompress(compressed.get_data())) == data)
+    assert(compressed.headers["ETag"] == plain.headers["ETag"][:-1] + '-gzip"')
+    not_modified = _make_response(
+        json_response.DataResponse(data=data).with_etag(),
+        **{"Accept-Encoding": "gzip", "If-None-Match": compressed.headers["ETag"]}
+    )
+    assert(not_modified.status_code == 304)
+    assert(not_modified.headers["ETag"] == compressed.headers["ETag"])
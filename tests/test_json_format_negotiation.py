@@ -0,0 +1,121 @@
+from stellrent_response import json_response
+from flask import Flask
+import collections
+import datetime
+import decimal
+import fractions
+import ipaddress
+import json
+import uuid
+import pytest
+
+msgpack = pytest.importorskip("msgpack")
+cbor2 = pytest.importorskip("cbor2")
+
+app = Flask(__name__)
+
+record_id = uuid.UUID("12345678-1234-5678-1234-567812345678")
+created = datetime.datetime(2024, 1, 2, 3, 4, 5, tzinfo=datetime.timezone.utc)
+content_response_data = {"id": record_id, "created": created, "day": datetime.date(2024, 1, 2), "naive": datetime.datetime(2024, 1, 2)}
+
+@pytest.fixture(autouse=True)
+def negotiation():
+    json_response.enable_format_negotiation("msgpack", "cbor")
+    yield
+    json_response.disable_format_negotiation()
+
+def _make_response(response, accept):
+    with app.test_request_context("/", headers={"Accept": accept}):
+        return response.make_response()
+
+def test_json_is_default():
+    for accept in ("*/*", "application/json", "text/html", "application/json, application/msgpack"):
+        response_obj = _make_response(json_response.NotFound(), accept)
+        assert(response_obj.content_type == "application/json")
+        assert(response_obj.headers["Vary"] == "Accept")
+        assert(json.loads(response_obj.get_data()) == {"message": "Resource Not Found", "status": 404})
+
+def test_msgpack_envelope():
+    response_obj = _make_response(json_response.BadRequest(details="invalid"), "application/msgpack")
+    assert(response_obj.status_code == 400)
+    assert(response_obj.content_type == "application/msgpack")
+    assert(msgpack.unpackb(response_obj.get_data()) == {"message": "Bad Request", "details": "invalid", "status": 400})
+    legacy = _make_response(json_response.NotFound(), "application/x-msgpack")
+    assert(legacy.content_type == "application/x-msgpack")
+    assert(msgpack.unpackb(legacy.get_data()) == {"message": "Resource Not Found", "status": 404})
+
+def test_msgpack_data_mapping():
+    response_obj = _make_response(json_response.DataResponse(data=content_response_data), "application/msgpack")
+    assert(msgpack.unpackb(response_obj.get_data()) == {
+        "id": str(record_id),
+        "created": created.isoformat(),
+        "day": "2024-01-02",
+        "naive": "2024-01-02T00:00:00",
+    })
+
+def test_cbor_data_mapping():
+    response_obj = _make_response(json_response.DataResponse(data=content_response_data), "application/cbor")
+    assert(response_obj.content_type == "application/cbor")
+    decoded = cbor2.loads(response_obj.get_data())
+    assert(decoded == {"id": record_id, "created": created, "day": datetime.date(2024, 1, 2), "naive": "2024-01-02T00:00:00"})
+    # Tag 0 com o texto de isoformat() e tag 37 com os 16 bytes do UUID
+    assert(b"\xc0" + cbor2.dumps(created.isoformat()) in response_obj.get_data())
+    assert(b"\xd8\x25" + cbor2.dumps(record_id.bytes) in response_obj.get_data())
+
+def test_cbor_envelope_and_no_content():
+    response_obj = _make_response(json_response.ConfirmationResponse(details={"id": record_id}), "application/cbor")
+    assert(cbor2.loads(response_obj.get_data()) == {"message": "Request executed successfully", "details": {"id": record_id}, "status": 200})
+    no_content = _make_response(json_response.NoDataResponse(), "application/cbor")
+    assert(no_content.status_code == 204)
+    assert(no_content.get_data() == b"")
+
+def test_quality_values():
+    response_obj = _make_response(json_response.NotFound(), "application/json;q=0.5, application/cbor")
+    assert(response_obj.content_type == "application/cbor")
+
+def test_envelope_cache_is_per_format():
+    json_body = _make_response(json_response.NotFound(), "application/json").get_data()
+    msgpack_body = _make_response(json_response.NotFound(), "application/msgpack").get_data()
+    assert(json_body != msgpack_body)
+    assert(_make_response(json_response.NotFound(), "application/json").get_data() == json_body)
+
+def test_version_etag_is_per_format():
+    json_etag = _make_response(json_response.DataResponse(data=[1]).with_etag(version=1), "application/json").headers["ETag"]
+    cbor_etag = _make_response(json_response.DataResponse(data=[1]).with_etag(version=1), "application/cbor").headers["ETag"]
+    assert(json_etag != cbor_etag)
+
+def test_negotiation_disabled_by_default():
+    json_response.disable_format_negotiation()
+    response_obj = _make_response(json_response.NotFound(), "application/msgpack")
+    assert(response_obj.content_type == "application/json")
+    assert("Vary" not in response_obj.headers)
+
+def test_unknown_format_rejected():
+    with pytest.raises(ValueError):
+        json_response.enable_format_negotiation("xml")
+
+def test_registry_types_match_across_formats():
+    data = {
+        "decimal": decimal.Decimal("1.50"),
+        "set": {1},
+        "frozenset": frozenset([2]),
+        "ip": ipaddress.IPv4Address("10.0.0.1"),
+        "network": ipaddress.ip_network("10.0.0.0/8"),
+        "interface": ipaddress.IPv6Interface("::1/128"),
+    }
+    expected = {"decimal": "1.50", "set": [1], "frozenset": [2], "ip": "10.0.0.1", "network": "10.0.0.0/8", "interface": "::1/128"}
+    assert(json.loads(_make_response(json_response.DataResponse(data=data), "application/json").get_data()) == expected)
+    assert(msgpack.unpackb(_make_response(json_response.DataResponse(data=data), "application/msgpack").get_data()) == expected)
+    assert(cbor2.loads(_make_response(json_response.DataResponse(data=data), "application/cbor").get_data()) == expected)
+
+    json_response.register_encoder(fractions.Fraction, str)
+    json_response.register_encoder(collections.deque, len)
+    try:
+        data = {"fraction": fractions.Fraction(1, 2), "deque": collections.deque([1, 2])}
+        expected = {"fraction": "1/2", "deque": 2}
+        assert(cbor2.loads(_make_response(json_response.DataResponse(data=data), "application/cbor").get_data()) == expected)
+        assert(msgpack.unpackb(_make_response(json_response.DataResponse(data=data), "application/msgpack").get_data()) == expected)
+    finally:
+        json_response.unregister_encoder(fractions.Fraction)
+        json_response.register_encoder(collections.deque, list)
+    assert(cbor2.loads(_make_response(json_response.DataResponse(data=[collections.deque([1])]), "application/cbor").get_data()) == [[1]])
@@ -0,0 +1,45 @@
+import json
+import subprocess
+import sys
+
+# Tempo máximo para importar json_response com o Flask já carregado
+IMPORT_BUDGET_SECONDS = 0.1
+
+def _run(code):
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return json.loads(result.stdout)
+
+def test_import_does_not_load_pydantic():
+    report = _run(
+        "import json, sys, time\n"
+        "import flask\n"
+        "started = time.perf_counter()\n"
+        "from stellrent_response import json_response\n"
+        "elapsed = time.perf_counter() - started\n"
+        "json_response.DataResponse(data={'a': 1}).make_response()\n"
+        "json_response.NotFound().make_response()\n"
+        "json_response.BadRequest(details='invalid').make_response()\n"
+        "import dataclasses\n"
+        "Point = dataclasses.make_dataclass('Point', [('x', int)])\n"
+        "json_response.DataResponse(data=Point(1)).make_response()\n"
+        "json_response.DataResponse(data=[Point(1), Point(2)], fields='x').make_response()\n"
+        "print(json.dumps({'elapsed': elapsed, 'pydantic': 'pydantic' in sys.modules, 'numpy': 'numpy' in sys.modules}))\n"
+    )
+    assert(report["pydantic"] is False)
+    assert(report["numpy"] is False)
+    assert(report["elapsed"] < IMPORT_BUDGET_SECONDS)
+
+def test_works_without_pydantic():
+    report = _run(
+        "import dataclasses, json, sys\n"
+        "sys.modules['pydantic'] = None\n"
+        "from stellrent_response import json_response\n"
+        "@dataclasses.dataclass\n"
+        "class Point:\n"
+        "    x: int\n"
+        "body = json_response.DataResponse(data=[Point(1), Point(2)]).make_response().get_data()\n"
+        "error = json_response.BadRequest(details='invalid').make_response().get_data()\n"
+        "print(json.dumps({'body': body.decode(), 'error': error.decode()}))\n"
+    )
+    assert(json.loads(report["body"]) == [{"x": 1}, {"x": 2}])
+    assert(json.loads(report["error"]) == {"message": "Bad Request", "details": "invalid", "status": 400})
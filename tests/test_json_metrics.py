@@ -0,0 +1,115 @@
+from stellrent_response import json_response
+from flask import Flask
+import threading
+import pytest
+
+@pytest.fixture
+def metrics():
+    collector = json_response.enable_metrics()
+    yield collector
+    json_response.disable_metrics()
+
+def _responses(snapshot):
+    return {(entry["class"], entry["status"]): entry["count"] for entry in snapshot["responses"]}
+
+def test_disabled_by_default():
+    assert(json_response.get_metrics() is None)
+    json_response.NotFound().make_response()
+    with pytest.raises(RuntimeError):
+        json_response.add_metrics_callback(lambda *args: None)
+
+def test_counts_by_class_and_status(metrics):
+    json_response.NotFound().make_response()
+    json_response.NotFound().make_response()
+    json_response.DataResponse(data=[1, 2, 3]).make_response()
+    json_response.NoDataResponse().make_response()
+    json_response.StreamingDataResponse(data=iter([])).make_response()
+    assert(_responses(metrics.snapshot()) == {
+        ("NotFound", 404): 2,
+        ("DataResponse", 200): 1,
+        ("NoDataResponse", 204): 1,
+        ("StreamingDataResponse", 200): 1,
+    })
+
+def test_histograms(metrics):
+    json_response.DataResponse(data=[1, 2, 3]).make_response()
+    snapshot = metrics.snapshot()
+    sizes = {entry["class"]: entry for entry in snapshot["payload_bytes"]}
+    assert(sizes["DataResponse"]["count"] == 1)
+    assert(sizes["DataResponse"]["sum"] == len(b"[1,2,3]"))
+    assert(sizes["DataResponse"]["buckets"][128] == 1)
+    seconds = {entry["class"]: entry for entry in snapshot["serialization_seconds"]}
+    assert(seconds["DataResponse"]["count"] == 1)
+    assert(seconds["DataResponse"]["sum"] >= 0)
+
+def test_callback_receives_events(metrics):
+    events = []
+    json_response.add_metrics_callback(lambda *event: events.append(event))
+    json_response.add_metrics_callback(lambda *event: 1 / 0)
+    app = Flask(__name__)
+
+    @app.route("/missing")
+    def missing():
+        return json_response.NotFound().make_response()
+
+    assert(app.test_client().get("/missing").status_code == 404)
+    class_name, status_code, seconds, size, endpoint = events[0]
+    assert((class_name, status_code, endpoint) == ("NotFound", 404, "missing"))
+    assert(size == len(b'{"message":"Resource Not Found","status":404}'))
+    assert(seconds >= 0)
+
+def test_prometheus_rendering(metrics):
+    app = Flask(__name__)
+    app.add_url_rule("/metrics", view_func=json_response.metrics_view)
+
+    @app.route("/items")
+    def items():
+        return json_response.DataResponse(data={"a": 1}).make_response()
+
+    client = app.test_client()
+    client.get("/items")
+    response_obj = client.get("/metrics")
+    assert(response_obj.content_type.startswith("text/plain; version=0.0.4"))
+    text = response_obj.get_data(as_text=True)
+    assert('stellrent_responses_total{class="DataResponse",status="200"} 1' in text)
+    assert("# TYPE stellrent_response_serialization_seconds histogram" in text)
+    assert('stellrent_response_payload_bytes_bucket{class="DataResponse",endpoint="items",le="128"} 1' in text)
+    assert('stellrent_response_payload_bytes_bucket{class="DataResponse",endpoint="items",le="+Inf"} 1' in text)
+    assert('stellrent_response_payload_bytes_count{class="DataResponse",endpoint="items"} 1' in text)
+
+def test_thread_safety(metrics):
+    def worker():
+        for _ in range(500):
+            json_response.NotFound().make_response()
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert(_responses(metrics.snapshot())[("NotFound", 404)] == 4000)
+    sizes = {entry["class"]: entry for entry in metrics.snapshot()["payload_bytes"]}
+    assert(sizes["NotFound"]["count"] == 4000)
+
+def test_reset(metrics):
+    json_response.NotFound().make_response()
+    metrics.reset()
+    assert(metrics.snapshot()["responses"] == [])
+
+@pytest.mark.parametrize("spill", [False, True])
+def test_body_etag_not_modified_is_counted_as_304(metrics, spill):
+    if spill:
+        json_response.enable_spill_to_disk(memory_limit=1)
+    try:
+        app = Flask(__name__)
+        app.add_url_rule("/hashed", "hashed", lambda: json_response.DataResponse(data=[1, 2, 3]).with_etag().make_response())
+        client = app.test_client()
+        response_obj = client.get("/hashed")
+        etag = response_obj.headers["ETag"]
+        response_obj.close()
+        assert(client.get("/hashed", headers={"If-None-Match": etag}).status_code == 304)
+    finally:
+        json_response.disable_spill_to_disk()
+    assert(_responses(metrics.snapshot()) == {("DataResponse", 200): 1, ("DataResponse", 304): 1})
+    sizes = {entry["class"]: entry for entry in metrics.snapshot()["payload_bytes"]}
+    assert(sizes["DataResponse"]["count"] == 1)
@@ -0,0 +1,95 @@
+from stellrent_response import json_response
+from flask import Flask
+from pydantic import ValidationError, BaseModel
+import json
+import pytest
+
+app = Flask(__name__)
+
+class Item(BaseModel):
+    price: float
+
+def _responses():
+    try:
+        Item(price="free")
+    except ValidationError as exc:
+        bad_request = json_response.BadRequest(validate_exception=exc)
+    return [
+        json_response.DataResponse(data={"id": 1}),
+        json_response.NotFound(),
+        bad_request,
+        json_response.NoDataResponse(),
+        json_response.CreateConfirmationResponse(data={"id": 2}),
+    ]
+
+def _individual_bodies(responses):
+    bodies = []
+    for response in responses:
+        data = response.make_response().get_data()
+        bodies.append({"status": response.status_code, "body": json.loads(data) if data else None})
+    return bodies
+
+def test_multi_status_body():
+    response_obj = json_response.MultiStatusResponse(_responses()).make_response()
+    assert(response_obj.status_code == 207)
+    assert(response_obj.content_type == "application/json")
+    body = json.loads(response_obj.get_data())
+    assert(body == _individual_bodies(_responses()))
+    assert(body[1] == {"status": 404, "body": {"message": "Resource Not Found", "status": 404}})
+    assert(body[3] == {"status": 204, "body": None})
+
+def test_entries_reuse_encoded_bytes():
+    response_obj = json_response.MultiStatusResponse([json_response.NotFound(), json_response.DataResponse(data=[1, 2])]).make_response()
+    not_found = json_response.NotFound().make_response().get_data()
+    assert(response_obj.get_data() == b'[{"status":404,"body":' + not_found + b'},{"status":200,"body":[1,2]}]')
+
+def test_empty_batch():
+    assert(json_response.MultiStatusResponse([]).make_response().get_data() == b"[]")
+
+def test_nested_fields_selection():
+    response_obj = json_response.MultiStatusResponse([json_response.DataResponse(data={"id": 1, "name": "x"}, fields="id")]).make_response()
+    assert(json.loads(response_obj.get_data()) == [{"status": 200, "body": {"id": 1}}])
+
+def test_streaming_batch():
+    responses = (json_response.NotFound() if index % 2 else json_response.DataResponse(data={"index": index}) for index in range(500))
+    response_obj = json_response.MultiStatusResponse(responses, stream=True, chunk_size=256).make_response()
+    assert(response_obj.is_streamed)
+    chunks = list(response_obj.response)
+    assert(len(chunks) > 1)
+    body = json.loads(b"".join(chunks))
+    assert(len(body) == 500)
+    assert(body[0] == {"status": 200, "body": {"index": 0}})
+    assert(body[1]["status"] == 404)
+
+def test_streaming_matches_buffered():
+    streamed = json_response.MultiStatusResponse(_responses(), stream=True).make_response()
+    buffered = json_response.MultiStatusResponse(_responses()).make_response()
+    assert(b"".join(streamed.response) == buffered.get_data())
+
+def test_other_formats():
+    msgpack = pytest.importorskip("msgpack")
+    json_response.enable_format_negotiation("msgpack")
+    try:
+        with app.test_request_context("/", headers={"Accept": "application/msgpack"}):
+            response_obj = json_response.MultiStatusResponse(_responses()).make_response()
+    finally:
+        json_response.disable_format_negotiation()
+    assert(response_obj.content_type == "application/msgpack")
+    assert(msgpack.unpackb(response_obj.get_data()) == _individual_bodies(_responses()))
+
+def test_streaming_data_response_entry():
+    entries = [json_response.StreamingDataResponse(data=iter([{"a": 1}, {"a": 2}])), json_response.NotFound()]
+    body = json.loads(json_response.MultiStatusResponse(entries).make_response().get_data())
+    assert(body[0] == {"status": 200, "body": [{"a": 1}, {"a": 2}]})
+    assert(body[1]["status"] == 404)
+
+def test_streaming_data_response_entry_in_other_formats():
+    msgpack = pytest.importorskip("msgpack")
+    json_response.enable_format_negotiation("msgpack")
+    try:
+        with app.test_request_context("/", headers={"Accept": "application/msgpack"}):
+            entries = [json_response.StreamingDataResponse(data=(index for index in range(3)))]
+            response_obj = json_response.MultiStatusResponse(entries).make_response()
+    finally:
+        json_response.disable_format_negotiation()
+    assert(msgpack.unpackb(response_obj.get_data()) == [{"status": 200, "body": [0, 1, 2]}])
@@ -0,0 +1,147 @@
+from stellrent_response import json_response
+from flask import Flask
+import json
+import pytest
+
+numpy = pytest.importorskip("numpy")
+from stellrent_response import numpy_encoding
+
+app = Flask(__name__)
+
+def _records():
+    records = numpy.zeros(4, dtype=[("id", "i8"), ("value", "f8"), ("label", "U8"), ("active", "?")])
+    records["id"] = [1, 2, 3, 4]
+    records["value"] = [1.5, numpy.nan, numpy.inf, -numpy.inf]
+    records["label"] = ["a,b", 'quote"', "", "café"]
+    records["active"] = [True, False, True, False]
+    return records
+
+expected_rows = [
+    {"id": 1, "value": 1.5, "label": "a,b", "active": True},
+    {"id": 2, "value": None, "label": 'quote"', "active": False},
+    {"id": 3, "value": None, "label": "", "active": True},
+    {"id": 4, "value": None, "label": "café", "active": False},
+]
+
+expected_columns = {
+    "id": [1, 2, 3, 4],
+    "value": [1.5, None, None, None],
+    "label": ["a,b", 'quote"', "", "café"],
+    "active": [True, False, True, False],
+}
+
+@pytest.fixture(params=["orjson", "fallback"])
+def bulk_path(request, monkeypatch):
+    if request.param == "fallback":
+        monkeypatch.setattr(numpy_encoding, "orjson", None)
+    return request.param
+
+def _body(response):
+    return json.loads(response.make_response().get_data())
+
+def test_record_array_rows(bulk_path):
+    assert(_body(json_response.DataResponse(data=_records())) == expected_rows)
+
+def test_record_array_columns(bulk_path):
+    assert(_body(json_response.DataResponse(data=_records(), layout="columns")) == expected_columns)
+
+def test_rows_match_row_by_row_encoding():
+    records = numpy.zeros(10000, dtype=[("id", "i8"), ("value", "f4"), ("flag", "u1")])
+    records["id"] = numpy.arange(10000)
+    records["value"] = numpy.linspace(0, 1, 10000)
+    numpy_encoding.ROWS_CHUNK_BYTES, previous = 1000, numpy_encoding.ROWS_CHUNK_BYTES
+    try:
+        body = json_response.DataResponse(data=records).make_response().get_data()
+    finally:
+        numpy_encoding.ROWS_CHUNK_BYTES = previous
+    assert(json.loads(body) == numpy_encoding.to_python(records))
+
+def test_plain_arrays(bulk_path):
+    matrix = numpy.arange(6).reshape(2, 3)
+    assert(_body(json_response.DataResponse(data=matrix)) == [[0, 1, 2], [3, 4, 5]])
+    assert(_body(json_response.DataResponse(data=matrix, layout="columns")) == [[0, 3], [1, 4], [2, 5]])
+    assert(_body(json_response.DataResponse(data=numpy.array([0.5, numpy.nan]))) == [0.5, None])
+    assert(_body(json_response.DataResponse(data=numpy.array([], dtype="f8"))) == [])
+    assert(_body(json_response.DataResponse(data=_records()[:0])) == [])
+
+def test_datetime_columns(bulk_path):
+    records = numpy.zeros(2, dtype=[("at", "datetime64[ns]")])
+    records["at"] = [numpy.datetime64("2024-01-02T03:04:05.5"), numpy.datetime64("NaT")]
+    assert(_body(json_response.DataResponse(data=records, layout="columns")) == {"at": ["2024-01-02T03:04:05.500000", None]})
+
+@pytest.fixture(params=["stdlib", "orjson"])
+def backend(request):
+    previous = json_response.get_json_backend()
+    json_response.set_json_backend(request.param)
+    yield request.param
+    json_response.set_json_backend(previous)
+
+@pytest.mark.parametrize("unit,text", [("D", "2024-01-02"), ("s", "2024-01-02T00:00:00")])
+@pytest.mark.parametrize("layout", ["rows", "columns"])
+def test_nat_becomes_null(backend, layout, unit, text):
+    dates = numpy.array(["2024-01-02", "NaT"], dtype=f"datetime64[{unit}]")
+    records = numpy.zeros(2, dtype=[("at", f"datetime64[{unit}]"), ("id", "i8")])
+    records["at"] = dates
+    records["id"] = [1, 2]
+    assert(_body(json_response.DataResponse(data=dates, layout=layout)) == [text, None])
+    assert(_body(json_response.DataResponse(data={"dates": dates})) == {"dates": [text, None]})
+    expected = [{"at": text, "id": 1}, {"at": None, "id": 2}]
+    if layout == "columns":
+        expected = {"at": [text, None], "id": [1, 2]}
+    assert(_body(json_response.DataResponse(data=records, layout=layout)) == expected)
+
+def test_stdlib_backend_is_honoured(monkeypatch):
+    # Com o backend stdlib ativo, o orjson não é chamado nem para colunas numéricas
+    class _Unused:
+        @staticmethod
+        def dumps(*args, **kwargs):
+            raise AssertionError("orjson used with the stdlib backend")
+
+    monkeypatch.setattr(numpy_encoding, "orjson", _Unused)
+    previous = json_response.get_json_backend()
+    json_response.set_json_backend("stdlib")
+    try:
+        assert(_body(json_response.DataResponse(data=_records())) == expected_rows)
+        assert(_body(json_response.DataResponse(data=numpy.array([0.5, numpy.nan]))) == [0.5, None])
+    finally:
+        json_response.set_json_backend(previous)
+
+def test_fields_select_columns():
+    assert(_body(json_response.DataResponse(data=_records(), fields="label,id")) == [
+        {"label": row["label"], "id": row["id"]} for row in expected_rows
+    ])
+
+@pytest.mark.parametrize("backend", ["stdlib", "orjson"])
+def test_nested_arrays_and_scalars(backend):
+    previous = json_response.get_json_backend()
+    json_response.set_json_backend(backend)
+    try:
+        data = {"count": numpy.int64(3), "ratio": numpy.float32(0.5), "missing": numpy.float32(numpy.nan), "flag": numpy.bool_(True), "values": numpy.array([1, 2])}
+        assert(_body(json_response.DataResponse(data=data)) == {"count": 3, "ratio": 0.5, "missing": None, "flag": True, "values": [1, 2]})
+    finally:
+        json_response.set_json_backend(previous)
+
+@pytest.mark.parametrize("backend", ["stdlib", "orjson"])
+def test_float32_scalars_use_shortest_representation(backend):
+    previous = json_response.get_json_backend()
+    json_response.set_json_backend(backend)
+    try:
+        body = json_response.DataResponse(data={"a": numpy.float32(0.1), "b": numpy.float16(0.1), "c": numpy.float32(numpy.inf)}).make_response().get_data()
+        assert(body == b'{"a":0.1,"b":0.1,"c":null}')
+        assert(json_response.DataResponse(data=numpy.float32(0.1)).make_response().get_data() == b"0.1")
+    finally:
+        json_response.set_json_backend(previous)
+
+def test_msgpack_layouts():
+    msgpack = pytest.importorskip("msgpack")
+    json_response.enable_format_negotiation("msgpack")
+    try:
+        with app.test_request_context("/", headers={"Accept": "application/msgpack"}):
+            response_obj = json_response.DataResponse(data=_records(), layout="columns").make_response()
+    finally:
+        json_response.disable_format_negotiation()
+    assert(msgpack.unpackb(response_obj.get_data()) == expected_columns)
+
+def test_unknown_layout():
+    with pytest.raises(ValueError):
+        json_response.DataResponse(data=_records(), layout="split")
@@ -0,0 +1,99 @@
+from stellrent_response import json_response
+from flask import Response
+from pydantic import BaseModel
+from typing import Any, Dict, List
+import dataclasses
+import datetime
+import json
+import uuid
+
+default_content_type = "application/json"
+
+class _Item(BaseModel):
+    id: uuid.UUID
+    name: str
+    price: float
+    tags: List[str] = []
+
+class _Event(BaseModel):
+    id: uuid.UUID
+    created: datetime.datetime
+    day: datetime.date
+
+class _Timer(BaseModel):
+    elapsed: datetime.timedelta
+
+class _Loose(BaseModel):
+    extra: Dict[str, Any]
+
+@dataclasses.dataclass
+class _Point:
+    x: int
+    y: int
+
+item = _Item(id=uuid.UUID("12345678-1234-5678-1234-567812345678"), name="Café", price=10.5, tags=["a"])
+event = _Event(
+    id=uuid.UUID("87654321-4321-8765-4321-876543218765"),
+    created=datetime.datetime(2024, 1, 2, 3, 4, 5, tzinfo=datetime.timezone.utc),
+    day=datetime.date(2024, 1, 2),
+)
+
+def _expected(payload):
+    return json_response.get_json_backend().dumps(payload)
+
+def test_model_matches_model_dump():
+    response_obj = json_response.DataResponse(data=item).make_response()
+    assert(isinstance(response_obj, Response))
+    assert(response_obj.status_code == 200)
+    assert(response_obj.content_type == default_content_type)
+    assert(response_obj.get_data() == _expected(item.model_dump()))
+
+def test_datetime_model_keeps_encoder_format():
+    response_obj = json_response.DataResponse(data=event).make_response()
+    assert(response_obj.get_data() == _expected(event.model_dump()))
+    assert(json.loads(response_obj.get_data())["created"] == "2024-01-02T03:04:05+00:00")
+
+def test_list_of_models():
+    items = [item, item.model_copy(update={"name": "Chá"})]
+    response_obj = json_response.DataResponse(data=items).make_response()
+    assert(response_obj.get_data() == _expected([model.model_dump() for model in items]))
+    tuple_response_obj = json_response.DataResponse(data=tuple(items)).make_response()
+    assert(tuple_response_obj.get_data() == response_obj.get_data())
+
+def test_create_confirmation_with_model():
+    response_obj = json_response.CreateConfirmationResponse(data=event).make_response()
+    assert(response_obj.status_code == 201)
+    assert(response_obj.get_data() == _expected(event.model_dump()))
+
+def test_timedelta_model_keeps_encoder_format():
+    timer = _Timer(elapsed=datetime.timedelta(minutes=1, seconds=30))
+    assert(json.loads(json_response.DataResponse(data=timer).make_response().get_data()) == {"elapsed": 90.0})
+    nested = json_response.DataResponse(data={"timer": timer}).make_response().get_data()
+    assert(json.loads(nested) == {"timer": {"elapsed": 90.0}})
+
+def test_any_field_keeps_encoder_format():
+    created = datetime.datetime(2024, 1, 2, tzinfo=datetime.timezone.utc)
+    loose = _Loose(extra={"created": created})
+    response_obj = json_response.DataResponse(data=loose).make_response()
+    assert(json.loads(response_obj.get_data()) == {"extra": {"created": created.isoformat()}})
+
+def test_dataclass_and_nested_models():
+    response_obj = json_response.DataResponse(data=_Point(1, 2)).make_response()
+    assert(json.loads(response_obj.get_data()) == {"x": 1, "y": 2})
+    nested_response_obj = json_response.DataResponse(data={"items": [event]}).make_response()
+    assert(nested_response_obj.get_data() == _expected({"items": [event.model_dump()]}))
+
+def test_dataclass_field_with_unexpected_value():
+    # Dataclasses comuns usam o registro de encoders: sem validação nem avisos do pydantic
+    response_obj = json_response.DataResponse(data=[_Point("abc", 2)]).make_response()
+    assert(json.loads(response_obj.get_data()) == [{"x": "abc", "y": 2}])
+    assert(_Point not in json_response._type_adapters)
+
+def test_type_adapter_is_cached():
+    json_response.DataResponse(data=item).make_response()
+    json_response.DataResponse(data=event).make_response()
+    cached = json_response._type_adapters[_Item]
+    json_response.DataResponse(data=item).make_response()
+    assert(json_response._type_adapters[_Item] is cached)
+    assert(cached[1] is True)
+    assert(json_response._type_adapters[_Event][1] is False)
@@ -0,0 +1,97 @@
+from stellrent_response import json_response
+from flask import Flask
+import json
+import pytest
+
+app = Flask(__name__)
+
+payload = b'{"report":[1,2,3],"name":"caf\xc3\xa9"}'
+
+@pytest.fixture
+def report_file(tmp_path):
+    path = tmp_path / "report.json"
+    path.write_bytes(payload)
+    return path
+
+def test_bytes_sent_as_is():
+    response_obj = json_response.RawJsonResponse(payload).make_response()
+    assert(response_obj.status_code == 200)
+    assert(response_obj.content_type == "application/json")
+    assert(response_obj.get_data() == payload)
+
+def test_memoryview_and_status():
+    response_obj = json_response.RawJsonResponse(memoryview(payload), status_code=201).make_response()
+    assert(response_obj.status_code == 201)
+    assert(response_obj.get_data() == payload)
+    sliced = json_response.RawJsonResponse(memoryview(b"xx[1]")[2:]).make_response()
+    assert(sliced.get_data() == b"[1]")
+
+def test_whole_bytes_view_is_not_copied():
+    response = json_response.RawJsonResponse(memoryview(payload))
+    assert(response._encode_body()[0] is payload)
+
+def test_file_is_streamed_with_content_length(report_file):
+    with app.test_request_context("/"):
+        response_obj = json_response.RawJsonResponse(path=report_file).make_response()
+        assert(response_obj.direct_passthrough)
+        assert(response_obj.content_length == len(payload))
+        assert(b"".join(response_obj.response) == payload)
+        response_obj.close()
+
+def test_file_through_flask_client(report_file):
+    flask_app = Flask(__name__)
+    flask_app.add_url_rule("/report", view_func=lambda: json_response.RawJsonResponse(path=report_file).with_etag().make_response())
+    client = flask_app.test_client()
+    response_obj = client.get("/report")
+    assert(response_obj.get_data() == payload)
+    assert(response_obj.headers["Content-Length"] == str(len(payload)))
+    etag = response_obj.headers["ETag"]
+    response_obj.close()
+    assert(client.get("/report", headers={"If-None-Match": etag}).status_code == 304)
+
+def test_negotiation_does_not_apply():
+    json_response.enable_format_negotiation("msgpack")
+    try:
+        with app.test_request_context("/", headers={"Accept": "application/msgpack"}):
+            response_obj = json_response.RawJsonResponse(payload).make_response()
+    finally:
+        json_response.disable_format_negotiation()
+    assert(response_obj.content_type == "application/json")
+    assert(response_obj.get_data() == payload)
+
+def test_body_or_path_required(report_file):
+    with pytest.raises(ValueError):
+        json_response.RawJsonResponse()
+    with pytest.raises(ValueError):
+        json_response.RawJsonResponse(payload, path=report_file)
+    with pytest.raises(ValueError):
+        json_response.RawJsonResponse(payload, validate="deep")
+
+@pytest.mark.parametrize("body", [b'{"a":1}', b" [1, 2] \n", b'"text"', b"-1.5e3", b"true", b"null", b"[" + b"1," * 200 + b"1]"])
+def test_shallow_validation_accepts(body):
+    json_response.RawJsonResponse(body, validate="shallow")
+
+@pytest.mark.parametrize("body", [b"", b"   ", b'{"a":1', b"[1,2}", b'"', b"<html>", b"{" + b" " * 200 + b"]"])
+def test_shallow_validation_rejects(body):
+    with pytest.raises(ValueError):
+        json_response.RawJsonResponse(body, validate="shallow")
+
+def test_full_validation():
+    json_response.RawJsonResponse(payload, validate="full")
+    with pytest.raises(ValueError):
+        json_response.RawJsonResponse(b'{"a":1,}', validate="full")
+    with pytest.raises(ValueError):
+        json_response.RawJsonResponse(b'{"a":"\xff"}', validate="full")
+
+def test_file_validation(tmp_path):
+    path = tmp_path / "broken.json"
+    path.write_bytes(b"[" + b"1," * 200 + b"1")
+    with pytest.raises(ValueError):
+        json_response.RawJsonResponse(path=path, validate="shallow")
+    with pytest.raises(ValueError):
+        json_response.RawJsonResponse(path=path, validate="full")
+
+def test_inside_multi_status(report_file):
+    response_obj = json_response.MultiStatusResponse([json_response.RawJsonResponse(payload), json_response.RawJsonResponse(path=report_file)]).make_response()
+    expected = json.loads(payload)
+    assert(json.loads(response_obj.get_data()) == [{"status": 200, "body": expected}, {"status": 200, "body": expected}])
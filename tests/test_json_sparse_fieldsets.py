@@ -0,0 +1,108 @@
+from stellrent_response import json_response
+from flask import Flask
+from pydantic import BaseModel
+from typing import Dict, List, Optional, Union
+import dataclasses
+import json
+import pytest
+
+app = Flask(__name__)
+
+class Address(BaseModel):
+    city: str
+    street: str
+
+class Tag(BaseModel):
+    name: str
+    color: str
+
+class User(BaseModel):
+    id: int
+    name: str
+    email: str
+    address: Optional[Address]
+    tags: List[Tag]
+    extra: Dict[str, Tag] = {}
+
+@dataclasses.dataclass
+class Point:
+    x: int
+    y: int
+    label: str
+
+users = [
+    User(id=1, name="Ana", email="ana@example.com", address=Address(city="Recife", street="A"), tags=[Tag(name="a", color="red")], extra={"k": Tag(name="b", color="blue")}),
+    User(id=2, name="Bia", email="bia@example.com", address=None, tags=[]),
+]
+
+records = [
+    {"id": 1, "name": "Ana", "email": "ana@example.com", "address": {"city": "Recife", "street": "A"}, "tags": [{"name": "a", "color": "red"}]},
+    {"id": 2, "name": "Bia", "email": "bia@example.com"},
+]
+
+def _body(response):
+    return json.loads(response.make_response().get_data())
+
+def test_parse_fields():
+    assert(json_response.parse_fields("id, name,address.city") == (("id", True), ("name", True), ("address", (("city", True),))))
+    assert(json_response.parse_fields(["address.city", "address"]) == (("address", True),))
+    assert(json_response.parse_fields("address,address.city") == (("address", True),))
+    assert(json_response.parse_fields("a.b.c,a.d") == (("a", (("b", (("c", True),)), ("d", True))),))
+    with pytest.raises(ValueError):
+        json_response.parse_fields("a..b")
+    with pytest.raises(ValueError):
+        json_response.parse_fields(",".join(f"f{index}" for index in range(json_response.FIELDS_MAX_PATHS + 1)))
+
+def test_dict_records():
+    body = _body(json_response.DataResponse(data=records, fields="id,address.city,tags.name"))
+    assert(body == [
+        {"id": 1, "address": {"city": "Recife"}, "tags": [{"name": "a"}]},
+        {"id": 2},
+    ])
+
+def test_caller_data_is_not_modified():
+    json_response.DataResponse(data=records, fields="id").make_response()
+    assert(records[0]["email"] == "ana@example.com")
+    assert(records[0]["address"] == {"city": "Recife", "street": "A"})
+
+def test_pydantic_models():
+    body = _body(json_response.DataResponse(data=users, fields="id,address.city,tags.name,extra.color"))
+    assert(body == [
+        {"id": 1, "address": {"city": "Recife"}, "tags": [{"name": "a"}], "extra": {"k": {"color": "blue"}}},
+        {"id": 2, "address": None, "tags": [], "extra": {}},
+    ])
+    assert(_body(json_response.DataResponse(data=users[0], fields=["name"])) == {"name": "Ana"})
+
+def test_models_without_union_type(monkeypatch):
+    # Python 3.9 não tem types.UnionType
+    monkeypatch.setattr(json_response, "_UNION_ORIGINS", (Union,))
+    json_response._pydantic_include.cache_clear()
+    try:
+        body = _body(json_response.DataResponse(data=users, fields="id,address.city"))
+        assert(body == [{"id": 1, "address": {"city": "Recife"}}, {"id": 2, "address": None}])
+        assert(_body(json_response.DataResponse(data=Point(x=1, y=2, label="p"), fields="x")) == {"x": 1})
+    finally:
+        json_response._pydantic_include.cache_clear()
+
+def test_models_nested_in_dicts_and_dataclasses():
+    data = {"user": users[0], "point": Point(x=1, y=2, label="p"), "total": 2}
+    body = _body(json_response.DataResponse(data=data, fields="user.name,point.x,point.label"))
+    assert(body == {"user": {"name": "Ana"}, "point": {"x": 1, "label": "p"}})
+    assert(_body(json_response.DataResponse(data=[Point(1, 2, "p")], fields="y")) == [{"y": 2}])
+
+def test_fields_from_query_string():
+    with app.test_request_context("/?fields=id,name"):
+        selection = json_response.requested_fields()
+        body = json.loads(json_response.DataResponse(data=records, fields=selection).make_response().get_data())
+    assert(body == [{"id": 1, "name": "Ana"}, {"id": 2, "name": "Bia"}])
+    with app.test_request_context("/"):
+        assert(json_response.requested_fields() is None)
+        assert(json_response.DataResponse(data=records, fields=json_response.requested_fields()).fields is None)
+    with app.test_request_context("/?fields=,"):
+        assert(json_response.requested_fields() is None)
+
+def test_version_etag_depends_on_fields():
+    with app.test_request_context("/"):
+        full = json_response.DataResponse(data=records).with_etag(version=1).make_response()
+        sparse = json_response.DataResponse(data=records, fields="id").with_etag(version=1).make_response()
+    assert(full.headers["ETag"] != sparse.headers["ETag"])
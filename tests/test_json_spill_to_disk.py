@@ -0,0 +1,87 @@
+from stellrent_response import json_response
+from flask import Flask
+import datetime
+import json
+import uuid
+import pytest
+
+app = Flask(__name__)
+
+records = [
+    {"id": uuid.UUID(int=index), "name": f"record {index}", "created": datetime.datetime(2024, 1, 1, 0, 0, index % 60), "tags": ["a", "b"]}
+    for index in range(2000)
+]
+
+@pytest.fixture
+def spill(tmp_path):
+    settings = json_response.enable_spill_to_disk(memory_limit=16 * 1024, chunk_size=4096, directory=str(tmp_path))
+    yield settings
+    json_response.disable_spill_to_disk()
+
+def _in_memory(response):
+    json_response.disable_spill_to_disk()
+    try:
+        return response.make_response().get_data()
+    finally:
+        json_response.enable_spill_to_disk(memory_limit=16 * 1024, chunk_size=4096)
+
+def _read(response_obj):
+    try:
+        return b"".join(response_obj.response)
+    finally:
+        response_obj.close()
+
+def test_large_body_is_streamed_from_disk(spill):
+    response_obj = json_response.DataResponse(data=records).make_response()
+    assert(response_obj.direct_passthrough)
+    assert(response_obj.content_type == "application/json")
+    expected = _in_memory(json_response.DataResponse(data=records))
+    assert(response_obj.content_length == len(expected))
+    assert(_read(response_obj) == expected)
+
+def test_nested_mapping_and_fields(spill):
+    data = {"total": len(records), "items": records}
+    expected = _in_memory(json_response.DataResponse(data=data, fields="total,items.id"))
+    response_obj = json_response.DataResponse(data=data, fields="total,items.id").make_response()
+    assert(response_obj.direct_passthrough)
+    assert(_read(response_obj) == expected)
+    assert(json.loads(expected)["items"][1] == {"id": str(uuid.UUID(int=1))})
+
+def test_small_body_stays_in_memory(spill):
+    response_obj = json_response.DataResponse(data=records[:2]).make_response()
+    assert(not response_obj.direct_passthrough)
+    assert(not response_obj.is_streamed)
+    assert(json.loads(response_obj.get_data())[0]["name"] == "record 0")
+
+def test_envelopes_are_not_spilled(spill):
+    response_obj = json_response.BadRequest(details=records).make_response()
+    assert(not response_obj.direct_passthrough)
+
+def test_content_length_and_etag_through_flask(spill):
+    flask_app = Flask(__name__)
+    flask_app.add_url_rule("/records", view_func=lambda: json_response.DataResponse(data=records).with_etag().make_response())
+    client = flask_app.test_client()
+    response_obj = client.get("/records")
+    body = response_obj.get_data()
+    assert(response_obj.headers["Content-Length"] == str(len(body)))
+    assert(json.loads(body)[0]["id"] == str(uuid.UUID(int=0)))
+    etag = response_obj.headers["ETag"]
+    response_obj.close()
+    assert(client.get("/records", headers={"If-None-Match": etag}).status_code == 304)
+
+def test_temporary_file_is_removed(spill, tmp_path):
+    spill.memory_limit = 1024 # O SpooledTemporaryFile passa para o disco acima desse tamanho
+    response_obj = json_response.DataResponse(data=records).make_response()
+    _read(response_obj)
+    assert(list(tmp_path.iterdir()) == [])
+
+def test_metrics_record_spilled_size(spill):
+    metrics = json_response.enable_metrics()
+    try:
+        response_obj = json_response.DataResponse(data=records).make_response()
+        size = response_obj.content_length
+        _read(response_obj)
+        sizes = {entry["class"]: entry for entry in metrics.snapshot()["payload_bytes"]}
+        assert(sizes["DataResponse"]["sum"] == size)
+    finally:
+        json_response.disable_metrics()
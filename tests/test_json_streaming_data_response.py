@@ -0,0 +1,53 @@
+from stellrent_response import json_response
+from flask import Flask, Response
+import datetime
+import json
+import uuid
+
+default_content_type = "application/json"
+
+content_response_data = [
+    {"id": uuid.UUID("12345678-1234-5678-1234-567812345678"), "created": datetime.datetime(2024, 1, 2, 3, 4, 5)},
+    {"id": uuid.UUID("87654321-4321-8765-4321-876543218765"), "created": datetime.date(2024, 1, 2)},
+    {"name": "value", "amount": 10},
+]
+
+def _generate(count):
+    for index in range(count):
+        yield {"index": index}
+
+def test_response_matches_data_response_body():
+    streaming_resp = json_response.StreamingDataResponse(data=iter(content_response_data))
+    assert(streaming_resp.status_code == 200)
+    response_obj = streaming_resp.make_response()
+    assert(isinstance(response_obj, Response))
+    assert(response_obj.is_streamed)
+    assert(response_obj.status_code == 200)
+    assert(response_obj.content_type == default_content_type)
+    expected = json_response.DataResponse(data=content_response_data).make_response().get_data()
+    assert(response_obj.get_data() == expected)
+
+def test_response_is_chunked():
+    streaming_resp = json_response.StreamingDataResponse(data=_generate(1000), chunk_size=256)
+    chunks = list(streaming_resp.make_response().response)
+    assert(len(chunks) > 1)
+    assert(json.loads(b"".join(chunks)) == [{"index": index} for index in range(1000)])
+
+def test_response_empty_iterable():
+    response_obj = json_response.StreamingDataResponse(data=_generate(0)).make_response()
+    assert(json.loads(response_obj.get_data()) == [])
+
+def test_response_keeps_request_context():
+    app = Flask(__name__)
+
+    @app.route("/export")
+    def export():
+        from flask import request
+        def rows():
+            for index in range(3):
+                yield {"index": index, "path": request.path}
+        return json_response.StreamingDataResponse(data=rows()).make_response()
+
+    response_obj = app.test_client().get("/export")
+    assert(response_obj.status_code == 200)
+    assert(json.loads(response_obj.get_data()) == [{"index": index, "path": "/export"} for index in range(3)])